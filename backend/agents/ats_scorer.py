@@ -0,0 +1,210 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from ..core.config import settings
+from ..core.metrics import timed
+from ..services.skill_matcher import skill_matcher, display_name
+
+# Verbs that open a strong resume bullet
+ACTION_VERBS = {
+    "achieved", "accelerated", "architected", "automated", "built", "championed", "created", "cut",
+    "decreased", "delivered", "deployed", "designed", "developed", "drove", "eliminated", "engineered",
+    "established", "expanded", "generated", "grew", "implemented", "improved", "increased", "integrated",
+    "introduced", "launched", "led", "managed", "mentored", "migrated", "modernized", "optimized",
+    "orchestrated", "overhauled", "pioneered", "reduced", "redesigned", "refactored", "resolved",
+    "scaled", "shipped", "simplified", "slashed", "spearheaded", "streamlined", "tested", "trained",
+    "transformed", "unified", "won", "wrote",
+}
+
+# Phrases that hide what the candidate actually did
+WEAK_PHRASES = [
+    "worked on", "responsible for", "helped", "assisted", "involved in", "participated in",
+    "tasked with", "duties included", "familiar with",
+]
+
+_WEAK_PATTERN = re.compile(r"\b(" + "|".join(re.escape(p) for p in WEAK_PHRASES) + r")\b", re.IGNORECASE)
+_BULLET_MARKERS = re.compile(r"^[\s\-\*•▪●‣⁃>]+")
+_PHONE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+_YEAR = re.compile(r"\b(?:19|20)\d{2}\b")
+# "Summary: ..." style labels in front of a line
+_LABEL = re.compile(r"^[A-Za-z][\w /&]{0,24}:\s*")
+# %, currency, multipliers (3x), magnitudes (10k, 2M) and plain counts of two or more
+_METRIC = re.compile(
+    r"\d+(?:\.\d+)?\s*(?:%|percent\b|x\b|[kKmMbB]\b|\+)|[$€£₹]\s?\d|\b\d{2,}(?:,\d{3})*\b|\b[2-9]\b"
+)
+
+# Section weights in the overall score
+_WEIGHTS = {"Impact & Verbs": 0.3, "Quantifiable Metrics": 0.3, "Keywords & Skills": 0.4}
+# Share of statements carrying a metric that earns full marks
+_QUANT_TARGET = 0.5
+# Skills found in the resume for full marks when there is no job description to compare to
+_BREADTH_TARGET = 8
+_MIN_STATEMENT_WORDS = 4
+
+
+def _status(score: int) -> str:
+    if score >= 75:
+        return "good"
+    if score >= 50:
+        return "warning"
+    return "critical"
+
+
+def _clamp(score: float) -> int:
+    return max(0, min(100, round(score)))
+
+
+def _is_statement(line: str) -> bool:
+    words = line.split()
+    if len(words) < _MIN_STATEMENT_WORDS or "@" in line or _PHONE.search(line):
+        return False
+    # Comma-separated lists (skills, tools) are not statements
+    return line.count(",") < len(words) / 2
+
+
+def split_statements(text: str) -> List[str]:
+    """Resume lines that read as statements (bullets, sentences), without bullet markers or labels."""
+    lines = [_LABEL.sub("", _BULLET_MARKERS.sub("", line).strip()) for line in text.splitlines()]
+    if len([line for line in lines if line]) <= 1:
+        # Pasted as one paragraph: fall back to sentences
+        lines = [s.strip() for s in re.split(r"(?<=[.!?;])\s+", text)]
+    return [line for line in lines if _is_statement(line)]
+
+
+def _first_word(statement: str) -> str:
+    match = re.match(r"[A-Za-z]+", statement)
+    return match.group(0).lower() if match else ""
+
+
+def _has_metric(statement: str) -> bool:
+    statement = _YEAR.sub(" ", _PHONE.sub(" ", statement))
+    return bool(_METRIC.search(statement))
+
+
+def _impact_section(statements: List[str]) -> Dict[str, Any]:
+    strong = sum(1 for s in statements if _first_word(s) in ACTION_VERBS)
+    weak: Dict[str, int] = {}
+    for s in statements:
+        for match in _WEAK_PATTERN.finditer(s):
+            phrase = match.group(1).lower()
+            weak[phrase] = weak.get(phrase, 0) + 1
+
+    score = _clamp(100 * strong / len(statements) - 10 * sum(weak.values())) if statements else 0
+    issues, suggestions = [], []
+    if statements and strong < len(statements):
+        issues.append(f"{len(statements) - strong} of {len(statements)} statements don't start with an action verb")
+        suggestions.append("Open each bullet with a verb like 'Engineered', 'Led', 'Optimized' or 'Shipped'")
+    for phrase, count in sorted(weak.items(), key=lambda item: -item[1]):
+        issues.append(f"Weak phrasing: '{phrase}'" + (f" ({count}x)" if count > 1 else ""))
+    if weak:
+        suggestions.append("Replace 'worked on' / 'responsible for' with what you built and its outcome")
+    if not statements:
+        issues.append("No bullet points or sentences found")
+    return {"name": "Impact & Verbs", "score": score, "status": _status(score), "issues": issues, "suggestions": suggestions}
+
+
+def _quantification_section(statements: List[str]) -> Dict[str, Any]:
+    quantified = sum(1 for s in statements if _has_metric(s))
+    share = quantified / len(statements) if statements else 0.0
+    score = _clamp(100 * share / _QUANT_TARGET)
+    issues, suggestions = [], []
+    if score < 100:
+        issues.append(f"Only {quantified} of {len(statements)} statements include a number or metric")
+        suggestions.append("Add % improvements, scale (users, requests/s, $) or time saved")
+    return {"name": "Quantifiable Metrics", "score": score, "status": _status(score), "issues": issues, "suggestions": suggestions}
+
+
+def _keywords_section(resume_skills: List[str], job_skills: List[str]) -> Tuple[Dict[str, Any], List[str]]:
+    issues, suggestions = [], []
+    if job_skills:
+        present = set(resume_skills)
+        missing = [skill for skill in job_skills if skill not in present]
+        score = _clamp(100 * (len(job_skills) - len(missing)) / len(job_skills))
+        if missing:
+            issues.append(f"Missing {len(missing)} of {len(job_skills)} keywords from the job description")
+            suggestions.append("Mention the missing skills you do have, using the job description's wording")
+    else:
+        missing = []
+        score = _clamp(100 * len(resume_skills) / _BREADTH_TARGET)
+        if score < 100:
+            issues.append(f"Only {len(resume_skills)} recognizable technical skills")
+            suggestions.append("List your tools and technologies explicitly")
+    section = {"name": "Keywords & Skills", "score": score, "status": _status(score), "issues": issues, "suggestions": suggestions}
+    return section, [display_name(skill) for skill in missing]
+
+
+def _section_score(report: Dict[str, Any], name: str) -> int:
+    return next(section["score"] for section in report["sections"] if section["name"] == name)
+
+
+def summarize(report: Dict[str, Any]) -> str:
+    """One-line summary of a scored report, used when no LLM narrative is generated."""
+    sections = sorted(report["sections"], key=lambda section: section["score"])
+    weakest, strongest = sections[0], sections[-1]
+    summary = f"Overall {report['score']}/100. Strongest: {strongest['name']} ({strongest['score']})."
+    if weakest["issues"]:
+        summary += f" Needs work: {weakest['name']} - {weakest['issues'][0]}."
+    return summary
+
+
+@timed("ats_score")
+def score_resume(resume_text: str, job_description: str = "", job_skills: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Deterministic ATS audit: Impact, Quantification and Keywords section scores
+    and missing_keywords, computed locally in the same shape the LLM audit returned.
+    Pass the job description's `job_skills` to skip scanning it again.
+    """
+    statements = split_statements(resume_text)
+    resume_skills = skill_matcher.find(resume_text)
+    if job_skills is None:
+        job_skills = skill_matcher.find(job_description) if job_description else []
+
+    keywords, missing_keywords = _keywords_section(resume_skills, job_skills)
+    sections = [_impact_section(statements), _quantification_section(statements), keywords]
+    report = {
+        "score": _clamp(sum(_WEIGHTS[section["name"]] * section["score"] for section in sections)),
+        "summary": "",
+        "sections": sections,
+        "missing_keywords": missing_keywords,
+    }
+    report["summary"] = summarize(report)
+    return report
+
+
+def rank_resumes(resume_texts: List[str], job_description: str) -> List[Dict[str, Any]]:
+    """
+    Audits many resumes against one job description and ranks them, best first.
+
+    The description's skills are extracted once, and it is embedded in the same
+    batched encode as the resumes; similarity to every resume is one matrix
+    product. The match score blends similarity with keyword coverage
+    (AUDIT_BATCH_KEYWORD_WEIGHT), or uses similarity alone when the description
+    names no known skills. Each item carries its input `index`.
+    """
+    from ..services.profile_engine import encode_texts
+
+    if not resume_texts:
+        return []
+    job_skills = skill_matcher.find(job_description)
+    reports = [score_resume(text, job_skills=job_skills) for text in resume_texts]
+
+    vectors = np.asarray(encode_texts([job_description] + list(resume_texts)), dtype=np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    similarity = vectors[1:] @ vectors[0]
+
+    weight = settings.AUDIT_BATCH_KEYWORD_WEIGHT if job_skills else 0.0
+    # The Keywords section score is the coverage of job_skills when there are any
+    coverage = np.array([_section_score(report, "Keywords & Skills") / 100 for report in reports], dtype=np.float32)
+    match = (1 - weight) * np.clip(similarity, 0.0, 1.0) + weight * coverage
+
+    ranked = []
+    for rank, i in enumerate(np.argsort(-match, kind="stable"), start=1):
+        ranked.append({
+            "index": int(i),
+            "rank": rank,
+            "match_score": round(float(match[i]) * 100, 1),
+            "similarity": round(float(similarity[i]) * 100, 1),
+            "keyword_coverage": round(float(coverage[i]) * 100, 1) if job_skills else None,
+            "audit": reports[i],
+        })
+    return ranked
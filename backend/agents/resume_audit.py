@@ -1,85 +1,130 @@
-from langchain_ollama import ChatOllama
-from langchain_core.messages import HumanMessage
+import asyncio
 import json
-import re
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+from ..core.config import settings
+from ..core.concurrency import run_cpu
+from ..core.metrics import log_event
+from ..core.models import get_llm
+from ..services.streaming import stream_llm_json
+from .ats_scorer import rank_resumes, score_resume
 
-llm = ChatOllama(model="gemma3:1b", format="json", temperature=0.1)
-
-def audit_resume(resume_text: str, job_description: str = ""):
-    """
-    Analyzes the resume for ATS compatibility, content quality, and formatting.
-    """
-    print("--- STARTING RESUME AUDIT ---")
-    
-    prompt = f"""
+def build_narrative_prompt(report: Dict[str, Any], resume_text: str, job_description: str = "") -> str:
+    scores = json.dumps(
+        [{k: s[k] for k in ("name", "score", "issues")} for s in report["sections"]]
+    )
+    return f"""
     You are an expert ATS (Applicant Tracking System) Auditor and Resume Coach.
-    
+
     CONTEXT:
-    Resume Text: {resume_text[:2000]}... (truncated)
+    Resume Text: {resume_text[:1500]}... (truncated)
     Target Job Description (Optional): {job_description[:500] if job_description else "General Tech Role"}
-    
+    Overall Score: {report["score"]}/100
+    Section Scores (already computed, do not change them): {scores}
+    Missing Keywords: {", ".join(report["missing_keywords"]) or "None"}
+
     TASK:
-    Audit this resume and provide a detailed score and feedback report.
-    
-    CRITERIA:
-    1. **Impact**: Does it use strong action verbs? (e.g. "Architected" vs "Worked on")
-    2. **Quantification**: Are there numbers/metrics? (e.g. "Improved by 40%" vs "Improved performance")
-    3. **Keywords**: Does it have relevant tech keywords?
-    4. **Formatting**: Is it readable? (Inferred from text structure)
-    
+    Write a 2-3 sentence narrative summary of this audit for the candidate:
+    what is strong, and the most valuable thing to fix first.
+
     OUTPUT FORMAT:
-    JSON with the following structure:
-    {{
-        "score": 75,
-        "summary": "Good technical depth but lacks quantifiable metrics.",
-        "sections": [
-            {{
-                "name": "Impact & Verbs",
-                "score": 60,
-                "status": "warning",
-                "issues": ["Overused 'Worked on'", "Passive voice detected"],
-                "suggestions": ["Use 'Spearheaded', 'Orchestrated', 'Engineered'"]
-            }},
-            {{
-                "name": "Quantifiable Metrics",
-                "score": 40,
-                "status": "critical",
-                "issues": ["Very few numbers found", "Claims lack proof"],
-                "suggestions": ["Add % improvement", "Mention user scale (e.g. 10k users)"]
-            }},
-            {{
-                "name": "Keywords & Skills",
-                "score": 90,
-                "status": "good",
-                "issues": [],
-                "suggestions": []
-            }}
-        ],
-        "missing_keywords": ["CI/CD", "Unit Testing"]
-    }}
+    JSON: {{ "summary": "Good technical depth but lacks quantifiable metrics." }}
     """
-    
+
+async def write_narrative(report: Dict[str, Any], resume_text: str, job_description: str = "", use_cache: bool = True) -> Optional[str]:
+    """LLM-written summary for a scored report, or None if the call fails or is refused."""
+    prompt = build_narrative_prompt(report, resume_text, job_description)
     try:
-        response = llm.invoke([HumanMessage(content=prompt)])
-        content = response.content
-        
-        # JSON Parsing Logic
-        try:
-            return json.loads(content)
-        except json.JSONDecodeError:
-            match = re.search(r"```json\s*(.*?)\s*```", content, re.DOTALL)
-            if match:
-                return json.loads(match.group(1))
-            match = re.search(r"\{.*\}", content, re.DOTALL)
-            if match:
-                return json.loads(match.group(0))
-            raise ValueError("Could not parse JSON")
-            
+        result = await get_llm().generate_json(prompt, use_cache=use_cache)
     except Exception as e:
-        print(f"Error auditing resume: {e}")
-        return {
-            "score": 0,
-            "summary": "Error analyzing resume.",
-            "sections": [],
-            "missing_keywords": []
-        }
+        # Includes LLMOverloaded: the scores are still worth returning
+        log_event("audit_narrative_error", level=logging.WARNING, error=repr(e))
+        return None
+    summary = result.get("summary")
+    return summary.strip() if isinstance(summary, str) and summary.strip() else None
+
+async def audit_resume(resume_text: str, job_description: str = "", use_cache: bool = True, narrative: bool = None):
+    """
+    Analyzes the resume for ATS compatibility and content quality.
+
+    Scores, sections and missing keywords are computed locally (ats_scorer);
+    the LLM only writes the narrative summary, when `narrative` is on
+    (default AUDIT_LLM_NARRATIVE, off). Any LLM failure keeps the local summary.
+    """
+    report = score_resume(resume_text, job_description)
+    if narrative is None:
+        narrative = settings.AUDIT_LLM_NARRATIVE
+    log_event("audit", sample_rate=settings.LOG_SAMPLE_RATE, score=report["score"], narrative=narrative)
+    if not narrative:
+        return report
+
+    report["summary"] = await write_narrative(report, resume_text, job_description, use_cache) or report["summary"]
+    return report
+
+async def stream_audit_resume(resume_text: str, job_description: str = "", use_cache: bool = True, narrative: bool = None):
+    """
+    Streaming variant of audit_resume, yielding (event, data) pairs: the local
+    scores arrive at once as "partial" events, then the narrative's tokens, then "result".
+    The scores are not held back by the LLM here, so the narrative is on unless
+    `narrative` is False.
+    """
+    report = score_resume(resume_text, job_description)
+    yield "partial", {"type": "field", "key": "score", "value": report["score"]}
+    for section in report["sections"]:
+        yield "partial", {"type": "item", "key": "sections", "value": section}
+    yield "partial", {"type": "field", "key": "missing_keywords", "value": report["missing_keywords"]}
+
+    if narrative is not False:
+        prompt = build_narrative_prompt(report, resume_text, job_description)
+        try:
+            async for event, data in stream_llm_json(prompt, use_cache=use_cache):
+                if event == "result":
+                    if isinstance(data.get("summary"), str) and data["summary"].strip():
+                        report["summary"] = data["summary"].strip()
+                elif event == "error":
+                    log_event("audit_narrative_error", level=logging.WARNING, error=data['detail'])
+                else:
+                    yield event, data
+        except Exception as e:
+            log_event("audit_narrative_error", level=logging.WARNING, error=repr(e))
+    yield "result", report
+
+async def audit_resumes_batch(
+    resume_ids: List[str],
+    resume_texts: List[str],
+    job_description: str,
+    top_k: int = None,
+    narrative: bool = None,
+    use_cache: bool = True
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Audits many resumes against one job description. Yields every ranked
+    result first ({"type": "result", ...}, best match first), then an LLM
+    summary for each of the top_k as it is written ({"type": "narrative", ...}),
+    unless `narrative` is False.
+    """
+    top_k = settings.AUDIT_BATCH_TOP_K if top_k is None else top_k
+
+    # Scoring and the batched encode are CPU-bound
+    ranked = await run_cpu(rank_resumes, resume_texts, job_description)
+    for item in ranked:
+        yield {"type": "result", "id": resume_ids[item["index"]], **{k: v for k, v in item.items() if k != "index"}}
+
+    if narrative is False or top_k <= 0:
+        return
+
+    async def narrate(item):
+        summary = await write_narrative(item["audit"], resume_texts[item["index"]], job_description, use_cache)
+        return item, summary
+
+    # Concurrency is bounded by llm_scheduler; summaries arrive as they finish
+    tasks = [asyncio.create_task(narrate(item)) for item in ranked[:top_k]]
+    try:
+        for done in asyncio.as_completed(tasks):
+            item, summary = await done
+            if summary:
+                yield {"type": "narrative", "id": resume_ids[item["index"]], "rank": item["rank"], "summary": summary}
+    finally:
+        # Client gone or generator closed early: don't leave LLM calls running or queued
+        for task in tasks:
+            task.cancel()
@@ -1,25 +1,20 @@
-from typing import TypedDict, List, Dict, Any
-from langgraph.graph import StateGraph, END
-from langchain_ollama import ChatOllama
-from langchain_core.messages import SystemMessage, HumanMessage
-import json
-import re
-
-# Helper to clean JSON
-def parse_json_output(content: str):
-    try:
-        # Try direct parse
-        return json.loads(content)
-    except json.JSONDecodeError:
-        # Try to find JSON block
-        match = re.search(r"```json\s*(.*?)\s*```", content, re.DOTALL)
-        if match:
-            return json.loads(match.group(1))
-        # Try to find just the brace block
-        match = re.search(r"\{.*\}", content, re.DOTALL)
-        if match:
-            return json.loads(match.group(0))
-        raise ValueError(f"Could not parse JSON from: {content}")
+from typing import TypedDict, List, Dict, Any, Optional
+import functools
+import logging
+import time
+from ..core.config import settings
+from ..core.concurrency import run_io
+from ..core.metrics import STAGE_SECONDS, log_event
+from ..core.models import registry, get_llm
+from ..services.skill_matcher import skill_matcher, display_name
+from ..services.roadmap_fragments import (
+    fragment_store,
+    role_family,
+    skill_key,
+    normalize_fragment,
+    fallback_fragment,
+    compose_roadmap,
+)
 
 # 1. Define State
 class RoadmapState(TypedDict):
@@ -30,18 +25,72 @@ class RoadmapState(TypedDict):
     roadmap_json: Dict[str, Any]
     feedback: str
     iteration_count: int
-
-# Initialize LLM
-llm = ChatOllama(model="gemma3:1b", format="json", temperature=0.1)
+    use_cache: bool
+    review_status: str
+    timings: Dict[str, float]
 
 # 2. Define Nodes
 
-def gap_analyzer_node(state: RoadmapState):
+def timed_node(name: str):
+    """
+    Records the node's wall time under state["timings"][name] and in the roadmap_<name>
+    stage metric, and logs a sampled "roadmap_agent" event.
+    """
+    def decorator(node):
+        @functools.wraps(node)
+        async def wrapper(state: RoadmapState):
+            started = time.perf_counter()
+            update = await node(state)
+            elapsed = time.perf_counter() - started
+            STAGE_SECONDS.observe(elapsed, stage=f"roadmap_{name}")
+            log_event("roadmap_agent", sample_rate=settings.LOG_SAMPLE_RATE, agent=name, job_title=state.get("job_title"), seconds=round(elapsed, 3))
+            timings = {**state.get("timings", {}), name: round(elapsed, 3)}
+            return {**update, "timings": timings}
+        return wrapper
+    return decorator
+
+def _skill_keys(entries: List[str]) -> Dict[str, str]:
+    """
+    Canonical key -> display name per skill entry. Entries with no known skill
+    are kept as their normalised text, so "Apache Spark" is still compared.
+    """
+    keys = {}
+    for entry in entries:
+        text = " ".join(entry.split())
+        if not text:
+            continue
+        known = skill_matcher.canonical_list([text])
+        if known:
+            for skill in known:
+                keys.setdefault(skill, display_name(skill))
+        else:
+            keys.setdefault(text.lower(), text)
+    return keys
+
+def local_gap_analysis(user_skills: List[str], job_skills: str) -> Optional[List[str]]:
+    """
+    Missing skills as a set difference over canonical skill names (aliases resolved),
+    e.g. user "K8s" covers job "Kubernetes". Job entries outside the skill dictionary
+    are compared as normalised text. Returns None if the job lists no skills at all.
+    """
+    job_keys = _skill_keys(job_skills.split(","))
+    if not job_keys:
+        return None
+    user_keys = _skill_keys(user_skills)
+    return [name for key, name in job_keys.items() if key not in user_keys]
+
+@timed_node("analyst")
+async def gap_analyzer_node(state: RoadmapState):
     """
     Agent 1: The Analyst
     Role: Identifies the gap between user skills and job requirements.
     """
-    print("--- AGENT: GAP ANALYST ---")
+    # Fast path: no LLM call when the job's skills are in the skill dictionary
+    if settings.ROADMAP_GAP_ANALYSIS == "local":
+        missing = local_gap_analysis(state['user_skills'], state['job_skills'])
+        if missing is not None:
+            log_event("roadmap_gaps", sample_rate=settings.LOG_SAMPLE_RATE, source="local", missing=missing)
+            return {"missing_skills": missing}
     
     prompt = f"""
     You are an expert Technical Career Analyst.
@@ -61,30 +110,22 @@ def gap_analyzer_node(state: RoadmapState):
     Example: {{ "missing_skills": ["Kubernetes", "Docker", "System Design"] }}
     """
     
-    response = llm.invoke([HumanMessage(content=prompt)])
     try:
-        content = parse_json_output(response.content)
-    except Exception as e:
-        print(f"Gap Analyst JSON Error: {e}")
+        content = await get_llm().generate_json(prompt, use_cache=state.get("use_cache", True))
+    except ValueError as e:
+        log_event("roadmap_agent_error", level=logging.WARNING, agent="analyst", error=str(e))
         content = {"missing_skills": []}
     
-    print(f"Identified Gaps: {content.get('missing_skills', [])}")
+    log_event("roadmap_gaps", sample_rate=settings.LOG_SAMPLE_RATE, source="llm", missing=content.get("missing_skills", []))
     return {"missing_skills": content.get("missing_skills", [])}
 
-def curriculum_architect_node(state: RoadmapState):
-    """
-    Agent 2: The Architect
-    Role: Creates a structured learning path for the missing skills.
-    """
-    print("--- AGENT: CURRICULUM ARCHITECT ---")
-    
+def build_architect_prompt(state: RoadmapState) -> str:
     missing = state['missing_skills']
     feedback = state.get('feedback', "")
     
     if not missing:
-        # Fallback if no gaps found
-        print("No gaps found. Generating mastery roadmap.")
-        prompt = f"""
+        # Fallback if no gaps found: mastery roadmap
+        return f"""
         The user is a perfect match for the {state['job_title']} role.
         Create a 'Mastery & Interview Prep' roadmap.
         Focus on: Advanced Patterns, System Design, and Behavioral Interview prep.
@@ -93,11 +134,7 @@ def curriculum_architect_node(state: RoadmapState):
         Nodes: {{ "id": "1", "label": "Advanced System Design", "status": "pending", "week": "Week 1" }}
         """
     else:
-        print(f"Creating roadmap for: {missing}")
-        if feedback:
-            print(f"⚠️ REVISING based on feedback: {feedback}")
-            
-        prompt = f"""
+        return f"""
         You are an expert Curriculum Architect.
         
         TASK:
@@ -124,23 +161,93 @@ def curriculum_architect_node(state: RoadmapState):
         Nodes: {{ "id": "1", "label": "Topic Name", "phase": "Basics", "week": "Week 1", "description": "Brief what to learn" }}
         Edges: {{ "source": "1", "target": "2" }}
         """
-        
-    response = llm.invoke([HumanMessage(content=prompt)])
+
+def uses_fragment_cache(state: RoadmapState) -> bool:
+    # Revisions driven by reviewer feedback and the mastery roadmap are generated whole
+    return settings.ROADMAP_FRAGMENT_CACHE and bool(state['missing_skills']) and not state.get('feedback')
+
+def build_fragment_prompt(skills: List[str], job_title: str) -> str:
+    return f"""
+    You are an expert Curriculum Architect.
+    
+    TASK:
+    For EACH of these skills, write 3-5 learning steps for a {job_title}:
+    {', '.join(skills)}
+    
+    RULES:
+    1. Every step belongs to one phase: "Basics", "Intermediate" or "Advanced".
+    2. Be specific (e.g. "Learn React Hooks" instead of just "React").
+    3. "weeks" is the estimated number of weeks for the step (1-4).
+    
+    OUTPUT:
+    JSON object keyed by skill name.
+    Example: {{ "Docker": [ {{ "label": "Containers & Images", "phase": "Basics", "weeks": 1, "description": "Brief what to learn" }} ] }}
+    """
+
+async def compose_from_fragments(state: RoadmapState) -> Dict[str, Any]:
+    """
+    Builds the roadmap from per-skill fragments cached by (canonical skill, role family).
+    Only skills without a cached fragment go to the LLM, all of them in one call.
+    """
+    family = role_family(state['job_title'])
+    skills = {skill_key(skill): skill for skill in state['missing_skills']}
+    use_cache = state.get("use_cache", True)
+
+    fragments = await run_io(fragment_store.get_many, list(skills), family) if use_cache else {}
+    missing = [key for key in skills if key not in fragments]
+    log_event("roadmap_fragments", sample_rate=settings.LOG_SAMPLE_RATE, family=family, cached=len(fragments), generated=len(missing))
+
+    if missing:
+        prompt = build_fragment_prompt([skills[key] for key in missing], state['job_title'])
+        try:
+            generated = await get_llm().generate_json(prompt, use_cache=use_cache)
+        except ValueError as e:
+            log_event("roadmap_agent_error", level=logging.WARNING, agent="architect", error=str(e))
+            generated = {}
+        generated = {skill_key(name): steps for name, steps in generated.items()} if isinstance(generated, dict) else {}
+
+        new_fragments = {}
+        for key in missing:
+            fragment = normalize_fragment(skills[key], generated.get(key))
+            if fragment:
+                new_fragments[key] = fragment
+                fragments[key] = fragment
+            else:
+                fragments[key] = fallback_fragment(skills[key])
+        if new_fragments:
+            await run_io(fragment_store.put_many, family, new_fragments)
+
+    return compose_roadmap(
+        list(skills.values()),
+        {skills[key]: fragment for key, fragment in fragments.items()}
+    )
+
+@timed_node("architect")
+async def curriculum_architect_node(state: RoadmapState):
+    """
+    Agent 2: The Architect
+    Role: Creates a structured learning path for the missing skills.
+    """
+    if uses_fragment_cache(state):
+        roadmap = await compose_from_fragments(state)
+        return {"roadmap_json": roadmap, "iteration_count": state.get("iteration_count", 0) + 1}
+    
+    prompt = build_architect_prompt(state)
+
     try:
-        roadmap = parse_json_output(response.content)
-    except Exception as e:
-        print(f"Architect JSON Error: {e}")
+        roadmap = await get_llm().generate_json(prompt, use_cache=state.get("use_cache", True))
+    except ValueError as e:
+        log_event("roadmap_agent_error", level=logging.WARNING, agent="architect", error=str(e))
         roadmap = {}
     
     return {"roadmap_json": roadmap, "iteration_count": state.get("iteration_count", 0) + 1}
 
-def reviewer_node(state: RoadmapState):
+@timed_node("reviewer")
+async def reviewer_node(state: RoadmapState):
     """
     Agent 3: The Reviewer (Meta-Learner)
     Role: Evaluates the roadmap quality and requests revisions if needed.
     """
-    print("--- AGENT: REVIEWER (META-LEARNER) ---")
-    
     roadmap = state['roadmap_json']
     missing = state['missing_skills']
     
@@ -166,39 +273,76 @@ def reviewer_node(state: RoadmapState):
     Example: {{ "status": "APPROVE", "feedback": "Looks good" }}
     """
     
-    response = llm.invoke([HumanMessage(content=prompt)])
     try:
-        review = parse_json_output(response.content)
-    except Exception:
+        review = await get_llm().generate_json(prompt, use_cache=state.get("use_cache", True))
+    except ValueError:
         review = {"status": "APPROVE"} # Fallback to approve if parsing fails
         
-    print(f"Review Decision: {review.get('status')} - {review.get('feedback', '')}")
-    return {"feedback": review.get("feedback", ""), "review_status": review.get("status", "APPROVE")}
+    status = str(review.get("status", "APPROVE")).upper()
+    # Every rejection is logged, approvals are sampled
+    log_event(
+        "roadmap_review",
+        sample_rate=1.0 if status == "REJECT" else settings.LOG_SAMPLE_RATE,
+        job_title=state['job_title'],
+        status=status,
+        feedback=review.get("feedback", "")
+    )
+    if status == "REJECT":
+        await discard_draft(state)
+    return {"feedback": review.get("feedback", ""), "review_status": status}
+
+async def discard_draft(state: RoadmapState):
+    """
+    Forgets what a rejected roadmap was built from, so it isn't served again:
+    the cached fragments of its skills, or the cached architect completion.
+    """
+    if uses_fragment_cache(state):
+        keys = [skill_key(skill) for skill in state['missing_skills']]
+        await run_io(fragment_store.delete_many, keys, role_family(state['job_title']))
+    else:
+        await get_llm().forget(build_architect_prompt(state))
 
 def should_continue(state: RoadmapState):
-    # OPTIMIZATION: Skipping loop to prevent timeouts on local machine
-    print("✅ Roadmap Approved (Fast Track).")
-    return "approve"
+    if state.get("review_status") != "REJECT":
+        return "approve"
+    if state.get("iteration_count", 0) > settings.ROADMAP_MAX_REVISIONS:
+        # Out of revisions: return the last draft rather than loop on the LLM
+        log_event("roadmap_review_limit", level=logging.WARNING, job_title=state['job_title'], revisions=settings.ROADMAP_MAX_REVISIONS)
+        return "approve"
+    return "reject"
 
 # 3. Build Graph
-workflow = StateGraph(RoadmapState)
-
-workflow.add_node("analyst", gap_analyzer_node)
-workflow.add_node("architect", curriculum_architect_node)
-workflow.add_node("reviewer", reviewer_node)
-
-workflow.set_entry_point("analyst")
-workflow.add_edge("analyst", "architect")
-workflow.add_edge("architect", "reviewer")
-
-workflow.add_conditional_edges(
-    "reviewer",
-    should_continue,
-    {
-        "approve": END,
-        "reject": "architect"
-    }
-)
+def build_roadmap_graph():
+    from langgraph.graph import StateGraph, END
+
+    workflow = StateGraph(RoadmapState)
+
+    workflow.add_node("analyst", gap_analyzer_node)
+    workflow.add_node("architect", curriculum_architect_node)
+
+    workflow.set_entry_point("analyst")
+    workflow.add_edge("analyst", "architect")
+
+    # "off" and "async" return straight after the architect; "async" reviews later
+    if settings.ROADMAP_REVIEWER == "on":
+        workflow.add_node("reviewer", reviewer_node)
+        workflow.add_edge("architect", "reviewer")
+        workflow.add_conditional_edges(
+            "reviewer",
+            should_continue,
+            {
+                "approve": END,
+                "reject": "architect"
+            }
+        )
+    else:
+        workflow.add_edge("architect", END)
+
+    # Compile
+    return workflow.compile()
+
+# Compiled on first use (or during startup warm-up), not at import
+registry.register("roadmap_graph", build_roadmap_graph)
 
-# Compile
-roadmap_graph = workflow.compile()
+def get_roadmap_graph():
+    return registry.get("roadmap_graph")
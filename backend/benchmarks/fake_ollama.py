@@ -0,0 +1,109 @@
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+
+
+def canned_response(prompt: str) -> Dict[str, Any]:
+    """A well-formed answer for whichever CareerOS prompt this is."""
+    if "missing_skills" in prompt:
+        return {"missing_skills": ["Docker", "Kubernetes", "System Design"]}
+    if "keyed by skill name" in prompt:
+        match = re.search(r"learning steps for an? .*?:\s*\n\s*(.+)", prompt)
+        skills = [s.strip() for s in match.group(1).split(",")] if match else ["Docker"]
+        return {
+            skill: [
+                {"label": f"{skill} {phase}", "phase": phase, "weeks": 1, "description": f"Learn {skill}."}
+                for phase in ("Basics", "Intermediate", "Advanced")
+            ]
+            for skill in skills
+        }
+    if "'nodes' and 'edges'" in prompt:
+        nodes = [
+            {"id": str(i), "label": f"Topic {i}", "phase": phase, "week": f"Week {i}", "description": "Brief"}
+            for i, phase in enumerate(["Basics", "Basics", "Intermediate", "Advanced"], start=1)
+        ]
+        return {"nodes": nodes, "edges": [{"source": str(i), "target": str(i + 1)} for i in range(1, 4)]}
+    if '"APPROVE" or "REJECT"' in prompt:
+        return {"status": "APPROVE", "feedback": "Looks good"}
+    if "tailored_bullets" in prompt:
+        return {"tailored_bullets": ["Built CI/CD pipelines with Docker", "Cut p95 latency by 40%"]}
+    if "root_cause" in prompt:
+        return {"root_cause": "Missing cloud experience", "corrective_action": "Ship a project on AWS", "resources": ["AWS docs"]}
+    if "narrative summary" in prompt:
+        return {"summary": "Strong stack coverage; add metrics to your bullets first."}
+    return {"ok": True}
+
+
+class FakeOllama:
+    """
+    Local stand-in for Ollama's /api/generate (JSON and NDJSON streaming), so LLM
+    benchmarks run without a model. `latency_s` simulates generation time and is
+    spread over the streamed tokens.
+    """
+
+    def __init__(self, latency_s: float = 0.0, tokens: int = 20):
+        self.latency_s = latency_s
+        self.tokens = tokens
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; without this each call stalls ~40ms on delayed ACKs
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                if self.path != "/api/generate":
+                    self.send_error(404)
+                    return
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                server.requests += 1
+                text = json.dumps(canned_response(body.get("prompt", "")))
+                if body.get("stream"):
+                    self._stream(text)
+                else:
+                    time.sleep(server.latency_s)
+                    self._send(json.dumps({"model": body.get("model"), "response": text, "done": True}).encode())
+
+            def _send(self, payload: bytes):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _stream(self, text: str):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                size = max(1, -(-len(text) // server.tokens))
+                pieces = [text[i:i + size] for i in range(0, len(text), size)]
+                for i, piece in enumerate(pieces):
+                    time.sleep(server.latency_s / len(pieces))
+                    line = json.dumps({"response": piece, "done": i == len(pieces) - 1}) + "\n"
+                    self.wfile.write(f"{len(line.encode()):x}\r\n{line}\r\n".encode())
+                self.wfile.write(b"0\r\n\r\n")
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakeOllama":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,70 @@
+import itertools
+import random
+from typing import Any, Dict, List
+from ..services.job_sources import JobSource
+
+SKILLS = [
+    "Python", "Java", "React", "Docker", "Kubernetes", "AWS", "SQL", "PostgreSQL",
+    "TypeScript", "FastAPI", "Machine Learning", "Git", "Linux", "Redis", "GraphQL"
+]
+ROLES = ["Backend Engineer", "Data Scientist", "Frontend Developer", "DevOps Engineer", "ML Engineer"]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises"]
+
+
+def job_description(rng: random.Random) -> str:
+    skills = rng.sample(SKILLS, 4)
+    return (
+        f"We are hiring to build scalable services. You will work with {', '.join(skills[:3])} "
+        f"and {skills[3]} in a fast-moving team in Bangalore. 2+ years of experience preferred; "
+        "strong communication and ownership expected."
+    )
+
+
+def resume_text(rng: random.Random, paragraphs: int = 6) -> str:
+    lines = ["Jane Doe", "jane.doe@example.com | +91 98765 43210 | Bangalore, India", "EXPERIENCE"]
+    for _ in range(paragraphs):
+        skills = rng.sample(SKILLS, 3)
+        lines.append(
+            f"- Built {rng.choice(['APIs', 'pipelines', 'dashboards'])} with {skills[0]} and {skills[1]}, "
+            f"cutting latency by {rng.randint(10, 60)}% for {rng.randint(1, 50)}k users; deployed with {skills[2]}."
+        )
+    lines += ["SKILLS", ", ".join(rng.sample(SKILLS, 8))]
+    return "\n".join(lines)
+
+
+def resume_pdf(pages: int, seed: int = 0) -> bytes:
+    """A synthetic text resume PDF with the given number of pages."""
+    import fitz
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        page.insert_text((50, 60), resume_text(rng), fontsize=9)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+class CannedSource(JobSource):
+    """
+    Offline stand-in for the DuckDuckGo source: deterministic, unique results
+    shaped like DDGS hits, with no rate limit.
+    """
+    name = "canned"
+
+    def __init__(self, seed: int = 0):
+        self.rng = random.Random(seed)
+        self.counter = itertools.count()
+
+    def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        results = []
+        for _ in range(limit):
+            n = next(self.counter)
+            company = self.rng.choice(COMPANIES)
+            results.append({
+                "title": f"{query.title()} {n} at {company}",
+                "company": company,
+                "url": f"https://jobs.example.com/{n}",
+                "description": job_description(self.rng)
+            })
+        return results
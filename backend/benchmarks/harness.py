@@ -0,0 +1,76 @@
+import asyncio
+import inspect
+import resource
+import sys
+import time
+from typing import Any, Callable, Dict, List
+import numpy as np
+
+# Metrics compared against the baseline, and which direction is better
+COMPARED_METRICS = {"throughput": "higher", "p95_ms": "lower"}
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is the process-wide high-water mark: KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def summarize(latencies: List[float], items: int, total_s: float) -> Dict[str, Any]:
+    ms = np.asarray(latencies) * 1000
+    return {
+        "iterations": len(latencies),
+        "items": items,
+        "total_s": round(total_s, 4),
+        "throughput": round(items / total_s, 2) if total_s else 0.0,
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def measure(func: Callable, iterations: int, items_per_call: int = 1, warmup: int = 1) -> Dict[str, Any]:
+    """
+    Times `func()` (plain or async) `iterations` times after `warmup` untimed calls.
+    Throughput is items per second, where each call counts `items_per_call` items
+    (or the int the call returns, when it returns one).
+    """
+    async def run():
+        async def call():
+            result = func()
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+
+        for _ in range(warmup):
+            await call()
+
+        latencies, items = [], 0
+        started = time.perf_counter()
+        for _ in range(iterations):
+            t0 = time.perf_counter()
+            result = await call()
+            latencies.append(time.perf_counter() - t0)
+            items += result if isinstance(result, int) and not isinstance(result, bool) else items_per_call
+        return summarize(latencies, items, time.perf_counter() - started)
+
+    return asyncio.run(run())
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> List[str]:
+    """Regressions beyond `tolerance` (0.2 = 20%) for benchmarks present in both runs."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric, better in COMPARED_METRICS.items():
+            old, new = base.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = change < -tolerance if better == "higher" else change > tolerance
+            if worse:
+                regressions.append(f"{name}.{metric}: {old} -> {new} ({change:+.0%})")
+    return regressions
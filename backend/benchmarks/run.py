@@ -0,0 +1,272 @@
+"""
+CareerOS benchmark suite.
+
+    python -m backend.benchmarks.run                      # everything, compared to baseline.json
+    python -m backend.benchmarks.run --only llm,find_matches --sizes 1000,100000
+    python -m backend.benchmarks.run --save-baseline      # record the current numbers
+    python -m backend.benchmarks.run --check              # as in CI: fail if there is no baseline
+
+No baseline is committed (the numbers are machine-specific): the first run on a
+machine must use --save-baseline, and until then runs only report their numbers.
+
+Runs offline: LLM calls go to a local fake Ollama server and scraping uses a
+canned job source. All stores are created in a throwaway working directory.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+import numpy as np
+from .fake_ollama import FakeOllama
+from .harness import measure, compare, peak_rss_mb
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+# Chroma rejects very large single adds
+SEED_CHUNK = 5000
+
+
+def bench_nlp(args, results: Dict[str, Any]):
+    from ..services.profile_engine import extract_skills, extract_skills_many, generate_profile
+    from .fixtures import job_description, resume_text
+
+    rng = random.Random(0)
+    descriptions = [job_description(rng) for _ in range(256)]
+    resumes = itertools.cycle([resume_text(rng) for _ in range(32)])
+    texts = itertools.cycle(descriptions)
+
+    results["extract_skills"] = measure(lambda: extract_skills(next(texts)), args.iterations)
+    results["extract_skills_many[256]"] = measure(
+        lambda: extract_skills_many(descriptions), max(3, args.iterations // 10), items_per_call=len(descriptions)
+    )
+    results["generate_profile"] = measure(lambda: generate_profile(next(resumes)), args.iterations)
+
+
+def bench_parse(args, results: Dict[str, Any]):
+    from ..services.parser import parse_resume
+    from .fixtures import resume_pdf
+
+    for pages in (2, 24):
+        pdf = resume_pdf(pages)
+        results[f"parse_resume[{pages}p]"] = measure(lambda: parse_resume(pdf), args.iterations)
+
+
+def bench_ingest(args, results: Dict[str, Any]):
+    from ..services.scraper import scrape_many
+    from .fixtures import CannedSource, ROLES
+
+    source = CannedSource()
+
+    async def run():
+        stats = await scrape_many(ROLES, limit=50, sources=[source])
+        return stats["ingested"]
+
+    results["scrape_ingest"] = measure(run, max(3, args.iterations // 10))
+
+
+def _seed_jobs(count: int, start: int, dim: int, rng: np.random.Generator):
+    from ..db.vector_store import vector_store
+    from ..db.skill_index import skill_index
+    from .fixtures import SKILLS, COMPANIES, ROLES
+
+    for offset in range(start, start + count, SEED_CHUNK):
+        n = min(SEED_CHUNK, start + count - offset)
+        vectors = rng.normal(size=(n, dim)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        ids = [f"bench-job-{offset + i}" for i in range(n)]
+        metadatas = [
+            {
+                "title": f"{ROLES[i % len(ROLES)]} {offset + i}",
+                "company": COMPANIES[i % len(COMPANIES)],
+                "url": f"https://jobs.example.com/{offset + i}",
+                "skills": ", ".join(SKILLS[(offset + i + k) % len(SKILLS)] for k in range(4)),
+                "description": "Synthetic benchmark job",
+                "job_type": "Internship" if i % 3 == 0 else "Full Time",
+                "experience": "1+ Years",
+                "days_left": i % 14,
+            }
+            for i in range(n)
+        ]
+        vector_store.add_jobs(ids=ids, embeddings=vectors.tolist(), metadatas=metadatas)
+        skill_index.add_jobs(ids, metadatas)
+
+
+def bench_matching(args, results: Dict[str, Any]):
+    from ..core.config import settings
+    from ..db.vector_store import vector_store
+    from ..db.job_index import job_index
+    from ..services.matcher import find_matches
+
+    rng = np.random.default_rng(0)
+    profile = rng.normal(size=args.dim)
+    vector_store.add_profile("bench-profile", (profile / np.linalg.norm(profile)).tolist(), {"skills": "Python, Docker, AWS"})
+
+    seeded = 0
+    for size in sorted(args.sizes):
+        started = time.perf_counter()
+        _seed_jobs(size - seeded, seeded, args.dim, rng)
+        seeded = size
+        print(f"Seeded {size} jobs in {time.perf_counter() - started:.1f}s")
+
+        for backend in args.match_backends:
+            settings.MATCH_BACKEND = backend
+            setup_s = 0.0
+            if backend == "numpy":
+                started = time.perf_counter()
+                job_index.rebuild()
+                setup_s = time.perf_counter() - started
+            result = measure(lambda: find_matches("bench-profile", 20), args.iterations)
+            result["setup_s"] = round(setup_s, 3)
+            results[f"find_matches[{backend},{size}]"] = result
+
+
+def bench_audit(args, results: Dict[str, Any]):
+    from ..agents.ats_scorer import score_resume, rank_resumes
+    from .fixtures import job_description, resume_text
+
+    rng = random.Random(0)
+    jd = job_description(rng)
+    resumes = [resume_text(rng) for _ in range(100)]
+    texts = itertools.cycle(resumes)
+
+    results["ats_score"] = measure(lambda: score_resume(next(texts), jd), args.iterations)
+    results["rank_resumes[100]"] = measure(
+        lambda: rank_resumes(resumes, jd), max(3, args.iterations // 10), items_per_call=len(resumes)
+    )
+
+
+def bench_llm(args, results: Dict[str, Any]):
+    from ..services.post_mortem import analyze_rejection
+    from ..services.tailor import tailor_resume
+    from ..services.roadmap import generate_roadmap, stream_roadmap
+    from ..agents.resume_audit import audit_resume
+    from .fixtures import job_description, resume_text
+
+    rng = random.Random(0)
+    jd = job_description(rng)
+    resume = resume_text(rng)
+    skills = ["Python", "SQL", "Git"]
+
+    async def roadmap_stream():
+        async for _ in stream_roadmap(skills, "Python, Docker, Kubernetes, AWS", "Backend Engineer", use_cache=False):
+            pass
+
+    endpoints: Dict[str, Callable] = {
+        "llm:post_mortem": lambda: analyze_rejection("Backend Engineer", jd, skills, "No cloud", use_cache=False),
+        "llm:tailor": lambda: tailor_resume(skills, jd, "Backend Engineer", use_cache=False),
+        "llm:audit": lambda: audit_resume(resume, jd, use_cache=False, narrative=True),
+        "llm:roadmap": lambda: generate_roadmap(skills, "Python, Docker, Kubernetes, AWS", "Backend Engineer", use_cache=False),
+        "llm:roadmap_stream": roadmap_stream,
+    }
+    for name, call in endpoints.items():
+        results[name] = measure(call, args.iterations)
+
+
+SUITES = {
+    "nlp": bench_nlp,
+    "parse": bench_parse,
+    "ingest": bench_ingest,
+    "find_matches": bench_matching,
+    "audit": bench_audit,
+    "llm": bench_llm,
+}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True, text=True, timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="CareerOS benchmarks")
+    parser.add_argument("--only", default=",".join(SUITES), help=f"comma-separated suites: {', '.join(SUITES)}")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="job counts for find_matches")
+    parser.add_argument("--match-backends", default="chroma,numpy")
+    parser.add_argument("--dim", type=int, default=384, help="embedding size of seeded jobs")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="simulated generation time per LLM call")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="exit non-zero if there is no baseline to compare to")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression, 0.2 = 20%%")
+    parser.add_argument("--workdir", default=None, help="where stores are created (default: a temp dir)")
+    args = parser.parse_args(argv)
+    args.sizes = [int(s) for s in args.sizes.split(",") if s]
+    args.match_backends = [b for b in args.match_backends.split(",") if b]
+    args.output = os.path.abspath(args.output)
+    args.baseline = os.path.abspath(args.baseline)
+    if args.check and not args.save_baseline and not os.path.exists(args.baseline):
+        # Fail before spending minutes on suites that could not be checked
+        print(f"ERROR: no baseline at {args.baseline}; record one with --save-baseline first")
+        return 2
+
+    # Settings resolve their paths from the cwd on import, so move before importing the app
+    workdir = args.workdir or tempfile.mkdtemp(prefix="careeros-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+    from ..core.config import settings
+
+    results: Dict[str, Any] = {}
+    with FakeOllama(latency_s=args.llm_latency_ms / 1000) as ollama:
+        settings.OLLAMA_BASE_URL = ollama.url
+        for suite in args.only.split(","):
+            if suite not in SUITES:
+                parser.error(f"unknown suite {suite!r}")
+            print(f"--- {suite} ---")
+            SUITES[suite](args, results)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "peak_rss_mb": peak_rss_mb(),
+            "workdir": workdir,
+        },
+        "results": results
+    }
+    for name, result in results.items():
+        print(f"{name:32} {result['throughput']:>10} /s  p50 {result['p50_ms']:>9} ms  p95 {result['p95_ms']:>9} ms  p99 {result['p99_ms']:>9} ms")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(
+            f"WARNING: no baseline at {args.baseline}, so regressions were NOT checked. "
+            "Record one with --save-baseline (the first run on a machine needs it); --check makes this an error."
+        )
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
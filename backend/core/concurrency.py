@@ -0,0 +1,79 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+import time
+from typing import Any, Callable, Dict
+from .config import settings
+
+# Bounded pools so blocking work never runs on the event loop:
+#   - CPU pool: PDF parsing, spaCy NER, SentenceTransformer encodes
+#   - I/O pool: Chroma reads/writes and other blocking client calls
+_cpu_pool: Executor = None
+_io_pool: Executor = None
+_rate_limiters: Dict[str, "RateLimiter"] = {}
+
+
+def get_cpu_pool() -> Executor:
+    global _cpu_pool
+    if _cpu_pool is None:
+        if settings.CPU_POOL_KIND == "process":
+            # Each worker process loads its own models lazily on first use
+            _cpu_pool = ProcessPoolExecutor(max_workers=settings.CPU_POOL_SIZE)
+        else:
+            _cpu_pool = ThreadPoolExecutor(max_workers=settings.CPU_POOL_SIZE, thread_name_prefix="cpu")
+    return _cpu_pool
+
+
+def get_io_pool() -> Executor:
+    global _io_pool
+    if _io_pool is None:
+        _io_pool = ThreadPoolExecutor(max_workers=settings.IO_POOL_SIZE, thread_name_prefix="io")
+    return _io_pool
+
+
+async def run_cpu(func: Callable, *args, **kwargs) -> Any:
+    """Runs CPU-bound work in the CPU pool. With a process pool, func and args must be picklable."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_cpu_pool(), partial(func, *args, **kwargs))
+
+
+async def run_io(func: Callable, *args, **kwargs) -> Any:
+    """Runs blocking I/O (Chroma, sync HTTP clients) in the I/O thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_pool(), partial(func, *args, **kwargs))
+
+
+class RateLimiter:
+    """
+    Spaces out calls to one external source: at most `per_second` acquisitions
+    per second, shared by every coroutine using the same limiter.
+    """
+
+    def __init__(self, per_second: float):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self.next_slot = 0.0
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            now = time.monotonic()
+            wait = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def get_rate_limiter(source: str, per_second: float) -> RateLimiter:
+    """The process-wide limiter for a source, created on first use."""
+    if source not in _rate_limiters:
+        _rate_limiters[source] = RateLimiter(per_second)
+    return _rate_limiters[source]
+
+
+def shutdown_pools():
+    global _cpu_pool, _io_pool
+    for pool in (_cpu_pool, _io_pool):
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    _cpu_pool = None
+    _io_pool = None
@@ -7,9 +7,110 @@ class Settings:
     
     # Vector Store
     CHROMA_PERSIST_DIRECTORY: str = os.path.join(os.getcwd(), "chroma_db")
+
+    # Local SQLite side-stores (dedup index, caches, logs)
+    DATA_DIRECTORY: str = os.path.join(os.getcwd(), "data")
+    DEDUP_DB_PATH: str = os.path.join(DATA_DIRECTORY, "dedup_index.sqlite3")
+    EVENT_LOG_DB_PATH: str = os.path.join(DATA_DIRECTORY, "events.sqlite3")
+    TASK_DB_PATH: str = os.path.join(DATA_DIRECTORY, "tasks.sqlite3")
     
     # Models
     EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
     NER_MODEL: str = "en_core_web_sm"
+    NER_DISABLED_COMPONENTS: list = ["parser", "lemmatizer"]
+    NER_BATCH_SIZE: int = 32
+    NER_N_PROCESS: int = 1
+    AUTO_DOWNLOAD_NER_MODEL: bool = True  # pip-download NER_MODEL on first use if missing
+
+    # LLM (Ollama)
+    OLLAMA_BASE_URL: str = "http://localhost:11434"
+    LLM_MODEL: str = "gemma3:1b"
+    LLM_TEMPERATURE: float = 0.1
+    LLM_TIMEOUT_S: float = 120.0
+    LLM_CONNECT_TIMEOUT_S: float = 5.0
+    LLM_MAX_RETRIES: int = 2
+    LLM_RETRY_BACKOFF_S: float = 0.5  # doubled on every retry
+    LLM_MAX_CONCURRENCY: int = 2  # calls Ollama runs at once; the rest queue in llm_scheduler
+    LLM_MAX_QUEUE: int = 32  # when full, lower-priority waiters are evicted, else 429
+    LLM_QUEUE_TIMEOUT_S: float = 60.0  # per call: queued longer than this gets 503
+    LLM_PRIORITIES: dict = {"tailor": 0, "post_mortem": 0, "audit": 1, "roadmap": 2, "background": 3}  # lower runs first
+    LLM_DEFAULT_PRIORITY: int = 1
+    LLM_POOL_SIZE: int = 8  # keep-alive connections to Ollama
+
+    # Async roadmap/audit jobs (submit, then poll for the result)
+    TASK_WORKERS: int = 2  # tasks run at once; their LLM calls still go through llm_scheduler
+    TASK_RESULT_TTL_S: float = 24 * 3600  # finished tasks are kept this long
+
+    # LLM response cache (memory LRU + SQLite disk tier)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_DB_PATH: str = os.path.join(DATA_DIRECTORY, "llm_cache.sqlite3")
+    LLM_CACHE_MEMORY_ENTRIES: int = 1024
+    LLM_CACHE_DISK_ENTRIES: int = 50000
+    LLM_CACHE_TTL_S: float = 7 * 24 * 3600
+
+    # Startup
+    WARMUP_MODELS_ON_STARTUP: bool = True  # load models in a background thread after boot
+    IMPORT_TIME_BUDGET_S: float = 2.0  # warn if importing backend.main takes longer
+
+    # Observability
+    LOG_SAMPLE_RATE: float = 0.05  # share of successful requests logged; errors and slow requests always are
+    LOG_SLOW_REQUEST_S: float = 2.0
+
+    # Resume parsing
+    MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024
+    PARSER_PARALLEL_MIN_PAGES: int = 8  # extract pages in parallel from this many pages up
+    PARSER_WORKERS: int = 4  # processes used for parallel page extraction
+
+    # Ingestion
+    SCRAPE_CONCURRENCY: int = 4  # searches in flight at once
+    SCRAPE_RATE_LIMIT_PER_S: float = 1.0  # per source, DDG blocks aggressive clients
+    SCRAPE_INGEST_WORKERS: int = 2
+    INGEST_BATCH_SIZE: int = 256  # jobs written per bulk Chroma add
+    # Demo only: fill salary/applicants/etc. a source doesn't provide with made-up values.
+    # Off so scraped and imported jobs never show invented data (importer: --mock-metadata)
+    MOCK_JOB_METADATA: bool = False
+    EMBEDDING_BATCH_SIZE: int = 64  # texts per SentenceTransformer forward pass
+
+    # Embedding cache (SQLite blob table keyed on model + text hash)
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_DB_PATH: str = os.path.join(DATA_DIRECTORY, "embedding_cache.sqlite3")
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 200000
+    EMBEDDING_CACHE_DTYPE: str = "float16"  # "float16" halves storage, "float32" is lossless
+
+    # Matching
+    MATCH_BATCH_SIZE: int = 64  # profiles per multi-query in find_matches_many
+    MATCH_SKILL_WEIGHT: float = 0.3  # share of the score from skill overlap (0 = vector similarity only)
+    MATCH_OVERFETCH: int = 2  # candidates fetched per requested match, before re-rank and dedup
+    MATCH_MAX_FETCH: int = 500
+    MATCH_BACKEND: str = "chroma"  # "chroma" (HNSW query) or "numpy" (exact top-k, db/job_index.py)
+    JOB_INDEX_DIRECTORY: str = os.path.join(DATA_DIRECTORY, "job_index")
+    JOB_INDEX_REBUILD_S: int = 60 * 60
+
+    # Resume audit
+    # Scores are always local; the LLM only writes the summary. Off for the blocking
+    # /audit call so it returns at once; /audit/stream, /audit/batch and audit jobs
+    # write it unless the request sets narrative=false
+    AUDIT_LLM_NARRATIVE: bool = False
+    AUDIT_BATCH_MAX_RESUMES: int = 500
+    AUDIT_BATCH_TOP_K: int = 5  # batch audits get an LLM summary for this many top-ranked resumes
+    AUDIT_BATCH_KEYWORD_WEIGHT: float = 0.5  # share of the batch match score from keyword coverage
+
+    # Roadmap agents
+    ROADMAP_GAP_ANALYSIS: str = "local"  # "local" (skill set difference) or "llm"
+    # "off", "on" (blocking: a REJECT sends the roadmap back to the architect) or
+    # "async" (after the response: a REJECT drops the cached fragments / completion)
+    ROADMAP_REVIEWER: str = "off"
+    ROADMAP_MAX_REVISIONS: int = 1  # architect re-runs a rejected roadmap at most this many times
+    ROADMAP_FRAGMENT_CACHE: bool = True  # compose roadmaps from cached per-skill fragments
+    ROADMAP_FRAGMENT_DB_PATH: str = os.path.join(DATA_DIRECTORY, "roadmap_fragments.sqlite3")
+
+    # Worker pools (keep blocking work off the event loop)
+    CPU_POOL_KIND: str = "thread"  # "thread" or "process"
+    CPU_POOL_SIZE: int = 4  # parse / NER / encode workers
+    IO_POOL_SIZE: int = 16  # Chroma and sync HTTP calls
+
+    # Skills
+    # Optional JSON file with extra skills/aliases, e.g. {"kubernetes": ["k8s"]}
+    SKILL_DICTIONARY_PATH: str = ""
 
 settings = Settings()
@@ -0,0 +1,106 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List
+from .config import settings
+
+
+class ModelRegistry:
+    """
+    Lazily loads heavy models (spaCy, SentenceTransformer, the LLM client, compiled graphs).
+
+    Nothing is loaded at import time: each model is built on first `get()` or by
+    `warm_up()`, which the API runs in a background thread on startup.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._models: Dict[str, Any] = {}
+        self._load_seconds: Dict[str, float] = {}
+        self._errors: Dict[str, str] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        self._loaders[name] = loader
+        self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str) -> Any:
+        if name in self._models:
+            return self._models[name]
+        with self._locks[name]:
+            # Another thread may have finished loading while we waited
+            if name not in self._models:
+                started = time.perf_counter()
+                try:
+                    self._models[name] = self._loaders[name]()
+                except Exception as e:
+                    self._errors[name] = str(e)
+                    raise
+                self._errors.pop(name, None)
+                self._load_seconds[name] = round(time.perf_counter() - started, 3)
+                print(f"Model '{name}' loaded in {self._load_seconds[name]}s")
+        return self._models[name]
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def warm_up(self, names: List[str] = None):
+        for name in names or list(self._loaders):
+            try:
+                self.get(name)
+            except Exception as e:
+                print(f"Warm-up failed for '{name}': {e}")
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "loaded": name in self._models,
+                "load_seconds": self._load_seconds.get(name),
+                "error": self._errors.get(name)
+            }
+            for name in self._loaders
+        }
+
+    def ready(self) -> bool:
+        return all(name in self._models for name in self._loaders)
+
+
+def _load_nlp():
+    import spacy
+    # Only NER is used, so the dependency parser and lemmatizer are switched off.
+    try:
+        return spacy.load(settings.NER_MODEL, disable=settings.NER_DISABLED_COMPONENTS)
+    except OSError:
+        if not settings.AUTO_DOWNLOAD_NER_MODEL:
+            raise
+        import subprocess
+        import sys
+        subprocess.check_call([sys.executable, "-m", "spacy", "download", settings.NER_MODEL])
+        return spacy.load(settings.NER_MODEL, disable=settings.NER_DISABLED_COMPONENTS)
+
+
+def _load_embedding_model():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(settings.EMBEDDING_MODEL)
+
+
+def _load_llm():
+    from ..services.llm_client import OllamaClient
+    return OllamaClient()
+
+
+registry = ModelRegistry()
+registry.register("nlp", _load_nlp)
+registry.register("embedding_model", _load_embedding_model)
+registry.register("llm", _load_llm)
+
+
+def get_nlp():
+    return registry.get("nlp")
+
+
+def get_embedding_model():
+    return registry.get("embedding_model")
+
+
+def get_llm():
+    return registry.get("llm")
@@ -0,0 +1,172 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from ..core.config import settings
+from ..core.metrics import log_event
+from .vector_store import vector_store
+
+# SQLite caps the number of bound parameters per statement
+_SQL_CHUNK = 900
+# Keys claimed by filter_new but never stored or released (a crashed run) free up after this long
+_RESERVATION_TTL_S = 60 * 60
+
+_TRACKING_PARAMS = {"ref", "refid", "trk", "trackingid", "fbclid", "gclid"}
+
+
+def normalize_url(url: str) -> str:
+    """Lowercases scheme/host, drops fragments, tracking params and trailing slashes."""
+    parts = urlsplit(url.strip())
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not (k.lower().startswith("utm_") or k.lower() in _TRACKING_PARAMS)
+    ]
+    return urlunsplit((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        parts.path.rstrip("/"),
+        urlencode(sorted(query)),
+        ""
+    ))
+
+
+def _normalize_text(text: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", (text or "").lower()).split())
+
+
+def job_keys(job: Dict[str, Any]) -> List[str]:
+    """
+    Dedup keys for a job posting: normalized URL, content hash and (title, company).
+    A job is a duplicate if ANY of its keys is already known.
+    """
+    keys = []
+    url = job.get("url")
+    if url and url != "#":
+        keys.append("url:" + normalize_url(url))
+    content = _normalize_text(f"{job.get('title', '')} {job.get('description', '')}")
+    if content:
+        keys.append("content:" + hashlib.sha1(content.encode("utf-8")).hexdigest())
+    title = _normalize_text(job.get("title", ""))
+    company = _normalize_text(job.get("company", ""))
+    if title and company and company != "unknown company":
+        keys.append(f"tc:{title}|{company}")
+    return keys
+
+
+class DedupIndex:
+    """
+    Persisted index of every job key ever ingested (local SQLite table).
+    Lookups are one bulk IN query per batch instead of one Chroma filter scan per job.
+
+    filter_new reserves the keys of the candidates it lets through (rows with no
+    job_id yet) in the same transaction as the lookup, so concurrent workers or
+    import runs can't both take the same posting. Ingestion then either stores a
+    job (mark_seen fills in its id) or hands its keys back with release.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen_jobs ("
+            "key TEXT PRIMARY KEY, job_id TEXT, created_at REAL)"
+        )
+        self.conn.commit()
+        self.lock = threading.Lock()
+        self._seeded = False
+
+    def _seed_from_store(self):
+        # One-off backfill so jobs ingested before the index existed are still known
+        with self.lock:
+            if self._seeded:
+                return
+            self._seeded = True
+            has_rows = self.conn.execute("SELECT 1 FROM seen_jobs LIMIT 1").fetchone()
+        if has_rows or vector_store.jobs_collection.count() == 0:
+            return
+        existing = vector_store.jobs_collection.get(include=["metadatas"])
+        self.mark_seen([
+            {"id": job_id, **(metadata or {})}
+            for job_id, metadata in zip(existing["ids"], existing["metadatas"])
+        ])
+        print(f"Dedup index seeded with {len(existing['ids'])} existing jobs.")
+
+    def _known_keys(self, keys: List[str]) -> set:
+        # Caller holds the lock
+        known = set()
+        for start in range(0, len(keys), _SQL_CHUNK):
+            chunk = keys[start:start + _SQL_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT key FROM seen_jobs WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+            known.update(row[0] for row in rows)
+        return known
+
+    def known_keys(self, keys: List[str]) -> set:
+        with self.lock:
+            return self._known_keys(keys)
+
+    def filter_new(self, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Drops candidates already ingested, reserved by another run, or duplicated
+        earlier in the same batch, and reserves the keys of the rest.
+        Every candidate returned must end in mark_seen or release.
+        """
+        self._seed_from_store()
+        candidate_keys = [job_keys(c) for c in candidates]
+        now = time.time()
+        new_jobs, reserved = [], []
+        with self.lock:
+            # IMMEDIATE takes SQLite's write lock up front, so the check and the
+            # reservation are one step for other processes (e.g. an import CLI) too
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute(
+                    "DELETE FROM seen_jobs WHERE job_id IS NULL AND created_at < ?", (now - _RESERVATION_TTL_S,)
+                )
+                known = self._known_keys(list({k for keys in candidate_keys for k in keys}))
+                for candidate, keys in zip(candidates, candidate_keys):
+                    if any(k in known for k in keys):
+                        continue
+                    # Later candidates in this batch with the same keys are duplicates too
+                    known.update(keys)
+                    reserved.extend((k, None, now) for k in keys)
+                    new_jobs.append(candidate)
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO seen_jobs (key, job_id, created_at) VALUES (?, ?, ?)", reserved
+                )
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
+        # One sampled line per batch rather than one per duplicate
+        log_event("dedup_batch", sample_rate=settings.LOG_SAMPLE_RATE, candidates=len(candidates), duplicates=len(candidates) - len(new_jobs))
+        return new_jobs
+
+    def mark_seen(self, jobs: List[Dict[str, Any]]):
+        """Records stored jobs (with their "id"), confirming keys filter_new reserved."""
+        now = time.time()
+        rows = [(key, job.get("id"), now) for job in jobs for key in job_keys(job)]
+        with self.lock:
+            self.conn.executemany(
+                "INSERT INTO seen_jobs (key, job_id, created_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET job_id = excluded.job_id WHERE seen_jobs.job_id IS NULL",
+                rows
+            )
+            self.conn.commit()
+
+    def release(self, candidates: List[Dict[str, Any]]):
+        """Frees the reservations of candidates that were not stored (rejected or failed)."""
+        keys = [(key,) for candidate in candidates for key in job_keys(candidate)]
+        with self.lock:
+            self.conn.executemany("DELETE FROM seen_jobs WHERE key = ? AND job_id IS NULL", keys)
+            self.conn.commit()
+
+
+dedup_index = DedupIndex(settings.DEDUP_DB_PATH)
@@ -0,0 +1,140 @@
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from ..core.config import settings
+from .vector_store import vector_store
+
+_EVENT_COLUMNS = ["id", "profile_id", "job_id", "outcome", "reason", "created_at"]
+
+
+def _normalize_outcome(outcome: str) -> str:
+    return (outcome or "").strip().lower()
+
+
+class EventLog:
+    """
+    Append-only log of application outcomes (local SQLite, WAL mode).
+    Replaces the "Job:...|Outcome:...;" history string kept in profile metadata.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS application_events ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, profile_id TEXT NOT NULL, job_id TEXT NOT NULL, "
+            "outcome TEXT NOT NULL, reason TEXT, created_at REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_events_profile ON application_events (profile_id, outcome, created_at)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_events_job ON application_events (job_id)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_events_outcome ON application_events (outcome)")
+        self.conn.commit()
+        self.lock = threading.Lock()
+
+    def append(self, profile_id: str, job_id: str, outcome: str, reason: Optional[str] = None) -> int:
+        with self.lock:
+            cursor = self.conn.execute(
+                "INSERT INTO application_events (profile_id, job_id, outcome, reason, created_at) VALUES (?, ?, ?, ?, ?)",
+                (profile_id, job_id, _normalize_outcome(outcome), reason, time.time())
+            )
+            self.conn.commit()
+            return cursor.lastrowid
+
+    def append_many(self, events: List[Dict[str, Any]]):
+        """Writes a batch of events in one transaction. Each needs profile_id, job_id and outcome."""
+        now = time.time()
+        with self.lock:
+            self.conn.executemany(
+                "INSERT INTO application_events (profile_id, job_id, outcome, reason, created_at) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (e["profile_id"], e["job_id"], _normalize_outcome(e["outcome"]), e.get("reason"), e.get("created_at", now))
+                    for e in events
+                ]
+            )
+            self.conn.commit()
+
+    def _select(self, where: str, params: list, limit: Optional[int]) -> List[Dict[str, Any]]:
+        sql = f"SELECT {', '.join(_EVENT_COLUMNS)} FROM application_events WHERE {where} ORDER BY created_at DESC, id DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params = [*params, limit]
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [dict(zip(_EVENT_COLUMNS, row)) for row in rows]
+
+    def for_profile(self, profile_id: str, outcome: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Events for a profile, newest first, e.g. all rejections: for_profile(pid, "rejected")."""
+        if outcome:
+            return self._select("profile_id = ? AND outcome = ?", [profile_id, _normalize_outcome(outcome)], limit)
+        return self._select("profile_id = ?", [profile_id], limit)
+
+    def for_job(self, job_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self._select("job_id = ?", [job_id], limit)
+
+    def outcome_counts(self, profile_id: str) -> Dict[str, int]:
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT outcome, COUNT(*) FROM application_events WHERE profile_id = ? GROUP BY outcome",
+                (profile_id,)
+            ).fetchall()
+        return dict(rows)
+
+
+def parse_history(history: str) -> List[Dict[str, Any]]:
+    """Parses the legacy "Job:<id>|Outcome:<outcome>|Reason:<reason>;" metadata string."""
+    events = []
+    for entry in history.split(";"):
+        fields = {}
+        for part in entry.split("|"):
+            key, sep, value = part.partition(":")
+            if sep:
+                fields[key.strip().lower()] = value.strip()
+        if fields.get("job") and fields.get("outcome"):
+            reason = fields.get("reason")
+            events.append({
+                "job_id": fields["job"],
+                "outcome": fields["outcome"],
+                "reason": None if reason in (None, "", "None") else reason
+            })
+    return events
+
+
+def migrate_history_strings(log: "EventLog" = None) -> int:
+    """
+    One-off migration: moves every profile's application_history string into the
+    event log and blanks it in Chroma, so running it again is a no-op.
+    """
+    log = log or event_log
+    data = vector_store.profiles_collection.get(include=["metadatas"])
+    migrated = 0
+    for profile_id, metadata in zip(data["ids"], data["metadatas"]):
+        history = (metadata or {}).get("application_history")
+        if not history:
+            continue
+        events = [{"profile_id": profile_id, **event} for event in parse_history(history)]
+        log.append_many(events)
+        vector_store.profiles_collection.update(
+            ids=[profile_id],
+            metadatas=[{**metadata, "application_history": ""}]
+        )
+        migrated += len(events)
+        print(f"Migrated {len(events)} events for profile {profile_id}")
+    return migrated
+
+
+event_log = EventLog(settings.EVENT_LOG_DB_PATH)
+
+
+if __name__ == "__main__":
+    # python -m backend.db.event_log migrate
+    parser = argparse.ArgumentParser(description="Application event log maintenance")
+    parser.add_argument("command", choices=["migrate"])
+    args = parser.parse_args()
+    if args.command == "migrate":
+        print(f"Done: {migrate_history_strings()} events migrated")
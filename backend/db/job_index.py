@@ -0,0 +1,271 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from ..core.config import settings
+from .vector_store import vector_store
+
+# Metadata fields find_matches returns; descriptions stay in Chroma
+HOT_FIELDS = [
+    "title", "company", "skills", "url", "applicants", "days_left",
+    "salary", "job_type", "experience", "posted_date"
+]
+
+# Fields find_matches filters on, also kept as arrays so a filter is a vectorised mask:
+# text as category codes (-1: missing), numbers as floats (NaN: missing)
+TEXT_FILTERS = ["job_type", "experience"]
+NUMERIC_FILTERS = ["days_left"]
+
+# Page size when reading the jobs collection during a rebuild
+_REBUILD_PAGE = 5000
+
+
+def _matches(value: Any, condition: Any) -> bool:
+    # The subset of Chroma's `where` syntax find_matches uses: equality and $gte
+    if isinstance(condition, dict):
+        return value is not None and all(
+            (op == "$gte" and value >= bound) or (op == "$eq" and value == bound)
+            for op, bound in condition.items()
+        )
+    return value == condition
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scales each row to unit length (zero rows stay zero), so dot products are cosines."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _number(value: Any) -> float:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else np.nan
+
+
+def _filter_columns(metadatas: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """TEXT_FILTERS as (codes, label -> code) and NUMERIC_FILTERS as float arrays, row-aligned with metadatas."""
+    columns: Dict[str, Any] = {}
+    for field in TEXT_FILTERS:
+        labels: Dict[Any, int] = {}
+        codes = np.fromiter(
+            (labels.setdefault(m[field], len(labels)) if m.get(field) is not None else -1 for m in metadatas),
+            dtype=np.int32, count=len(metadatas)
+        )
+        columns[field] = (codes, labels)
+    for field in NUMERIC_FILTERS:
+        columns[field] = np.fromiter((_number(m.get(field)) for m in metadatas), dtype=np.float64, count=len(metadatas))
+    return columns
+
+
+def _condition_mask(columns: Dict[str, Any], metadatas: List[Dict[str, Any]], field: str, condition: Any) -> np.ndarray:
+    ops = condition if isinstance(condition, dict) else {"$eq": condition}
+    if field in TEXT_FILTERS and set(ops) == {"$eq"}:
+        codes, labels = columns[field]
+        code = labels.get(ops["$eq"])
+        return codes == code if code is not None else np.zeros(len(codes), dtype=bool)
+    if field in NUMERIC_FILTERS and set(ops) <= {"$eq", "$gte"} and all(isinstance(b, (int, float)) for b in ops.values()):
+        values = columns[field]
+        mask = np.ones(len(values), dtype=bool)
+        for op, bound in ops.items():
+            # NaN (missing) compares False, like _matches on None
+            mask &= values >= bound if op == "$gte" else values == bound
+        return mask
+    # Anything else: per row, as Chroma would evaluate it
+    return np.fromiter((_matches(m.get(field), condition) for m in metadatas), dtype=bool, count=len(metadatas))
+
+
+class JobIndex:
+    """
+    Exact cosine top-k over every job embedding, as an alternative to Chroma's HNSW query.
+
+    Embeddings live in a normalized float32 .npy file opened as a memory map; ids and
+    hot metadata are parallel lists in a JSON sidecar, and the filter fields are also
+    held as arrays (see _filter_columns), so `where` is a boolean mask before top-k.
+    Ingested rows go to a small in-memory delta that is searched alongside the map,
+    and the index is rebuilt from jobs_collection (the source of truth) every
+    JOB_INDEX_REBUILD_S seconds, in a background thread while searches keep using
+    the previous files.
+    """
+
+    def __init__(self, directory: str):
+        self.matrix_path = os.path.join(directory, "job_index.npy")
+        self.meta_path = os.path.join(directory, "job_index.json")
+        os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+        # Held for the whole of a rebuild, so only one runs at a time
+        self.build_lock = threading.Lock()
+        self.matrix: np.ndarray = None
+        self.ids: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self.columns: Dict[str, Any] = _filter_columns([])
+        # Rows appended since the last rebuild (copy-on-write, replaced on every append)
+        self.delta: np.ndarray = None
+        self.delta_ids: List[str] = []
+        self.delta_metadatas: List[Dict[str, Any]] = []
+        self.delta_columns: Dict[str, Any] = _filter_columns([])
+        self.built_at = 0.0
+
+    def _load(self) -> bool:
+        if not (os.path.exists(self.matrix_path) and os.path.exists(self.meta_path)):
+            return False
+        with open(self.meta_path) as f:
+            meta = json.load(f)
+        matrix = np.load(self.matrix_path, mmap_mode="r")
+        if len(meta["ids"]) != matrix.shape[0]:
+            print("Job index files are out of sync, rebuilding")
+            return False
+        self.matrix = matrix
+        self.ids = meta["ids"]
+        self.metadatas = meta["metadatas"]
+        self.columns = _filter_columns(self.metadatas)
+        self.built_at = meta["built_at"]
+        self._trim_delta(set(self.ids))
+        return True
+
+    def _trim_delta(self, known: set):
+        # Caller holds the lock. Drops delta rows the new files already contain
+        keep = [i for i, job_id in enumerate(self.delta_ids) if job_id not in known]
+        if len(keep) == len(self.delta_ids):
+            return
+        self.delta = self.delta[keep] if keep else None
+        self.delta_ids = [self.delta_ids[i] for i in keep]
+        self.delta_metadatas = [self.delta_metadatas[i] for i in keep]
+        self.delta_columns = _filter_columns(self.delta_metadatas)
+
+    def _save(self, matrix: np.ndarray, ids: List[str], metadatas: List[Dict[str, Any]], built_at: float) -> np.ndarray:
+        # Write to temp files and swap them in, so a crash never leaves a torn index.
+        # Open maps of the old file stay valid after the replace (the inode lives on).
+        np.save(self.matrix_path + ".tmp.npy", np.ascontiguousarray(matrix, dtype=np.float32))
+        with open(self.meta_path + ".tmp", "w") as f:
+            json.dump({"ids": ids, "metadatas": metadatas, "built_at": built_at}, f)
+        os.replace(self.matrix_path + ".tmp.npy", self.matrix_path)
+        os.replace(self.meta_path + ".tmp", self.meta_path)
+        return np.load(self.matrix_path, mmap_mode="r")
+
+    def rebuild(self):
+        """Re-reads every job from Chroma and rewrites the index files."""
+        with self.build_lock:
+            self._rebuild()
+
+    def _rebuild(self):
+        started = time.perf_counter()
+        ids, metadatas, embeddings = [], [], []
+        offset = 0
+        while True:
+            page = vector_store.jobs_collection.get(
+                include=["embeddings", "metadatas"], limit=_REBUILD_PAGE, offset=offset
+            )
+            if not page["ids"]:
+                break
+            ids.extend(page["ids"])
+            metadatas.extend({k: m[k] for k in HOT_FIELDS if k in m} for m in page["metadatas"])
+            embeddings.extend(page["embeddings"])
+            offset += len(page["ids"])
+
+        if embeddings:
+            matrix = normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+        built_at = time.time()
+        matrix = self._save(matrix, ids, metadatas, built_at)
+        columns = _filter_columns(metadatas)
+
+        with self.lock:
+            self.matrix, self.ids, self.metadatas, self.columns, self.built_at = matrix, ids, metadatas, columns, built_at
+            # Rows appended while Chroma was being read may be missing from this build
+            self._trim_delta(set(ids))
+        print(f"Job index rebuilt: {len(ids)} jobs in {time.perf_counter() - started:.2f}s")
+
+    def _rebuild_in_background(self):
+        try:
+            self._rebuild()
+        except Exception as e:
+            print(f"Job index rebuild failed: {e}")
+        finally:
+            self.build_lock.release()
+
+    def ensure_ready(self):
+        if self.matrix is None:
+            # First use: callers wait for a single load or build
+            with self.build_lock:
+                if self.matrix is None:
+                    with self.lock:
+                        loaded = self._load()
+                    if not loaded:
+                        self._rebuild()
+            return
+        if time.time() - self.built_at > settings.JOB_INDEX_REBUILD_S and self.build_lock.acquire(blocking=False):
+            # Stale: refresh off the request path; searches use the current index meanwhile
+            threading.Thread(target=self._rebuild_in_background, name="job-index-rebuild", daemon=True).start()
+
+    def append(self, ids: List[str], embeddings: List[List[float]], metadatas: List[Dict[str, Any]]):
+        """
+        Adds freshly ingested jobs to the delta; the next rebuild merges them into the files.
+        Also before the first load or build: rows the files turn out to contain are dropped then.
+        """
+        if not ids:
+            return
+        rows = normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        hot = [{k: m[k] for k in HOT_FIELDS if k in m} for m in metadatas]
+        with self.lock:
+            self.delta = rows if self.delta is None else np.concatenate([self.delta, rows])
+            self.delta_ids = self.delta_ids + list(ids)
+            self.delta_metadatas = self.delta_metadatas + hot
+            self.delta_columns = _filter_columns(self.delta_metadatas)
+
+    def _rows_where(self, columns: Dict[str, Any], metadatas: List[Dict[str, Any]], where: Dict[str, Any]) -> np.ndarray:
+        mask = np.ones(len(metadatas), dtype=bool)
+        for condition in where.get("$and", [where]):
+            for field, cond in condition.items():
+                mask &= _condition_mask(columns, metadatas, field, cond)
+        return np.flatnonzero(mask)
+
+    def _score(self, queries: np.ndarray, matrix: np.ndarray, columns: Dict[str, Any], metadatas: List[Dict[str, Any]], where: Optional[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Scores of one segment (files or delta) and the segment rows they belong to."""
+        if matrix is None or matrix.shape[0] == 0:
+            return np.zeros((len(queries), 0), dtype=np.float32), np.zeros(0, dtype=np.int64)
+        if where:
+            # Filtered rows are scored alone, so k always comes from the filtered set
+            rows = self._rows_where(columns, metadatas, where)
+            if len(rows) == 0:
+                return np.zeros((len(queries), 0), dtype=np.float32), rows
+            return queries @ matrix[rows].T, rows
+        return queries @ matrix.T, np.arange(matrix.shape[0])
+
+    def search(self, query_embeddings: List[List[float]], k: int, where: Optional[Dict[str, Any]] = None) -> List[List[Tuple[str, Dict[str, Any], float]]]:
+        """
+        Returns, per query, the top k jobs as (job_id, metadata, cosine similarity),
+        best first. `where` restricts the candidates before scoring, like Chroma's.
+        """
+        self.ensure_ready()
+        with self.lock:
+            matrix, ids, metadatas, columns = self.matrix, self.ids, self.metadatas, self.columns
+            delta, delta_ids, delta_metadatas, delta_columns = self.delta, self.delta_ids, self.delta_metadatas, self.delta_columns
+
+        queries = normalize_rows(np.asarray(query_embeddings, dtype=np.float32))
+        base_scores, base_rows = self._score(queries, matrix, columns, metadatas, where)
+        delta_scores, delta_rows = self._score(queries, delta, delta_columns, delta_metadatas, where)
+        scores = np.concatenate([base_scores, delta_scores], axis=1) if delta_rows.size else base_scores
+        # Positions past the files' rows refer to the delta
+        positions = np.concatenate([base_rows, delta_rows + len(ids)]) if delta_rows.size else base_rows
+        if positions.size == 0:
+            return [[] for _ in query_embeddings]
+        base_count = len(ids)
+        k = min(k, positions.size)
+
+        def hit(p: int, score: float) -> Tuple[str, Dict[str, Any], float]:
+            if p < base_count:
+                return ids[p], metadatas[p], score
+            return delta_ids[p - base_count], delta_metadatas[p - base_count], score
+
+        results = []
+        for row in scores:
+            # argpartition finds the top k in O(n); only those k get sorted
+            top = np.argpartition(-row, k - 1)[:k]
+            top = top[np.argsort(-row[top])]
+            results.append([hit(int(p), float(row[i])) for p, i in zip(positions[top], top)])
+        return results
+
+
+job_index = JobIndex(settings.JOB_INDEX_DIRECTORY)
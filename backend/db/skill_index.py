@@ -0,0 +1,70 @@
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set
+from .vector_store import vector_store
+from ..services.skill_matcher import skill_matcher
+
+# Page size when reading the jobs collection to build the index
+_BUILD_PAGE = 5000
+
+
+def _job_skills(metadata: dict) -> List[str]:
+    # Job metadata stores display names ("AWS, Python"); index their canonical keywords
+    return skill_matcher.canonical_list(s for s in metadata.get("skills", "").split(",") if s.strip())
+
+
+class SkillIndex:
+    """
+    In-memory inverted index: canonical skill -> ids of the jobs requiring it.
+    Built from jobs_collection on first use and kept current by ingestion.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.jobs_by_skill: Dict[str, Set[str]] = defaultdict(set)
+        self.skill_counts: Dict[str, int] = {}
+        self._built = False
+
+    def _build(self):
+        offset = 0
+        while True:
+            page = vector_store.jobs_collection.get(include=["metadatas"], limit=_BUILD_PAGE, offset=offset)
+            if not page["ids"]:
+                break
+            self._add(page["ids"], page["metadatas"])
+            offset += len(page["ids"])
+        self._built = True
+
+    def _add(self, ids: Iterable[str], metadatas: Iterable[dict]):
+        for job_id, metadata in zip(ids, metadatas):
+            skills = _job_skills(metadata)
+            self.skill_counts[job_id] = len(skills)
+            for skill in skills:
+                self.jobs_by_skill[skill].add(job_id)
+
+    def add_jobs(self, ids: List[str], metadatas: List[dict]):
+        with self.lock:
+            # Before the first build these rows will be picked up from Chroma anyway
+            if self._built:
+                self._add(ids, metadatas)
+
+    def overlap(self, profile_skills: List[str], job_ids: List[str]) -> Dict[str, float]:
+        """
+        Fraction of each job's skills that the profile has (0.0 - 1.0).
+        Costs one set lookup per (profile skill, job), regardless of corpus size.
+        """
+        with self.lock:
+            if not self._built:
+                self._build()
+            postings = [self.jobs_by_skill.get(skill, ()) for skill in profile_skills]
+            scores = {}
+            for job_id in job_ids:
+                total = self.skill_counts.get(job_id, 0)
+                if total:
+                    scores[job_id] = sum(job_id in jobs for jobs in postings) / total
+                else:
+                    scores[job_id] = 0.0
+            return scores
+
+
+skill_index = SkillIndex()
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+from ..core.config import settings
+
+_TASK_COLUMNS = ["id", "kind", "status", "params", "no_cache", "result", "error", "created_at", "started_at", "finished_at"]
+
+# A submission matching a task in one of these states gets that task back
+_REUSABLE_STATUSES = ("queued", "running", "done")
+_IN_FLIGHT_STATUSES = ("queued", "running")
+
+
+def make_dedup_key(kind: str, params: Dict[str, Any], no_cache: bool = False) -> str:
+    # no_cache is part of the key: a cache-bypassing submission never shares a cached run
+    canonical = json.dumps({"kind": kind, "params": params, "no_cache": no_cache}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class TaskStore:
+    """
+    Persistent table of long-running LLM tasks (async roadmap/audit jobs), local
+    SQLite in WAL mode. Finished tasks are kept for TASK_RESULT_TTL_S so clients
+    can poll for the result, then purged.
+    """
+
+    def __init__(self, path: str, ttl_s: float):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.ttl_s = ttl_s
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "id TEXT PRIMARY KEY, kind TEXT NOT NULL, dedup_key TEXT NOT NULL, status TEXT NOT NULL, "
+            "params TEXT NOT NULL, no_cache INTEGER NOT NULL DEFAULT 0, result TEXT, error TEXT, "
+            "created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+        )
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(tasks)")}
+        if "no_cache" not in columns:
+            # Tables created before no_cache was stored with the task
+            self.conn.execute("ALTER TABLE tasks ADD COLUMN no_cache INTEGER NOT NULL DEFAULT 0")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_dedup ON tasks (dedup_key, status)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, created_at)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_finished ON tasks (finished_at)")
+        self.conn.commit()
+        self.lock = threading.Lock()
+
+    def _row(self, row) -> Dict[str, Any]:
+        task = dict(zip(_TASK_COLUMNS, row))
+        task["params"] = json.loads(task["params"])
+        task["no_cache"] = bool(task["no_cache"])
+        task["result"] = json.loads(task["result"]) if task["result"] is not None else None
+        return task
+
+    def submit(self, kind: str, params: Dict[str, Any], no_cache: bool = False) -> Tuple[Dict[str, Any], bool]:
+        """
+        Returns (task, created). An identical submission (same no_cache too) that is
+        still queued or running returns that task instead; without no_cache, so
+        does one already done. no_cache is stored with the task, so it survives a
+        requeue after a restart.
+        """
+        dedup_key = make_dedup_key(kind, params, no_cache)
+        statuses = _IN_FLIGHT_STATUSES if no_cache else _REUSABLE_STATUSES
+        now = time.time()
+        with self.lock:
+            self._purge_expired(now)
+            row = self.conn.execute(
+                f"SELECT {', '.join(_TASK_COLUMNS)} FROM tasks WHERE dedup_key = ? AND status IN ({', '.join('?' * len(statuses))}) "
+                "ORDER BY created_at DESC LIMIT 1",
+                (dedup_key, *statuses)
+            ).fetchone()
+            if row is not None:
+                return self._row(row), False
+
+            task_id = uuid.uuid4().hex
+            self.conn.execute(
+                "INSERT INTO tasks (id, kind, dedup_key, status, params, no_cache, created_at) VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                (task_id, kind, dedup_key, json.dumps(params), int(no_cache), now)
+            )
+            self.conn.commit()
+        return self.get(task_id), True
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            row = self.conn.execute(
+                f"SELECT {', '.join(_TASK_COLUMNS)} FROM tasks WHERE id = ?", (task_id,)
+            ).fetchone()
+        return self._row(row) if row is not None else None
+
+    def mark_running(self, task_id: str):
+        with self.lock:
+            self.conn.execute("UPDATE tasks SET status = 'running', started_at = ? WHERE id = ?", (time.time(), task_id))
+            self.conn.commit()
+
+    def mark_done(self, task_id: str, result: Any):
+        with self.lock:
+            self.conn.execute(
+                "UPDATE tasks SET status = 'done', result = ?, finished_at = ? WHERE id = ?",
+                (json.dumps(result), time.time(), task_id)
+            )
+            self.conn.commit()
+
+    def mark_failed(self, task_id: str, error: str):
+        with self.lock:
+            self.conn.execute(
+                "UPDATE tasks SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                (error, time.time(), task_id)
+            )
+            self.conn.commit()
+
+    def requeue_unfinished(self) -> List[str]:
+        """After a restart: tasks left running are queued again. Returns queued ids, oldest first."""
+        with self.lock:
+            self.conn.execute("UPDATE tasks SET status = 'queued', started_at = NULL WHERE status = 'running'")
+            self.conn.commit()
+            rows = self.conn.execute("SELECT id FROM tasks WHERE status = 'queued' ORDER BY created_at").fetchall()
+        return [row[0] for row in rows]
+
+    def _purge_expired(self, now: float):
+        self.conn.execute("DELETE FROM tasks WHERE finished_at IS NOT NULL AND finished_at < ?", (now - self.ttl_s,))
+        self.conn.commit()
+
+    def counts(self) -> Dict[str, int]:
+        with self.lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        return dict(rows)
+
+
+task_store = TaskStore(settings.TASK_DB_PATH, settings.TASK_RESULT_TTL_S)
@@ -1,6 +1,7 @@
 import chromadb
 from chromadb.config import Settings as ChromaSettings
 from ..core.config import settings
+from ..core.metrics import timed
 
 class VectorStore:
     def __init__(self):
@@ -8,6 +9,7 @@ class VectorStore:
         self.profiles_collection = self.client.get_or_create_collection("profiles")
         self.jobs_collection = self.client.get_or_create_collection("jobs")
 
+    @timed("chroma_write")
     def add_profile(self, profile_id: str, embedding: list, metadata: dict):
         self.profiles_collection.add(
             ids=[profile_id],
@@ -15,6 +17,18 @@ class VectorStore:
             metadatas=[metadata]
         )
 
+    @timed("chroma_write")
+    def add_jobs(self, ids: list, embeddings: list, metadatas: list):
+        # One bulk insert (single SQLite transaction) per batch of jobs
+        if not ids:
+            return
+        self.jobs_collection.add(
+            ids=ids,
+            embeddings=embeddings,
+            metadatas=metadatas
+        )
+
+    @timed("chroma_read")
     def query_profiles(self, query_embedding: list, n_results: int = 5):
         return self.profiles_collection.query(
             query_embeddings=[query_embedding],
@@ -1,16 +1,25 @@
+import time
+_IMPORT_STARTED = time.perf_counter()
+
 from fastapi import FastAPI, BackgroundTasks, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from .services.scraper import scrape_jobs
 from .services.matcher import find_matches
 from .services.roadmap import generate_roadmap
 from .services.profile_engine import generate_profile
 from .db.vector_store import vector_store
+from .core.config import settings
+from .core.models import registry
+from .core.concurrency import run_cpu, run_io, shutdown_pools
+from .core.metrics import REQUESTS, REQUEST_SECONDS, log_event, render as render_metrics
+from .services.llm_scheduler import LLMOverloaded, llm_request, with_llm_request
+import logging
+import threading
 import uuid
 
 app = FastAPI(title="CareerOS API", version="1.0.0")
 
 from fastapi import Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.exceptions import RequestValidationError
 
 @app.exception_handler(Exception)
@@ -23,6 +32,14 @@ async def global_exception_handler(request: Request, exc: Exception):
         content={"detail": "Internal Server Error", "error": str(exc)},
     )
 
+@app.exception_handler(LLMOverloaded)
+async def llm_overloaded_handler(request: Request, exc: LLMOverloaded):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail, "retry_after": exc.retry_after},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     print(f"⚠️ VALIDATION ERROR: {exc}")
@@ -31,16 +48,37 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         content={"detail": "Validation Error", "errors": exc.errors()},
     )
 
+def _route_label(request: Request) -> str:
+    # The route template (/api/v1/matches/{profile_id}) keeps metric cardinality bounded
+    route = request.scope.get("route")
+    return getattr(route, "path", "unmatched")
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    print(f"➡️ REQUEST: {request.method} {request.url}")
+    started = time.perf_counter()
     try:
         response = await call_next(request)
-        print(f"⬅️ RESPONSE: {response.status_code}")
-        return response
     except Exception as e:
-        print(f"🔥 MIDDLEWARE ERROR: {e}")
-        raise e
+        route = _route_label(request)
+        REQUESTS.inc(method=request.method, route=route, status="500")
+        log_event("request_error", level=logging.ERROR, method=request.method, route=route, error=repr(e))
+        raise
+    elapsed = time.perf_counter() - started
+    route = _route_label(request)
+    REQUESTS.inc(method=request.method, route=route, status=str(response.status_code))
+    REQUEST_SECONDS.observe(elapsed, method=request.method, route=route)
+
+    # Sampled: every error or slow request, a LOG_SAMPLE_RATE share of the rest
+    always = response.status_code >= 500 or elapsed >= settings.LOG_SLOW_REQUEST_S
+    log_event(
+        "request",
+        sample_rate=1.0 if always else settings.LOG_SAMPLE_RATE,
+        method=request.method,
+        route=route,
+        status=response.status_code,
+        ms=round(elapsed * 1000, 1)
+    )
+    return response
 
 app.add_middleware(
     CORSMiddleware,
@@ -50,19 +88,60 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def warm_up_models():
+    # Load models off the request path so the server accepts traffic immediately
+    if settings.WARMUP_MODELS_ON_STARTUP:
+        threading.Thread(target=registry.warm_up, name="model-warmup", daemon=True).start()
+
+@app.on_event("startup")
+async def start_task_runner():
+    from .services.task_runner import task_runner
+    await task_runner.start()
+
+@app.on_event("shutdown")
+async def stop_worker_pools():
+    from .services.task_runner import task_runner
+    await task_runner.stop()
+    shutdown_pools()
+    if registry.is_loaded("llm"):
+        await registry.get("llm").aclose()
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "CareerOS"}
 
+@app.get("/ready")
+async def readiness_check():
+    ready = registry.ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "ready": ready,
+            "models": registry.status(),
+            "import_seconds": IMPORT_SECONDS
+        },
+    )
+
+def _sse_response(events, endpoint: str, request: Request):
+    # Server-Sent Events: tokens and partial JSON reach the client as they are generated
+    from .services.streaming import to_sse
+    return StreamingResponse(
+        to_sse(with_llm_request(events, endpoint, request)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to CareerOS API"}
 
 # --- Phase 1: Profile ---
 from fastapi import FastAPI, BackgroundTasks, HTTPException, UploadFile, File
-import shutil
-import tempfile
-import os
 
 # ... (imports)
 
@@ -70,96 +149,283 @@ import os
 async def upload_resume(file: UploadFile = File(...)):
     from .services.parser import parse_resume
     
+    # Read straight into memory (no temp file), refusing anything over the cap
+    data = await file.read(settings.MAX_UPLOAD_BYTES + 1)
+    if len(data) > settings.MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large (max {settings.MAX_UPLOAD_BYTES // (1024 * 1024)} MB)"
+        )
+    
     try:
-        print(f"Received file upload: {file.filename}")
+        # Parsing, NER and encoding are CPU-bound: keep them off the event loop
+        parsed_data = await run_cpu(parse_resume, data)
+        profile = await run_cpu(generate_profile, parsed_data["text"])
         
-        # Save to temp file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            shutil.copyfileobj(file.file, tmp)
-            tmp_path = tmp.name
-            
-        print(f"Saved to temp path: {tmp_path}")
+        profile_id = str(uuid.uuid4())
         
-        try:
-            parsed_data = parse_resume(tmp_path)
-            print("Resume parsed successfully.")
-            
-            profile = generate_profile(parsed_data["text"])
-            print("Profile generated successfully.")
-            
-            profile_id = str(uuid.uuid4())
-            
-            vector_store.add_profile(
-                profile_id=profile_id,
-                embedding=profile["embedding_vector"],
-                metadata={
-                    "skills": ", ".join(profile["hard_skills"]),
-                    "summary": profile["raw_text_summary"]
-                }
-            )
-            print(f"Profile stored with ID: {profile_id}")
-            return {"profile_id": profile_id, "data": profile}
-        finally:
-            # Cleanup temp file
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
-                print("Temp file cleaned up.")
+        await run_io(
+            vector_store.add_profile,
+            profile_id=profile_id,
+            embedding=profile["embedding_vector"],
+            metadata={
+                "skills": ", ".join(profile["hard_skills"]),
+                "summary": profile["raw_text_summary"]
+            }
+        )
+        log_event(
+            "profile_upload",
+            sample_rate=settings.LOG_SAMPLE_RATE,
+            filename=file.filename,
+            bytes=len(data),
+            pages=parsed_data["page_count"],
+            skills=len(profile["hard_skills"]),
+            profile_id=profile_id
+        )
+        return {"profile_id": profile_id, "data": profile}
                 
     except Exception as e:
-        print(f"ERROR in upload_resume: {e}")
+        log_event("profile_upload_error", level=logging.ERROR, filename=file.filename, error=repr(e))
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
 # --- Phase 2: Intelligence ---
+from pydantic import BaseModel
+from typing import List, Optional
+
+class ScrapeRequest(BaseModel):
+    queries: List[str] = ["software engineer"]
+    limit: int = 30  # results per query
+
 @app.post("/api/v1/jobs/scrape")
-async def trigger_scrape(background_tasks: BackgroundTasks):
+async def trigger_scrape(background_tasks: BackgroundTasks, request: Optional[ScrapeRequest] = None):
+    from .services.scraper import scrape_many
+    request = request or ScrapeRequest()
     # Run scraping in background
-    background_tasks.add_task(scrape_jobs)
-    return {"message": "Scraping started in background"}
+    background_tasks.add_task(scrape_many, request.queries, request.limit)
+    return {"message": "Scraping started in background", "queries": len(request.queries)}
+
+@app.get("/api/v1/jobs/scrape/stats")
+async def scrape_stats():
+    from .services import scraper
+    return scraper.last_run_stats
 
 @app.get("/api/v1/matches/{profile_id}")
-async def get_matches(profile_id: str):
-    matches = find_matches(profile_id)
+async def get_matches(profile_id: str, n_results: int = 20, job_type: str = None, experience: str = None, min_days_left: int = None):
+    matches = await run_io(
+        find_matches, profile_id, n_results,
+        job_type=job_type, experience=experience, min_days_left=min_days_left
+    )
     return {"matches": matches}
 
-from pydantic import BaseModel
-from typing import List
+
+class BatchMatchRequest(BaseModel):
+    profile_ids: Optional[List[str]] = None  # omit to match every profile
+    n_results: int = 20
+    job_type: Optional[str] = None
+    experience: Optional[str] = None
+    min_days_left: Optional[int] = None
+
+@app.post("/api/v1/matches:batch")
+async def get_matches_batch(request: BatchMatchRequest):
+    """
+    Streams matches for many profiles as NDJSON, one {"profile_id", "matches"} line per profile.
+    """
+    from .services.matcher import find_matches_many
+    import json
+
+    results = find_matches_many(
+        request.profile_ids, request.n_results,
+        job_type=request.job_type, experience=request.experience, min_days_left=request.min_days_left
+    )
+
+    async def ndjson():
+        # The generator does blocking Chroma calls, so advance it in the I/O pool
+        while True:
+            item = await run_io(next, results, None)
+            if item is None:
+                break
+            profile_id, matches = item
+            yield json.dumps({"profile_id": profile_id, "matches": matches}) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
 
 class RoadmapRequest(BaseModel):
     profile_skills: List[str]
     job_skills: str
     job_title: str
+    no_cache: bool = False  # bypass the LLM response cache for this request
 
 @app.post("/api/v1/roadmap")
-async def create_roadmap(request: RoadmapRequest):
-    roadmap = generate_roadmap(request.profile_skills, request.job_skills, request.job_title)
+async def create_roadmap(request: RoadmapRequest, http_request: Request):
+    with llm_request("roadmap", http_request):
+        roadmap = await generate_roadmap(request.profile_skills, request.job_skills, request.job_title, use_cache=not request.no_cache)
     return roadmap
 
+@app.post("/api/v1/roadmap/stream")
+async def create_roadmap_stream(request: RoadmapRequest, http_request: Request):
+    from .services.roadmap import stream_roadmap
+    events = stream_roadmap(request.profile_skills, request.job_skills, request.job_title, use_cache=not request.no_cache)
+    return _sse_response(events, "roadmap", http_request)
+
+# Async jobs: submit, then poll status and fetch the result, instead of holding
+# the connection open through the whole agent run
+async def _submit_task(kind: str, params: dict, no_cache: bool):
+    from .services.task_runner import task_runner
+    task, created = await task_runner.submit(kind, params, no_cache=no_cache)
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": task["id"], "status": task["status"], "deduplicated": not created},
+        headers={"Location": f"{settings.API_V1_STR}/{kind}/jobs/{task['id']}"},
+    )
+
+async def _get_task(kind: str, job_id: str) -> dict:
+    from .db.task_store import task_store
+    task = await run_io(task_store.get, job_id)
+    if task is None or task["kind"] != kind:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return task
+
+def _task_status(task: dict) -> dict:
+    return {
+        "job_id": task["id"],
+        "status": task["status"],
+        "error": task["error"],
+        "created_at": task["created_at"],
+        "started_at": task["started_at"],
+        "finished_at": task["finished_at"],
+    }
+
+async def _task_result(kind: str, job_id: str):
+    task = await _get_task(kind, job_id)
+    if task["status"] == "done":
+        return task["result"]
+    if task["status"] == "failed":
+        return JSONResponse(status_code=500, content={"detail": "Job failed", "error": task["error"]})
+    return JSONResponse(status_code=202, content=_task_status(task))
+
+@app.post("/api/v1/roadmap/jobs")
+async def submit_roadmap_job(request: RoadmapRequest):
+    params = {"profile_skills": request.profile_skills, "job_skills": request.job_skills, "job_title": request.job_title}
+    return await _submit_task("roadmap", params, request.no_cache)
+
+@app.get("/api/v1/roadmap/jobs/{job_id}")
+async def get_roadmap_job(job_id: str):
+    return _task_status(await _get_task("roadmap", job_id))
+
+@app.get("/api/v1/roadmap/jobs/{job_id}/result")
+async def get_roadmap_job_result(job_id: str):
+    return await _task_result("roadmap", job_id)
+
 # --- Phase 3: Agent Loop ---
 @app.post("/api/v1/feedback")
 async def submit_feedback(profile_id: str, job_id: str, outcome: str, reason: str = None):
     from .services.feedback import process_feedback
-    result = process_feedback(profile_id, job_id, outcome, reason)
+    result = await run_io(process_feedback, profile_id, job_id, outcome, reason)
     return result
 
+@app.get("/api/v1/profiles/{profile_id}/events")
+async def get_profile_events(profile_id: str, outcome: str = None, limit: int = 100):
+    from .db.event_log import event_log
+    events = await run_io(event_log.for_profile, profile_id, outcome, limit)
+    return {"events": events}
+
 @app.post("/api/v1/post-mortem")
-async def post_mortem_endpoint(job_title: str, job_description: str, user_skills: str, rejection_reason: str = None):
+async def post_mortem_endpoint(http_request: Request, job_title: str, job_description: str, user_skills: str, rejection_reason: str = None, no_cache: bool = False):
     skills_list = user_skills.split(',')
     from .services.post_mortem import analyze_rejection
-    return analyze_rejection(job_title, job_description, skills_list, rejection_reason)
+    with llm_request("post_mortem", http_request):
+        return await analyze_rejection(job_title, job_description, skills_list, rejection_reason, use_cache=not no_cache)
 
 @app.post("/api/v1/tailor")
-async def tailor_resume_endpoint(user_skills: str, job_description: str, job_title: str):
+async def tailor_resume_endpoint(http_request: Request, user_skills: str, job_description: str, job_title: str, no_cache: bool = False):
     skills_list = user_skills.split(',')
     from .services.tailor import tailor_resume
-    return tailor_resume(skills_list, job_description, job_title)
+    with llm_request("tailor", http_request):
+        return await tailor_resume(skills_list, job_description, job_title, use_cache=not no_cache)
+
+@app.post("/api/v1/tailor/stream")
+async def tailor_resume_stream_endpoint(http_request: Request, user_skills: str, job_description: str, job_title: str, no_cache: bool = False):
+    skills_list = user_skills.split(',')
+    from .services.tailor import stream_tailor_resume
+    return _sse_response(stream_tailor_resume(skills_list, job_description, job_title, use_cache=not no_cache), "tailor", http_request)
 
 class AuditRequest(BaseModel):
     resume_text: str
     job_description: str = ""
+    no_cache: bool = False
+    narrative: Optional[bool] = None  # LLM-written summary; /audit defaults to AUDIT_LLM_NARRATIVE (off), the rest to on
 
 @app.post("/api/v1/audit")
-async def audit_resume_endpoint(request: AuditRequest):
+async def audit_resume_endpoint(request: AuditRequest, http_request: Request):
     from .agents.resume_audit import audit_resume
-    return audit_resume(request.resume_text, request.job_description)
+    with llm_request("audit", http_request):
+        return await audit_resume(request.resume_text, request.job_description, use_cache=not request.no_cache, narrative=request.narrative)
+
+@app.post("/api/v1/audit/stream")
+async def audit_resume_stream_endpoint(request: AuditRequest, http_request: Request):
+    from .agents.resume_audit import stream_audit_resume
+    events = stream_audit_resume(request.resume_text, request.job_description, use_cache=not request.no_cache, narrative=request.narrative)
+    return _sse_response(events, "audit", http_request)
+
+class BatchAuditResume(BaseModel):
+    id: Optional[str] = None  # echoed back; defaults to the position in the list
+    resume_text: str
+
+class BatchAuditRequest(BaseModel):
+    job_description: str
+    resumes: List[BatchAuditResume]
+    top_k: Optional[int] = None  # LLM summaries for this many best matches; default AUDIT_BATCH_TOP_K
+    narrative: Optional[bool] = None
+    no_cache: bool = False
+
+@app.post("/api/v1/audit/batch")
+async def audit_resumes_batch_endpoint(request: BatchAuditRequest, http_request: Request):
+    """
+    Audits many resumes against one job description, streamed as NDJSON: one
+    {"type": "result"} line per resume, best match first, then {"type": "narrative"}
+    lines with the LLM summaries of the top_k.
+    """
+    from .agents.resume_audit import audit_resumes_batch
+    import json
+
+    if len(request.resumes) > settings.AUDIT_BATCH_MAX_RESUMES:
+        raise HTTPException(status_code=413, detail=f"Too many resumes (max {settings.AUDIT_BATCH_MAX_RESUMES})")
+
+    results = audit_resumes_batch(
+        [r.id if r.id is not None else str(i) for i, r in enumerate(request.resumes)],
+        [r.resume_text for r in request.resumes],
+        request.job_description,
+        top_k=request.top_k,
+        narrative=request.narrative,
+        use_cache=not request.no_cache
+    )
+
+    async def ndjson():
+        async for item in with_llm_request(results, "audit", http_request):
+            yield json.dumps(item) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+@app.post("/api/v1/audit/jobs")
+async def submit_audit_job(request: AuditRequest):
+    params = {"resume_text": request.resume_text, "job_description": request.job_description, "narrative": request.narrative}
+    return await _submit_task("audit", params, request.no_cache)
+
+@app.get("/api/v1/audit/jobs/{job_id}")
+async def get_audit_job(job_id: str):
+    return _task_status(await _get_task("audit", job_id))
+
+@app.get("/api/v1/audit/jobs/{job_id}/result")
+async def get_audit_job_result(job_id: str):
+    return await _task_result("audit", job_id)
+
+@app.get("/api/v1/llm/cache")
+async def llm_cache_stats():
+    from .services.llm_cache import llm_cache
+    return llm_cache.stats()
+
+IMPORT_SECONDS = round(time.perf_counter() - _IMPORT_STARTED, 3)
+if IMPORT_SECONDS > settings.IMPORT_TIME_BUDGET_S:
+    print(f"⚠️ IMPORT BUDGET EXCEEDED: backend.main took {IMPORT_SECONDS}s (budget {settings.IMPORT_TIME_BUDGET_S}s)")
@@ -0,0 +1,99 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+import numpy as np
+from ..core.config import settings
+
+# SQLite caps the number of bound parameters per statement
+_SQL_CHUNK = 900
+
+
+def embedding_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache keyed on (model name, text hash).
+
+    Vectors are stored as compact float16/float32 blobs in a SQLite table and
+    looked up in bulk, so re-embedding an already seen text is a single read.
+    The least recently used rows are evicted once `max_entries` is exceeded.
+    """
+
+    def __init__(self, path: str, max_entries: int, dtype: str = "float16"):
+        self.max_entries = max_entries
+        self.dtype = np.dtype(dtype)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, model TEXT, dtype TEXT, vector BLOB, accessed_at REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_accessed ON embeddings (accessed_at)")
+        self.conn.commit()
+
+    def get_many(self, keys: List[str]) -> List[Optional[List[float]]]:
+        found = {}
+        now = time.time()
+        with self.lock:
+            for start in range(0, len(keys), _SQL_CHUNK):
+                chunk = keys[start:start + _SQL_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT key, dtype, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, dtype, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=dtype).astype(np.float32).tolist()
+            if found:
+                self.conn.executemany(
+                    "UPDATE embeddings SET accessed_at = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self.conn.commit()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return [found.get(key) for key in keys]
+
+    def put_many(self, keys: List[str], model: str, vectors):
+        now = time.time()
+        rows = [
+            (key, model, self.dtype.name, np.asarray(vector, dtype=self.dtype).tobytes(), now)
+            for key, vector in zip(keys, vectors)
+        ]
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, dtype, vector, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._writes += len(rows)
+            # Evict in bulk every ~1000 writes rather than on every insert
+            if self._writes >= 1000:
+                self._writes = 0
+                self.conn.execute(
+                    "DELETE FROM embeddings WHERE key IN ("
+                    "SELECT key FROM embeddings ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+            self.conn.commit()
+
+    def stats(self):
+        with self.lock:
+            size = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "size": size}
+
+
+embedding_cache = EmbeddingCache(
+    settings.EMBEDDING_CACHE_DB_PATH,
+    max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+    dtype=settings.EMBEDDING_CACHE_DTYPE
+)
@@ -0,0 +1,187 @@
+import argparse
+import csv
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+from ..core.config import settings
+from .ingest import DETAIL_FIELDS, extract_company, ingest_candidates
+
+# Column names accepted for each candidate field, first match wins
+FIELD_ALIASES = {
+    "title": ["title", "job_title", "position"],
+    "company": ["company", "company_name", "employer"],
+    "url": ["url", "link", "href", "job_url"],
+    "description": ["description", "body", "snippet", "job_description"],
+}
+
+
+def _first(record: Dict[str, Any], names: list) -> Optional[str]:
+    for name in names:
+        value = record.get(name)
+        if value not in (None, ""):
+            return str(value).strip()
+    return None
+
+
+def to_candidate(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Maps one feed record onto the candidate shape ingest expects (None if unusable)."""
+    title = _first(record, FIELD_ALIASES["title"])
+    if not title:
+        return None
+    candidate = {
+        "title": title,
+        "company": _first(record, FIELD_ALIASES["company"]) or extract_company(title),
+        "url": _first(record, FIELD_ALIASES["url"]) or "#",
+        "description": _first(record, FIELD_ALIASES["description"]) or "",
+    }
+    for field in DETAIL_FIELDS:
+        if record.get(field) not in (None, ""):
+            candidate[field] = record[field]
+    for field in ("applicants", "days_left"):
+        # CSV values arrive as strings; the matcher filters on these numerically
+        if isinstance(candidate.get(field), str):
+            try:
+                candidate[field] = int(candidate[field])
+            except ValueError:
+                del candidate[field]
+    return candidate
+
+
+def _iter_jsonl(path: str, offset: int) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+    # Yields (byte offset just past the record, record); unparseable lines yield None
+    with open(path, "rb") as f:
+        f.seek(offset)
+        position = offset
+        for raw in iter(f.readline, b""):
+            position += len(raw)
+            line = raw.strip()
+            if not line:
+                continue
+            try:
+                yield position, json.loads(line)
+            except json.JSONDecodeError:
+                yield position, None
+
+
+def _iter_csv(path: str, offset: int) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+    with open(path, "rb") as f:
+        header = next(csv.reader([f.readline().decode("utf-8-sig")]))
+        if offset:
+            f.seek(offset)
+        position = f.tell()
+
+        def lines():
+            # Counts bytes as csv pulls lines, so offsets stay exact for multi-line fields
+            nonlocal position
+            for raw in iter(f.readline, b""):
+                position += len(raw)
+                yield raw.decode("utf-8")
+
+        for row in csv.reader(lines()):
+            if row:
+                yield position, dict(zip(header, row))
+
+
+def _checkpoint_path(path: str) -> str:
+    return path + ".checkpoint.json"
+
+
+def _file_identity(path: str) -> Dict[str, int]:
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "inode": stat.st_ino}
+
+
+def _load_checkpoint(path: str) -> Dict[str, Any]:
+    if not os.path.exists(_checkpoint_path(path)):
+        return {}
+    with open(_checkpoint_path(path)) as f:
+        state = json.load(f)
+    # Offsets are only meaningful in the exact file they were taken from
+    if state.get("file") != _file_identity(path):
+        print(f"{path} changed since its checkpoint was written, starting from the top")
+        return {}
+    return state
+
+
+def _clear_checkpoint(path: str):
+    if os.path.exists(_checkpoint_path(path)):
+        os.remove(_checkpoint_path(path))
+
+
+def _save_checkpoint(path: str, state: Dict[str, Any]):
+    # Written after each committed batch and swapped in atomically
+    tmp = _checkpoint_path(path) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, _checkpoint_path(path))
+
+
+def import_file(path: str, format: str = None, batch_size: int = None, resume: bool = True) -> Dict[str, Any]:
+    """
+    Streams a JSONL or CSV job feed into the job store in batches.
+
+    Memory stays bounded by one batch. After each batch the byte offset is
+    checkpointed next to the file, so a crashed run picks up where it left off
+    (resume=False starts over; dedup keeps already imported jobs from doubling).
+    The checkpoint records the file's size, mtime and inode and is ignored if the
+    file was replaced; a run that finishes removes it.
+    """
+    format = format or ("csv" if path.lower().endswith(".csv") else "jsonl")
+    batch_size = batch_size or settings.INGEST_BATCH_SIZE
+    state = _load_checkpoint(path) if resume else {}
+    state = {"offset": 0, "records": 0, "invalid": 0, "duplicates": 0, "ingested": 0, **state, "file": _file_identity(path)}
+    if state["offset"]:
+        print(f"Resuming {path} from byte {state['offset']} ({state['records']} records done)")
+
+    records = (_iter_csv if format == "csv" else _iter_jsonl)(path, state["offset"])
+    started = time.perf_counter()
+    run_records = 0
+    batch, batch_end = [], state["offset"]
+
+    def flush():
+        nonlocal batch
+        if batch:
+            counts = ingest_candidates(batch)
+            state["duplicates"] += counts["duplicates"]
+            state["ingested"] += counts["ingested"]
+            batch = []
+        state["offset"] = batch_end
+        _save_checkpoint(path, state)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{state['records']} records, {state['ingested']} ingested, {state['duplicates']} duplicates "
+            f"({run_records / elapsed if elapsed else 0:.1f} records/s)"
+        )
+
+    for end, record in records:
+        state["records"] += 1
+        run_records += 1
+        batch_end = end
+        candidate = to_candidate(record) if isinstance(record, dict) else None
+        if candidate is None:
+            state["invalid"] += 1
+        else:
+            batch.append(candidate)
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    _clear_checkpoint(path)
+
+    state["seconds"] = round(time.perf_counter() - started, 3)
+    return state
+
+
+if __name__ == "__main__":
+    # python -m backend.services.importer jobs.jsonl [--format csv] [--batch-size 512]
+    parser = argparse.ArgumentParser(description="Bulk import jobs from a JSONL or CSV feed")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and start from the top")
+    parser.add_argument("--mock-metadata", action="store_true", help="demo data: fill missing salary/applicants with made-up values")
+    args = parser.parse_args()
+
+    settings.MOCK_JOB_METADATA = args.mock_metadata
+    result = import_file(args.path, args.format, args.batch_size, resume=not args.restart)
+    print(f"Done: {json.dumps(result)}")
@@ -0,0 +1,154 @@
+import random
+import uuid
+from typing import Any, Dict, List, Tuple
+from ..core.config import settings
+from ..core.metrics import log_event
+from ..db.vector_store import vector_store
+from ..db.dedup_index import dedup_index
+from ..db.job_index import job_index
+from ..db.skill_index import skill_index
+from .profile_engine import extract_skills_many, encode_texts
+
+# Optional per-job details a source may provide alongside title/company/url/description
+DETAIL_FIELDS = ["applicants", "days_left", "salary", "job_type", "experience", "posted_date"]
+
+def extract_company(title: str) -> str:
+    # Simple heuristic to extract company from title or snippet
+    # E.g. "Software Engineer at Google"
+    company = "Unknown Company"
+    if " at " in title:
+        parts = title.split(" at ")
+        if len(parts) > 1:
+            company = parts[1].split(" |")[0].split(" -")[0].strip()
+    elif "-" in title:
+         company = title.split("-")[0].strip()
+    return company
+
+def _mock_metadata() -> Dict[str, Any]:
+    # Generate realistic mock metadata for UI polish
+    applicants = random.randint(10, 200)
+    days_left = random.randint(1, 14)
+    salary_min = random.randint(4, 10)
+    salary_max = salary_min + random.randint(2, 8)
+    job_type = random.choice(["Full Time", "Internship"])
+    return {
+        "applicants": applicants,
+        "days_left": days_left,
+        "salary": f"₹{salary_min}L - ₹{salary_max}L/Year",
+        "job_type": job_type,
+        "experience": "No prior experience required" if job_type == "Internship" else f"{random.randint(1, 3)}+ Years",
+        "posted_date": f"Posted {random.randint(1, 5)} days ago"
+    }
+
+def _job_details(candidate: Dict[str, Any]) -> Dict[str, Any]:
+    # Real values from the source win; mock values only fill the gaps, and only if
+    # MOCK_JOB_METADATA was turned on for a demo
+    details = _mock_metadata() if settings.MOCK_JOB_METADATA else {}
+    for field in DETAIL_FIELDS:
+        if candidate.get(field) not in (None, ""):
+            details[field] = candidate[field]
+    return details
+
+def analyze_batch(candidates: List[Dict[str, Any]]) -> Tuple[List[Tuple[Dict[str, Any], List[str]]], List[Dict[str, Any]], List[List[float]]]:
+    """
+    The CPU-bound half of ingest_batch: skills (one nlp.pipe pass) and embeddings
+    (one batched encode). Touches no store, so it can run in the CPU pool.
+    Returns (kept (candidate, skills) pairs, rejected candidates, embeddings of the kept).
+    """
+    if not candidates:
+        return [], [], []
+
+    # 1. Extract Skills (from snippet AND title)
+    skills_list = extract_skills_many([c["description"] for c in candidates])
+    # Fallback: Try extracting from title
+    fallback = [i for i, skills in enumerate(skills_list) if not skills]
+    if fallback:
+        title_skills = extract_skills_many([candidates[i]["title"] for i in fallback])
+        for i, skills in zip(fallback, title_skills):
+            skills_list[i] = skills
+
+    # 2. Quality Filter: Skip if no skills found
+    kept, rejected = [], []
+    for candidate, skills in zip(candidates, skills_list):
+        if not skills:
+            rejected.append(candidate)
+            continue
+        kept.append((candidate, skills))
+    if rejected:
+        log_event("ingest_no_skills", sample_rate=settings.LOG_SAMPLE_RATE, batch=len(candidates), rejected=len(rejected))
+    if not kept:
+        return kept, rejected, []
+
+    # 3. Generate Embeddings (cached, misses in a single batched forward pass)
+    texts_to_embed = [f"{c['title']} {c['description']}" for c, _ in kept]
+    return kept, rejected, encode_texts(texts_to_embed)
+
+def store_batch(kept: List[Tuple[Dict[str, Any], List[str]]], rejected: List[Dict[str, Any]], embeddings: List[List[float]]) -> List[Dict[str, Any]]:
+    """
+    The storage half of ingest_batch: blocking writes, run it in the I/O pool.
+    Confirms the dedup reservations of the stored jobs and releases the rest.
+    """
+    # Only stored postings count as seen: a rejected one's (title, company) key
+    # must not block a later, complete posting of the same job
+    dedup_index.release(rejected)
+    if not kept:
+        return []
+
+    # 4. Store in Vector DB (one bulk add)
+    ids, metadatas, processed_jobs = [], [], []
+    for candidate, skills in kept:
+        job_id = str(uuid.uuid4())
+        metadata = {
+            "title": candidate["title"],
+            "company": candidate["company"],
+            "url": candidate["url"],
+            "skills": ", ".join(skills),
+            "description": candidate["description"],
+            **_job_details(candidate)
+        }
+        ids.append(job_id)
+        metadatas.append(metadata)
+        processed_jobs.append({"id": job_id, **metadata, "skills": skills})
+
+    try:
+        vector_store.add_jobs(ids=ids, embeddings=embeddings, metadatas=metadatas)
+    except Exception:
+        dedup_index.release([candidate for candidate, _ in kept])
+        raise
+    # In Chroma now: confirm before anything else can fail
+    dedup_index.mark_seen(processed_jobs)
+    skill_index.add_jobs(ids, metadatas)
+    if settings.MATCH_BACKEND == "numpy":
+        job_index.append(ids, embeddings, metadatas)
+    return processed_jobs
+
+def ingest_batch(candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Runs skill extraction, embedding and storage for a batch of candidate jobs.
+    Each candidate needs "title", "company", "url" and "description", and may
+    carry any of DETAIL_FIELDS.
+    Skills are extracted with one nlp.pipe pass, embeddings with one batched
+    encode call, and everything is written with a single bulk add.
+    Async callers run the two halves separately: analyze_batch in the CPU pool,
+    store_batch in the I/O pool.
+    """
+    if not candidates:
+        return []
+    return store_batch(*analyze_batch(candidates))
+
+def ingest_candidates(candidates: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    The full pipeline for one batch from any source: dedup, then ingest_batch.
+    Returns counts for throughput reporting.
+    """
+    new_jobs = dedup_index.filter_new(candidates)
+    try:
+        ingested = ingest_batch(new_jobs)
+    except Exception:
+        dedup_index.release(new_jobs)
+        raise
+    return {
+        "received": len(candidates),
+        "duplicates": len(candidates) - len(new_jobs),
+        "ingested": len(ingested)
+    }
@@ -0,0 +1,18 @@
+from typing import Any, Dict, List
+
+
+class JobSource:
+    """
+    A place jobs come from. Implementations return candidate dicts with "title",
+    "company", "url" and "description" (plus any of ingest.DETAIL_FIELDS they know),
+    which all go through the same ingest pipeline.
+    """
+
+    # Key for the per-source rate limiter
+    name: str = "source"
+    # Max searches per second against this source (0 = unlimited)
+    rate_limit_per_s: float = 0.0
+
+    def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """Blocking search for one query; runs in the I/O pool."""
+        raise NotImplementedError
@@ -0,0 +1,179 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from ..core.config import settings
+from ..core.concurrency import run_io
+
+# Disk-hit access times held back before they are written without waiting for a set()
+_TOUCH_FLUSH_ENTRIES = 256
+
+
+def make_cache_key(model: str, prompt: str, format: str = None, temperature: float = None) -> str:
+    """Content address of an LLM call: model + options + whitespace-normalized prompt."""
+    normalized = " ".join(prompt.split())
+    raw = f"{model}\x00{format}\x00{temperature}\x00{normalized}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    Two-tier cache for LLM completions.
+
+    Memory tier: LRU OrderedDict bounded by `memory_entries`.
+    Disk tier:   SQLite table bounded by `disk_entries` (least recently used rows are trimmed).
+    Entries older than `ttl_s` are treated as misses in both tiers.
+
+    From async code use aget/aset/adelete: memory hits are answered inline and the
+    disk tier runs in the I/O pool. Disk hits only note their access time; the
+    accessed_at updates are written in batches with the next write.
+    """
+
+    def __init__(self, path: str, memory_entries: int, disk_entries: int, ttl_s: float):
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.ttl_s = ttl_s
+        self.memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self.lock = threading.Lock()  # memory tier and counters
+        self.db_lock = threading.Lock()  # SQLite connection
+        self.touched: Dict[str, float] = {}  # key -> last disk-hit time, not yet written
+        self.stats_counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, model TEXT, response TEXT, created_at REAL, accessed_at REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed_at)")
+        self.conn.commit()
+
+    def _get_memory(self, key: str, now: float) -> Optional[str]:
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is None:
+                return None
+            created_at, response = entry
+            if now - created_at <= self.ttl_s:
+                self.memory.move_to_end(key)
+                self.stats_counters["memory_hits"] += 1
+                return response
+            del self.memory[key]
+            return None
+
+    def _get_disk(self, key: str, now: float) -> Optional[str]:
+        with self.db_lock:
+            row = self.conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] <= self.ttl_s:
+                self.touched[key] = now
+                if len(self.touched) >= _TOUCH_FLUSH_ENTRIES:
+                    self._flush_touched()
+                    self.conn.commit()
+        with self.lock:
+            if row is not None and now - row[1] <= self.ttl_s:
+                self._remember(key, row[1], row[0])
+                self.stats_counters["disk_hits"] += 1
+                return row[0]
+            self.stats_counters["misses"] += 1
+            return None
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        response = self._get_memory(key, now)
+        return response if response is not None else self._get_disk(key, now)
+
+    async def aget(self, key: str) -> Optional[str]:
+        now = time.time()
+        response = self._get_memory(key, now)
+        return response if response is not None else await run_io(self._get_disk, key, now)
+
+    def set(self, key: str, model: str, response: str):
+        now = time.time()
+        with self.lock:
+            self._remember(key, now, response)
+            self.stats_counters["writes"] += 1
+            writes = self.stats_counters["writes"]
+        with self.db_lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, response, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now)
+            )
+            self._flush_touched()
+            # Trim occasionally rather than on every write
+            if writes % 100 == 0:
+                self._trim_disk(now)
+            self.conn.commit()
+
+    async def aset(self, key: str, model: str, response: str):
+        await run_io(self.set, key, model, response)
+
+    def delete(self, key: str):
+        with self.lock:
+            self.memory.pop(key, None)
+        with self.db_lock:
+            self.touched.pop(key, None)
+            self.conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self.conn.commit()
+
+    async def adelete(self, key: str):
+        await run_io(self.delete, key)
+
+    def _remember(self, key: str, created_at: float, response: str):
+        self.memory[key] = (created_at, response)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+            self.stats_counters["evictions"] += 1
+
+    def _flush_touched(self):
+        # Caller holds db_lock and commits
+        if self.touched:
+            self.conn.executemany(
+                "UPDATE llm_cache SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self.touched.items()]
+            )
+            self.touched.clear()
+
+    def _trim_disk(self, now: float):
+        self.conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_s,))
+        self.conn.execute(
+            "DELETE FROM llm_cache WHERE key IN ("
+            "SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.disk_entries,)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self.db_lock:
+            disk_size = self.conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        with self.lock:
+            lookups = self.stats_counters["memory_hits"] + self.stats_counters["disk_hits"] + self.stats_counters["misses"]
+            hits = lookups - self.stats_counters["misses"]
+            return {
+                **self.stats_counters,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_size": len(self.memory),
+                "disk_size": disk_size
+            }
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+        with self.db_lock:
+            self.touched.clear()
+            self.conn.execute("DELETE FROM llm_cache")
+            self.conn.commit()
+
+
+llm_cache = LLMCache(
+    settings.LLM_CACHE_DB_PATH,
+    memory_entries=settings.LLM_CACHE_MEMORY_ENTRIES,
+    disk_entries=settings.LLM_CACHE_DISK_ENTRIES,
+    ttl_s=settings.LLM_CACHE_TTL_S
+)
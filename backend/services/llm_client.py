@@ -0,0 +1,196 @@
+import asyncio
+import json
+import re
+import time
+from typing import Any, AsyncIterator, Dict
+import httpx
+from ..core.config import settings
+from ..core.metrics import LLM_CALLS, STAGE_SECONDS, time_stage
+from .llm_cache import llm_cache, make_cache_key
+from .llm_scheduler import llm_scheduler
+
+# Status codes worth retrying: Ollama overloaded / restarting
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+def parse_json_output(content: str) -> Dict[str, Any]:
+    """Parses model output as JSON, tolerating ```json fences and surrounding text."""
+    try:
+        # Try direct parse
+        return json.loads(content)
+    except json.JSONDecodeError:
+        # Try to find JSON block
+        match = re.search(r"```json\s*(.*?)\s*```", content, re.DOTALL)
+        if match:
+            return json.loads(match.group(1))
+        # Try to find just the brace block
+        match = re.search(r"\{.*\}", content, re.DOTALL)
+        if match:
+            return json.loads(match.group(0))
+        raise ValueError(f"Could not parse JSON from: {content}")
+
+
+class OllamaClient:
+    """
+    Shared async client for the Ollama /api/generate endpoint.
+
+    One keep-alive connection pool is reused by every LLM call site, with
+    timeouts and exponential-backoff retries on transport errors and 5xx/429.
+    Completions are served from `llm_cache` when the same prompt was seen before;
+    the rest wait for a slot from `llm_scheduler` before reaching Ollama.
+    """
+
+    def __init__(self, base_url: str = None, model: str = None):
+        self.base_url = base_url or settings.OLLAMA_BASE_URL
+        self.model = model or settings.LLM_MODEL
+        self._client: httpx.AsyncClient = None
+        self._loop = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # httpx async clients are bound to the loop they were first used on
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(settings.LLM_TIMEOUT_S, connect=settings.LLM_CONNECT_TIMEOUT_S),
+                limits=httpx.Limits(
+                    max_connections=settings.LLM_POOL_SIZE,
+                    max_keepalive_connections=settings.LLM_POOL_SIZE
+                )
+            )
+            self._loop = loop
+        return self._client
+
+    def _payload(self, prompt: str, model: str, format: str, temperature: float, stream: bool) -> Dict[str, Any]:
+        payload = {
+            "model": model or self.model,
+            "prompt": prompt,
+            "stream": stream,
+            "options": {"temperature": settings.LLM_TEMPERATURE if temperature is None else temperature}
+        }
+        if format:
+            payload["format"] = format
+        return payload
+
+    async def generate(
+        self,
+        prompt: str,
+        model: str = None,
+        format: str = "json",
+        temperature: float = None,
+        use_cache: bool = True
+    ) -> str:
+        """Returns the raw completion text. Pass use_cache=False to force a fresh generation."""
+        payload = self._payload(prompt, model, format, temperature, stream=False)
+
+        cache_key = None
+        if use_cache and settings.LLM_CACHE_ENABLED:
+            cache_key = self._cache_key(payload)
+            cached = await llm_cache.aget(cache_key)
+            if cached is not None:
+                LLM_CALLS.inc(model=payload["model"], result="cache_hit")
+                return cached
+
+        # Waiting for a scheduler slot is timed separately (llm_queue_wait)
+        async with llm_scheduler.slot():
+            try:
+                with time_stage("llm"):
+                    response_text = await self._post_with_retries(payload)
+            except Exception:
+                LLM_CALLS.inc(model=payload["model"], result="error")
+                raise
+        LLM_CALLS.inc(model=payload["model"], result="ok")
+        if cache_key is not None:
+            await llm_cache.aset(cache_key, payload["model"], response_text)
+        return response_text
+
+    def _cache_key(self, payload: Dict[str, Any]) -> str:
+        return make_cache_key(payload["model"], payload["prompt"], payload.get("format"), payload["options"]["temperature"])
+
+    async def _post_with_retries(self, payload: Dict[str, Any]) -> str:
+        client = self._get_client()
+
+        for attempt in range(settings.LLM_MAX_RETRIES + 1):
+            try:
+                response = await client.post("/api/generate", json=payload)
+                response.raise_for_status()
+                return response.json()["response"]
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in _RETRY_STATUS or attempt >= settings.LLM_MAX_RETRIES:
+                    raise
+                error = e
+            except httpx.TransportError as e:
+                if attempt >= settings.LLM_MAX_RETRIES:
+                    raise
+                error = e
+            delay = settings.LLM_RETRY_BACKOFF_S * (2 ** attempt)
+            print(f"LLM call failed ({error!r}); retrying in {delay}s")
+            await asyncio.sleep(delay)
+
+    async def stream_generate(
+        self,
+        prompt: str,
+        model: str = None,
+        format: str = "json",
+        temperature: float = None,
+        use_cache: bool = True
+    ) -> AsyncIterator[str]:
+        """
+        Yields completion tokens as Ollama produces them.
+        A cached completion is yielded as a single chunk; a finished stream is cached.
+        """
+        payload = self._payload(prompt, model, format, temperature, stream=True)
+
+        cache_key = None
+        if use_cache and settings.LLM_CACHE_ENABLED:
+            cache_key = self._cache_key(payload)
+            cached = await llm_cache.aget(cache_key)
+            if cached is not None:
+                LLM_CALLS.inc(model=payload["model"], result="cache_hit")
+                yield cached
+                return
+
+        parts = []
+        async with llm_scheduler.slot():
+            started = time.perf_counter()
+            try:
+                async with self._get_client().stream("POST", "/api/generate", json=payload) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        chunk = json.loads(line)
+                        token = chunk.get("response", "")
+                        if token:
+                            parts.append(token)
+                            yield token
+                        if chunk.get("done"):
+                            break
+            except Exception:
+                LLM_CALLS.inc(model=payload["model"], result="error")
+                raise
+        # Includes time the consumer spent between tokens, i.e. the full streamed call
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage="llm_stream")
+        LLM_CALLS.inc(model=payload["model"], result="ok")
+
+        if cache_key is not None:
+            await llm_cache.aset(cache_key, payload["model"], "".join(parts))
+
+    async def generate_json(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        content = await self.generate(prompt, format="json", **kwargs)
+        try:
+            return parse_json_output(content)
+        except ValueError:
+            # Don't keep serving a completion we can't parse
+            await self.forget(prompt, model=kwargs.get("model"), temperature=kwargs.get("temperature"))
+            raise
+
+    async def forget(self, prompt: str, model: str = None, format: str = "json", temperature: float = None):
+        """Drops the cached completion of a prompt, so the next call generates it afresh."""
+        payload = self._payload(prompt, model, format, temperature, stream=False)
+        await llm_cache.adelete(self._cache_key(payload))
+
+    async def aclose(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
@@ -0,0 +1,185 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager, contextmanager, suppress
+from typing import AsyncIterator, Awaitable, Callable, Optional
+from ..core.config import settings
+from ..core.metrics import LLM_ACTIVE, LLM_QUEUE_DEPTH, LLM_REJECTED, STAGE_SECONDS
+
+# How often a queued call re-checks its deadline and whether its client is still there
+_CHECK_INTERVAL_S = 0.5
+
+
+class LLMOverloaded(Exception):
+    """The scheduler refused or dropped a call; maps to an HTTP error with Retry-After."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class LLMRequestContext:
+    """
+    Scheduling info for the LLM calls made while serving one API request.
+    Each call may wait in the queue for at most `queue_timeout_s` (None: no limit).
+    """
+
+    def __init__(self, endpoint: str, queue_timeout_s: Optional[float] = None, is_disconnected: Callable[[], Awaitable[bool]] = None):
+        self.endpoint = endpoint
+        self.priority = settings.LLM_PRIORITIES.get(endpoint, settings.LLM_DEFAULT_PRIORITY)
+        self.queue_timeout_s = queue_timeout_s
+        self.is_disconnected = is_disconnected
+
+
+_DEFAULT_CONTEXT = LLMRequestContext("default")
+_current: contextvars.ContextVar = contextvars.ContextVar("llm_request", default=_DEFAULT_CONTEXT)
+
+
+def _new_context(endpoint: str, request=None, deadline: bool = True) -> LLMRequestContext:
+    return LLMRequestContext(
+        endpoint,
+        queue_timeout_s=settings.LLM_QUEUE_TIMEOUT_S if deadline else None,
+        is_disconnected=request.is_disconnected if request is not None else None
+    )
+
+
+@contextmanager
+def llm_request(endpoint: str, request=None, deadline: bool = True):
+    """
+    Tags every LLM call made inside the block with the endpoint's priority; with
+    `deadline`, each call may queue for at most LLM_QUEUE_TIMEOUT_S. Pass the
+    FastAPI Request so queued calls are dropped when the client goes away.
+    """
+    token = _current.set(_new_context(endpoint, request, deadline))
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+async def with_llm_request(events: AsyncIterator, endpoint: str, request=None) -> AsyncIterator:
+    """llm_request for streaming responses, whose generators run after the endpoint returns."""
+    token = _current.set(_new_context(endpoint, request))
+    try:
+        async for event in events:
+            yield event
+    finally:
+        # The generator may be closed from another context; nothing to restore then
+        with suppress(ValueError):
+            _current.reset(token)
+
+
+class LLMScheduler:
+    """
+    Admission control in front of Ollama: at most LLM_MAX_CONCURRENCY calls run at
+    once, the rest wait in a priority queue (lowest LLM_PRIORITIES value first, FIFO
+    within a priority). When the queue is full, a call evicts the newest waiter of a
+    lower priority, and is refused with 429 only if there is none. A call still
+    queued after its queue timeout gets 503, and one whose client disconnected is dropped.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.active = 0
+        self.waiters: list = []  # heap of [priority, seq, future, context]
+        self.seq = itertools.count()
+        # Moving average of call duration, for Retry-After estimates
+        self.avg_service_s = 5.0
+
+    def retry_after(self) -> int:
+        waves = (len(self.waiters) + 1) / max(1, self.max_concurrency)
+        return max(1, math.ceil(waves * self.avg_service_s))
+
+    def _update_gauges(self):
+        LLM_QUEUE_DEPTH.set(len(self.waiters))
+        LLM_ACTIVE.set(self.active)
+
+    def _overloaded(self, context: LLMRequestContext, reason: str, status_code: int, detail: str) -> LLMOverloaded:
+        LLM_REJECTED.inc(endpoint=context.endpoint, reason=reason)
+        return LLMOverloaded(status_code, detail, self.retry_after())
+
+    def _make_room(self, context: LLMRequestContext):
+        """Queue full: evict the newest lowest-priority waiter if it ranks below `context`, else refuse."""
+        victim = max(self.waiters, key=lambda entry: (entry[0], entry[1]), default=None)
+        if victim is None or victim[0] <= context.priority:
+            raise self._overloaded(context, "queue_full", 429, "LLM queue is full, try again later")
+        self.waiters.remove(victim)
+        heapq.heapify(self.waiters)
+        victim[2].set_exception(
+            self._overloaded(victim[3], "evicted", 429, "LLM queue is full, preempted by a higher-priority request")
+        )
+
+    async def _acquire(self, context: LLMRequestContext):
+        if self.active < self.max_concurrency and not self.waiters:
+            self.active += 1
+            self._update_gauges()
+            return
+        if len(self.waiters) >= self.max_queue:
+            self._make_room(context)
+
+        deadline = time.monotonic() + context.queue_timeout_s if context.queue_timeout_s is not None else None
+        future = asyncio.get_running_loop().create_future()
+        entry = [context.priority, next(self.seq), future, context]
+        heapq.heappush(self.waiters, entry)
+        self._update_gauges()
+        try:
+            while True:
+                timeout = _CHECK_INTERVAL_S
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise self._overloaded(context, "deadline", 503, "LLM is busy, request timed out in queue")
+                    timeout = min(timeout, remaining)
+                try:
+                    # The slot is handed over by _release, already counted in self.active
+                    await asyncio.wait_for(asyncio.shield(future), timeout)
+                    return
+                except asyncio.TimeoutError:
+                    if context.is_disconnected is not None and await context.is_disconnected():
+                        raise self._overloaded(context, "disconnected", 499, "Client disconnected")
+        except BaseException:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                # Got the slot just as we gave up: pass it on
+                self._release()
+            else:
+                if not future.done():
+                    future.cancel()
+                if entry in self.waiters:
+                    self.waiters.remove(entry)
+                    heapq.heapify(self.waiters)
+            raise
+        finally:
+            self._update_gauges()
+
+    def _release(self):
+        while self.waiters:
+            future = heapq.heappop(self.waiters)[2]
+            if not future.done():
+                future.set_result(None)
+                break
+        else:
+            self.active -= 1
+        self._update_gauges()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Holds one of the LLM_MAX_CONCURRENCY slots for the duration of the block."""
+        context = _current.get()
+        queued = time.perf_counter()
+        await self._acquire(context)
+        started = time.perf_counter()
+        STAGE_SECONDS.observe(started - queued, stage="llm_queue_wait")
+        try:
+            yield
+        finally:
+            self.avg_service_s = 0.8 * self.avg_service_s + 0.2 * (time.perf_counter() - started)
+            self._release()
+
+
+llm_scheduler = LLMScheduler(settings.LLM_MAX_CONCURRENCY, settings.LLM_MAX_QUEUE)
@@ -1,5 +1,11 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+import numpy as np
+from ..core.config import settings
+from ..core.metrics import time_stage
 from ..db.vector_store import vector_store
+from ..db.job_index import job_index, normalize_rows
+from ..db.skill_index import skill_index
+from .skill_matcher import skill_matcher
 
 def calculate_match_score(profile_embedding: List[float], job_embedding: List[float]) -> float:
     """
@@ -10,62 +16,182 @@ def calculate_match_score(profile_embedding: List[float], job_embedding: List[fl
     # For now, we rely on ChromaDB's query ranking.
     pass
 
-def find_matches(profile_id: str, n_results: int = 20) -> List[Dict[str, Any]]:
+def build_where(job_type: Optional[str] = None, experience: Optional[str] = None, min_days_left: Optional[int] = None) -> Optional[Dict[str, Any]]:
     """
-    Finds the best matching jobs for a given profile.
+    Metadata filter for the vector query, so filtering happens before ranking.
     """
-    # 1. Get Profile Embedding
-    profile_data = vector_store.profiles_collection.get(
-        ids=[profile_id],
-        include=["embeddings", "metadatas"]
-    )
-    
-    if profile_data["embeddings"] is None or len(profile_data["embeddings"]) == 0:
+    conditions = []
+    if job_type:
+        conditions.append({"job_type": job_type})
+    if experience:
+        conditions.append({"experience": experience})
+    if min_days_left is not None:
+        conditions.append({"days_left": {"$gte": min_days_left}})
+
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
+def _similarities(query_embedding: List[float], embeddings: List[List[float]]) -> List[float]:
+    # Cosine similarity, computed exactly as job_index does, so MATCH_BACKEND doesn't
+    # change scores. Chroma's default distance (squared L2) only maps to cosine for unit vectors.
+    if embeddings is None or len(embeddings) == 0:
         return []
-        
-    profile_embedding = profile_data["embeddings"][0]
-    
-    # 2. Query Jobs Collection
-    results = vector_store.jobs_collection.query(
-        query_embeddings=[profile_embedding],
-        n_results=n_results
-    )
-    
+    rows = normalize_rows(np.asarray(embeddings, dtype=np.float32))
+    query = normalize_rows(np.asarray([query_embedding], dtype=np.float32))[0]
+    return [float(score) for score in rows @ query]
+
+def _format_matches(hits: List[Tuple[str, Dict[str, Any], float]], profile_skills: List[str]) -> List[Dict[str, Any]]:
+    # Final score blends vector similarity with the share of the job's skills the profile has
+    weight = settings.MATCH_SKILL_WEIGHT if profile_skills else 0.0
+    overlap = skill_index.overlap(profile_skills, [job_id for job_id, _, _ in hits]) if weight else {}
+
+    scored = []
+    for job_id, metadata, similarity in hits:
+        skill_overlap = overlap.get(job_id, 0.0)
+        score = (1 - weight) * max(0.0, similarity) + weight * skill_overlap
+        scored.append((score, skill_overlap, job_id, metadata))
+    scored.sort(key=lambda item: item[0], reverse=True)
+
     matches = []
     seen_jobs = set()
-    
-    if results["ids"]:
-        for i, job_id in enumerate(results["ids"][0]):
-            metadata = results["metadatas"][0][i]
-            title = metadata["title"]
-            company = metadata["company"]
-            
-            # Deduplication: Check if (title, company) already seen in this result set
-            job_key = (title.lower(), company.lower())
-            if job_key in seen_jobs:
-                continue
-            seen_jobs.add(job_key)
-            
-            # ChromaDB returns L2 distance by default.
-            # For normalized vectors: similarity = 1 - (distance^2) / 2
-            # distance ranges from 0 (identical) to 2 (opposite).
-            distance = results["distances"][0][i]
-            similarity = 1 - (distance ** 2) / 2
-            match_score = max(0.0, similarity) * 100
-            
-            matches.append({
-                "job_id": job_id,
-                "title": title,
-                "company": company,
-                "score": round(match_score, 1), # Return 0-100 score
-                "skills": metadata.get("skills", ""),
-                "url": metadata.get("url", "#"),
-                "applicants": metadata.get("applicants", 0),
-                "days_left": metadata.get("days_left", 0),
-                "salary": metadata.get("salary", "Not Disclosed"),
-                "job_type": metadata.get("job_type", "Full Time"),
-                "experience": metadata.get("experience", "Entry Level"),
-                "posted_date": metadata.get("posted_date", "Recently")
-            })
-            
+
+    for score, skill_overlap, job_id, metadata in scored:
+        title = metadata["title"]
+        company = metadata["company"]
+
+        # Deduplication: Check if (title, company) already seen in this result set
+        # (new jobs are deduplicated at ingestion; this guards rows stored before that)
+        job_key = (title.lower(), company.lower())
+        if job_key in seen_jobs:
+            continue
+        seen_jobs.add(job_key)
+
+        matches.append({
+            "job_id": job_id,
+            "title": title,
+            "company": company,
+            "score": round(score * 100, 1), # Return 0-100 score
+            "skill_overlap": round(skill_overlap * 100, 1),
+            "skills": metadata.get("skills", ""),
+            "url": metadata.get("url", "#"),
+            "applicants": metadata.get("applicants", 0),
+            "days_left": metadata.get("days_left", 0),
+            "salary": metadata.get("salary", "Not Disclosed"),
+            "job_type": metadata.get("job_type", "Full Time"),
+            "experience": metadata.get("experience", "Entry Level"),
+            "posted_date": metadata.get("posted_date", "Recently")
+        })
+
     return matches
+
+def _search(query_embeddings: List[List[float]], k: int, where: Optional[Dict[str, Any]]) -> List[List[Tuple[str, Dict[str, Any], float]]]:
+    """Top k (job_id, metadata, similarity) per query, from the backend chosen by MATCH_BACKEND."""
+    if settings.MATCH_BACKEND == "numpy":
+        with time_stage("job_index_search"):
+            return job_index.search(query_embeddings, k, where=where)
+
+    with time_stage("chroma_read"):
+        results = vector_store.jobs_collection.query(
+            query_embeddings=query_embeddings,
+            n_results=k,
+            where=where,
+            include=["metadatas", "embeddings"]
+        )
+    if not results["ids"]:
+        return [[] for _ in query_embeddings]
+    return [
+        list(zip(results["ids"][i], results["metadatas"][i], _similarities(query_embeddings[i], results["embeddings"][i])))
+        for i in range(len(query_embeddings))
+    ]
+
+def _query_jobs(query_embeddings: List[List[float]], profile_skills: List[List[str]], n_results: int, where: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+    """
+    Ranked, deduplicated matches per query embedding.
+
+    Fetches MATCH_OVERFETCH x n_results candidates (room for the skill re-rank and
+    dedup), and re-queries with twice the depth only for queries that still came up
+    short while more candidates exist, up to MATCH_MAX_FETCH.
+    """
+    results: List[List[Dict[str, Any]]] = [[] for _ in query_embeddings]
+    pending = list(range(len(query_embeddings)))
+    fetch = min(n_results * settings.MATCH_OVERFETCH, settings.MATCH_MAX_FETCH)
+    while pending:
+        hits_per_query = _search([query_embeddings[i] for i in pending], fetch, where)
+        short = []
+        for i, hits in zip(pending, hits_per_query):
+            matches = _format_matches(hits, profile_skills[i])
+            exhausted = len(hits) < fetch or fetch >= settings.MATCH_MAX_FETCH
+            if len(matches) < n_results and not exhausted:
+                short.append(i)
+            else:
+                results[i] = matches[:n_results]
+        pending = short
+        fetch = min(fetch * 2, settings.MATCH_MAX_FETCH)
+    return results
+
+def _profile_skills(metadata: Optional[Dict[str, Any]]) -> List[str]:
+    skills = (metadata or {}).get("skills", "")
+    return skill_matcher.canonical_list(s for s in skills.split(",") if s.strip())
+
+def find_matches(profile_id: str, n_results: int = 20, job_type: Optional[str] = None, experience: Optional[str] = None, min_days_left: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Finds the best matching jobs for a given profile, optionally filtered by
+    job type, experience and minimum days left to apply.
+    """
+    # 1. Get Profile Embedding
+    with time_stage("chroma_read"):
+        profile_data = vector_store.profiles_collection.get(
+            ids=[profile_id],
+            include=["embeddings", "metadatas"]
+        )
+
+    if profile_data["embeddings"] is None or len(profile_data["embeddings"]) == 0:
+        return []
+
+    profile_embedding = profile_data["embeddings"][0]
+    profile_skills = _profile_skills(profile_data["metadatas"][0])
+
+    # 2. Query Jobs
+    where = build_where(job_type, experience, min_days_left)
+    return _query_jobs([profile_embedding], [profile_skills], n_results, where)[0]
+
+def find_matches_many(profile_ids: Optional[List[str]] = None, n_results: int = 20, job_type: Optional[str] = None, experience: Optional[str] = None, min_days_left: Optional[int] = None) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    Batch variant of find_matches for digests: yields (profile_id, matches) per profile.
+
+    All profile embeddings are fetched with one get, and jobs are searched with one
+    multi-query per MATCH_BATCH_SIZE profiles instead of one round trip per profile.
+    Passing no profile_ids matches every stored profile.
+    """
+    if profile_ids is None:
+        profile_ids = vector_store.profiles_collection.get(include=[])["ids"]
+    if not profile_ids:
+        return
+
+    # 1. Get all Profile Embeddings in one call (unknown ids are simply absent)
+    with time_stage("chroma_read"):
+        profile_data = vector_store.profiles_collection.get(ids=profile_ids, include=["embeddings", "metadatas"])
+    embeddings, skills = {}, {}
+    if profile_data["embeddings"] is not None:
+        embeddings = dict(zip(profile_data["ids"], profile_data["embeddings"]))
+        skills = {pid: _profile_skills(m) for pid, m in zip(profile_data["ids"], profile_data["metadatas"])}
+
+    for profile_id in profile_ids:
+        if profile_id not in embeddings:
+            yield profile_id, []
+
+    # 2. Multi-query the Jobs, one batch at a time
+    where = build_where(job_type, experience, min_days_left)
+    found_ids = [pid for pid in profile_ids if pid in embeddings]
+    for start in range(0, len(found_ids), settings.MATCH_BATCH_SIZE):
+        batch = found_ids[start:start + settings.MATCH_BATCH_SIZE]
+        matches = _query_jobs(
+            [embeddings[pid] for pid in batch],
+            [skills[pid] for pid in batch],
+            n_results,
+            where
+        )
+        yield from zip(batch, matches)
@@ -1,16 +1,58 @@
 import fitz  # PyMuPDF
-from typing import Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Union
+from ..core.config import settings
+from ..core.metrics import timed
 
-def parse_resume(file_path: str) -> Dict[str, Any]:
+# PyMuPDF is not thread-safe, so parallel extraction uses processes
+_page_pool: ProcessPoolExecutor = None
+
+def _open(source: Union[bytes, str]):
+    # Bytes come straight from the upload; a str is treated as a file path
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=bytes(source), filetype="pdf")
+    return fitz.open(source)
+
+def _extract_pages(source: Union[bytes, str], start: int, stop: int) -> List[str]:
+    with _open(source) as doc:
+        return [doc[i].get_text() for i in range(start, stop)]
+
+def _extract_pages_parallel(source: Union[bytes, str], page_count: int) -> List[str]:
+    global _page_pool
+    if _page_pool is None:
+        _page_pool = ProcessPoolExecutor(max_workers=settings.PARSER_WORKERS)
+
+    # One contiguous page range per worker keeps the number of re-opens low
+    chunk = -(-page_count // settings.PARSER_WORKERS)
+    ranges = [(start, min(start + chunk, page_count)) for start in range(0, page_count, chunk)]
+    futures = [_page_pool.submit(_extract_pages, source, start, stop) for start, stop in ranges]
+
+    pages = []
+    for future in futures:
+        pages.extend(future.result())
+    return pages
+
+@timed("parse")
+def parse_resume(source: Union[bytes, str], parallel: bool = None) -> Dict[str, Any]:
     """
-    Extracts text from a PDF resume.
+    Extracts text from a PDF resume, given its raw bytes or a file path.
+
+    Returns the full text plus a per-page list so later stages can work per
+    section without re-reading the file. Large documents (PARSER_PARALLEL_MIN_PAGES
+    and up) are split across worker processes unless `parallel` says otherwise.
     """
-    doc = fitz.open(file_path)
-    text = ""
-    for page in doc:
-        text += page.get_text()
-    
+    with _open(source) as doc:
+        page_count = len(doc)
+        if parallel is None:
+            parallel = page_count >= settings.PARSER_PARALLEL_MIN_PAGES
+        if not (parallel and page_count > 1):
+            pages = [page.get_text() for page in doc]
+
+    if parallel and page_count > 1:
+        pages = _extract_pages_parallel(source, page_count)
+
     return {
-        "text": text,
-        "page_count": len(doc)
+        "text": "".join(pages),
+        "pages": pages,
+        "page_count": page_count
     }
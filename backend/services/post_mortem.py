@@ -1,11 +1,8 @@
-import requests
-import json
 from typing import Dict, Any
+from ..core.models import get_llm
+from .llm_scheduler import LLMOverloaded
 
-OLLAMA_URL = "http://localhost:11434/api/generate"
-MODEL_NAME = "gemma3:1b"
-
-def analyze_rejection(job_title: str, job_description: str, user_skills: list, rejection_reason: str = None) -> Dict[str, Any]:
+async def analyze_rejection(job_title: str, job_description: str, user_skills: list, rejection_reason: str = None, use_cache: bool = True) -> Dict[str, Any]:
     """
     Analyzes why a user might have been rejected (or would be rejected) 
     and suggests a corrective action plan.
@@ -32,18 +29,10 @@ def analyze_rejection(job_title: str, job_description: str, user_skills: list, r
     Return ONLY JSON.
     """
     
-    payload = {
-        "model": MODEL_NAME,
-        "prompt": prompt,
-        "stream": False,
-        "format": "json"
-    }
-    
     try:
-        response = requests.post(OLLAMA_URL, json=payload)
-        response.raise_for_status()
-        result = response.json()
-        return json.loads(result["response"])
+        return await get_llm().generate_json(prompt, use_cache=use_cache)
+    except LLMOverloaded:
+        raise
     except Exception as e:
         print(f"Error analyzing rejection: {e}")
         return {
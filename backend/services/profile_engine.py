@@ -1,63 +1,75 @@
-import spacy
-from sentence_transformers import SentenceTransformer
+import re
 from ..core.config import settings
+from ..core.models import get_nlp, get_embedding_model
+from ..core.metrics import time_stage
+from .skill_matcher import TECH_KEYWORDS, skill_matcher, display_name
+from .embedding_cache import embedding_cache, embedding_key
 from typing import Dict, Any, List
 
-# Load models (lazy loading recommended in production, but fine here)
-try:
-    nlp = spacy.load(settings.NER_MODEL)
-except OSError:
-    import subprocess
-    import sys
-    subprocess.check_call([sys.executable, "-m", "spacy", "download", settings.NER_MODEL])
-    nlp = spacy.load(settings.NER_MODEL)
-
-embedding_model = SentenceTransformer(settings.EMBEDDING_MODEL)
-
-# Comprehensive list of tech skills for keyword matching
-TECH_KEYWORDS = {
-    "python", "java", "c++", "c#", "javascript", "typescript", "react", "angular", "vue", "node.js", "node",
-    "django", "flask", "fastapi", "spring", "springboot", "hibernate", "dotnet", ".net",
-    "aws", "azure", "gcp", "docker", "kubernetes", "jenkins", "terraform", "ansible",
-    "sql", "mysql", "postgresql", "mongodb", "redis", "cassandra", "elasticsearch",
-    "git", "github", "gitlab", "jira", "agile", "scrum",
-    "machine learning", "deep learning", "nlp", "computervision", "tensorflow", "pytorch", "pandas", "numpy", "scikit-learn",
-    "html", "css", "sass", "less", "bootstrap", "tailwind", "material-ui",
-    "linux", "unix", "bash", "shell", "powershell",
-    "rest", "graphql", "grpc", "microservices", "api",
-    "flutter", "dart", "react native", "swift", "kotlin", "android", "ios",
-    "figma", "adobe xd", "sketch"
-}
-
-def extract_skills(text: str) -> List[str]:
-    skills = set()
-    text_lower = text.lower()
-    
-    # 1. Keyword Matching (Case-insensitive)
-    for keyword in TECH_KEYWORDS:
-        # Use regex to match whole words only (avoid matching "java" in "javascript" if not careful, though set handles duplicates)
-        # Simple check: is the keyword in the text?
-        # For better precision, we can use regex word boundaries: \bkeyword\b
-        if re.search(r'\b' + re.escape(keyword) + r'\b', text_lower):
-            # Capitalize for display (simple heuristic)
-            if keyword == "aws" or keyword == "sql" or keyword == "api":
-                skills.add(keyword.upper())
-            elif keyword == "node.js" or keyword == "react.js":
-                skills.add(keyword.title())
-            else:
-                skills.add(keyword.title())
-
-    # 2. NER Extraction (Fallback/Supplement)
-    doc = nlp(text)
+def _add_ner_skills(skills: set, doc):
+    lowered = {s.lower() for s in skills}
     for ent in doc.ents:
         if ent.label_ in ["ORG", "PRODUCT", "WORK_OF_ART"]:
             # Filter out common false positives if needed
-            if ent.text.lower() not in skills:
+            if ent.text.lower() not in lowered:
                 skills.add(ent.text)
-                
+                lowered.add(ent.text.lower())
+
+def extract_skills(text: str, doc=None) -> List[str]:
+    """
+    Pass an already parsed `doc` to reuse it instead of running spaCy again.
+    """
+    # 1. Keyword Matching (single pass over the compiled skill trie)
+    skills = {display_name(keyword) for keyword in skill_matcher.find(text)}
+
+    # 2. NER Extraction (Fallback/Supplement)
+    if doc is None:
+        with time_stage("ner"):
+            doc = get_nlp()(text)
+    _add_ner_skills(skills, doc)
+
     return list(skills)
 
-import re
+def extract_skills_many(texts: List[str], batch_size: int = None) -> List[List[str]]:
+    """
+    Bulk variant of extract_skills for scraped snippets.
+    Streams the texts through spaCy with nlp.pipe instead of one call per text.
+    """
+    results = []
+    # nlp.pipe is lazy, so the parsing happens (and is timed) inside the loop
+    with time_stage("ner_batch"):
+        docs = get_nlp().pipe(texts, batch_size=batch_size or settings.NER_BATCH_SIZE)
+        for text, doc in zip(texts, docs):
+            skills = {display_name(keyword) for keyword in skill_matcher.find(text)}
+            _add_ner_skills(skills, doc)
+            results.append(list(skills))
+    return results
+
+def encode_texts(texts: List[str], batch_size: int = None) -> List[List[float]]:
+    """
+    Embeds texts, serving previously seen texts from the embedding cache.
+    Only cache misses (deduplicated) go through the model, in one batched call.
+    """
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        with time_stage("encode"):
+            return get_embedding_model().encode(texts, batch_size=batch_size or settings.EMBEDDING_BATCH_SIZE).tolist()
+
+    keys = [embedding_key(settings.EMBEDDING_MODEL, text) for text in texts]
+    vectors = embedding_cache.get_many(keys)
+
+    missing = {}
+    for key, text, vector in zip(keys, texts, vectors):
+        if vector is None:
+            missing.setdefault(key, text)
+    if missing:
+        with time_stage("encode"):
+            encoded = get_embedding_model().encode(
+                list(missing.values()), batch_size=batch_size or settings.EMBEDDING_BATCH_SIZE
+            ).tolist()
+        embedding_cache.put_many(list(missing), settings.EMBEDDING_MODEL, encoded)
+        fresh = dict(zip(missing, encoded))
+        vectors = [vector if vector is not None else fresh[key] for key, vector in zip(keys, vectors)]
+    return vectors
 
 def extract_contact_info(text: str):
     # Simple regex for email
@@ -70,21 +82,18 @@ def extract_contact_info(text: str):
     
     return email, phone
 
-def clean_name(name: str, nlp_model) -> str:
+def clean_name(name: str, gpe_terms: set = None) -> str:
     if not name:
         return "Candidate"
     
     # 1. Remove newlines and extra spaces
     name = " ".join(name.split())
     
-    # 2. Check for GPE (Location) inside the name string
-    doc = nlp_model(name)
-    clean_parts = []
-    for token in doc:
-        # If token is part of a GPE, skip it (naive but helps with "Name City")
-        if token.ent_type_ == "GPE":
-            continue
-        clean_parts.append(token.text)
+    # 2. Drop locations inside the name string.
+    # `gpe_terms` holds the GPE entities of the resume Doc, so no re-parse is needed
+    # (the city in "Name City" usually also appears in the address line).
+    gpe_terms = gpe_terms or set()
+    clean_parts = [part for part in name.split() if part.lower() not in gpe_terms]
     
     cleaned = " ".join(clean_parts)
     
@@ -94,22 +103,23 @@ def clean_name(name: str, nlp_model) -> str:
     if len(words) > 3:
         return " ".join(words[:2])
     
-    return cleaned
+    return cleaned or "Candidate"
 
-def generate_profile(text: str) -> Dict[str, Any]:
-    skills = extract_skills(text)
-    embedding = embedding_model.encode(text).tolist()
+def _build_profile(text: str, doc, embedding: List[float]) -> Dict[str, Any]:
+    # Single spaCy Doc shared by skill, name and location extraction
+    skills = extract_skills(text, doc=doc)
     
     # Extract entities for Name and Location
-    doc = nlp(text)
     name = None
+    gpe_terms = set()
     for ent in doc.ents:
         if ent.label_ == "PERSON" and not name:
             name = ent.text
-            break
+        elif ent.label_ == "GPE":
+            gpe_terms.update(part.lower() for part in ent.text.split())
     
     # Clean the extracted name
-    final_name = clean_name(name, nlp)
+    final_name = clean_name(name, gpe_terms)
             
     email, phone = extract_contact_info(text)
     
@@ -121,3 +131,25 @@ def generate_profile(text: str) -> Dict[str, Any]:
         "embedding_vector": embedding,
         "raw_text_summary": text[:200] + "..."
     }
+
+def generate_profile(text: str) -> Dict[str, Any]:
+    with time_stage("ner"):
+        doc = get_nlp()(text)
+    embedding = encode_texts([text])[0]
+    return _build_profile(text, doc, embedding)
+
+def generate_profiles(texts: List[str], batch_size: int = None, n_process: int = None) -> List[Dict[str, Any]]:
+    """
+    Batched generate_profile for bulk resume imports.
+    Parses all texts with nlp.pipe and embeds them in a single (cached) encode call.
+    """
+    batch_size = batch_size or settings.NER_BATCH_SIZE
+    n_process = n_process or settings.NER_N_PROCESS
+    
+    docs = get_nlp().pipe(texts, batch_size=batch_size, n_process=n_process)
+    embeddings = encode_texts(texts, batch_size=batch_size)
+    
+    return [
+        _build_profile(text, doc, embedding)
+        for text, doc, embedding in zip(texts, docs, embeddings)
+    ]
@@ -1,32 +1,151 @@
-from backend.agents.roadmap_graph import roadmap_graph
+import asyncio
+import logging
+import time
+import traceback
+from backend.core.config import settings
+from backend.core.metrics import STAGE_SECONDS, log_event
+from backend.agents.roadmap_graph import (
+    get_roadmap_graph,
+    gap_analyzer_node,
+    curriculum_architect_node,
+    build_architect_prompt,
+    uses_fragment_cache,
+    reviewer_node,
+    should_continue,
+)
+from backend.services.llm_scheduler import LLMOverloaded, llm_request
+from backend.services.streaming import stream_llm_json
 
-def generate_roadmap(profile_skills: list[str], job_skills: str, job_title: str):
-    """
-    Generates a learning roadmap using a Multi-Agent LangGraph system.
-    """
-    print(f"--- STARTING AGENTIC WORKFLOW for {job_title} ---")
-    
-    # Initial State
-    initial_state = {
+# Keeps references to background reviews so they aren't garbage-collected mid-run
+_background_reviews = set()
+
+def _initial_state(profile_skills: list[str], job_skills: str, job_title: str, use_cache: bool):
+    return {
         "user_skills": profile_skills,
         "job_title": job_title,
         "job_skills": job_skills,
         "missing_skills": [],
         "roadmap_json": {},
         "feedback": "",
-        "iteration_count": 0
+        "iteration_count": 0,
+        "use_cache": use_cache,
+        "timings": {}
     }
-    
+
+async def _review_in_background(state: dict):
+    # The roadmap was already returned; a REJECT makes reviewer_node drop the cached
+    # fragments / completion it came from, so the next request for it is regenerated
+    try:
+        # Lowest priority and no deadline: it must not hold up requests, and nobody is waiting on it
+        with llm_request("background", deadline=False):
+            review = await reviewer_node(state)
+        log_event(
+            "roadmap_background_review",
+            sample_rate=1.0 if review.get("review_status") == "REJECT" else settings.LOG_SAMPLE_RATE,
+            job_title=state['job_title'],
+            status=review.get("review_status"),
+            seconds=review['timings']['reviewer']
+        )
+    except Exception as e:
+        log_event("roadmap_background_review_error", level=logging.ERROR, job_title=state['job_title'], error=repr(e))
+
+def _schedule_review(state: dict):
+    # ROADMAP_REVIEWER="async": the response is already on its way, review off the critical path
+    task = asyncio.create_task(_review_in_background(state))
+    _background_reviews.add(task)
+    task.add_done_callback(_background_reviews.discard)
+
+async def generate_roadmap(profile_skills: list[str], job_skills: str, job_title: str, use_cache: bool = True):
+    """
+    Generates a learning roadmap using a Multi-Agent LangGraph system.
+    """
+    # Initial State
+    initial_state = _initial_state(profile_skills, job_skills, job_title, use_cache)
+
     # Invoke the Graph
     try:
-        result = roadmap_graph.invoke(initial_state)
+        # ainvoke keeps the event loop free while the agents wait on the LLM
+        result = await get_roadmap_graph().ainvoke(initial_state)
         # Extract Final Output
         roadmap = result.get("roadmap_json", {})
+    except LLMOverloaded:
+        raise
     except Exception as e:
-        print(f"CRITICAL ERROR in Roadmap Graph: {e}")
-        import traceback
-        traceback.print_exc()
-        return {"error": str(e), "traceback": traceback.format_exc()}
-    
-    print("--- AGENTIC WORKFLOW COMPLETED ---")
-    return roadmap
+        trace = traceback.format_exc()
+        log_event("roadmap_error", level=logging.ERROR, job_title=job_title, error=repr(e), traceback=trace)
+        return {"error": str(e), "traceback": trace}
+
+    if settings.ROADMAP_REVIEWER == "async":
+        _schedule_review(result)
+
+    log_event("roadmap", sample_rate=settings.LOG_SAMPLE_RATE, job_title=job_title, timings=result.get("timings", {}))
+    return {**roadmap, "timings": result.get("timings", {})}
+
+async def stream_roadmap(profile_skills: list[str], job_skills: str, job_title: str, use_cache: bool = True):
+    """
+    Streaming variant of generate_roadmap, yielding (event, data) pairs.
+
+    Runs the same agents as the graph (analyst -> architect -> reviewer) step by step
+    so progress can be reported: "agent" events mark each agent starting/finishing
+    (with its timing), and the architect's tokens and partial nodes/edges are
+    forwarded as they arrive. With ROADMAP_REVIEWER="on" the draft is reviewed before
+    "result", and a rejected draft is revised (not streamed) up to ROADMAP_MAX_REVISIONS
+    times, so "result" may differ from the streamed partials. With "async" the
+    review runs after "result".
+    """
+    state = _initial_state(profile_skills, job_skills, job_title, use_cache)
+
+    yield "agent", {"name": "analyst", "status": "started"}
+    state.update(await gap_analyzer_node(state))
+    yield "agent", {
+        "name": "analyst",
+        "status": "completed",
+        "missing_skills": state["missing_skills"],
+        "seconds": state["timings"]["analyst"]
+    }
+
+    yield "agent", {"name": "architect", "status": "started"}
+    if uses_fragment_cache(state):
+        # Composed from cached fragments: usually no LLM call, so nothing to stream
+        state.update(await curriculum_architect_node(state))
+        roadmap = state["roadmap_json"]
+        for key in ("nodes", "edges"):
+            for item in roadmap.get(key, []):
+                yield "partial", {"type": "item", "key": key, "value": item}
+    else:
+        started = time.perf_counter()
+        roadmap = {}
+        async for event, data in stream_llm_json(build_architect_prompt(state), use_cache=use_cache):
+            if event == "result":
+                roadmap = data
+            elif event == "error":
+                log_event("roadmap_agent_error", level=logging.WARNING, agent="architect", error=data['detail'])
+            else:
+                yield event, data
+        state["roadmap_json"] = roadmap
+        state["iteration_count"] += 1
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage="roadmap_architect")
+        log_event("roadmap_agent", sample_rate=settings.LOG_SAMPLE_RATE, agent="architect", job_title=job_title, seconds=round(elapsed, 3), streamed=True)
+        state["timings"]["architect"] = round(elapsed, 3)
+    yield "agent", {"name": "architect", "status": "completed", "seconds": state["timings"]["architect"]}
+
+    while settings.ROADMAP_REVIEWER == "on":
+        yield "agent", {"name": "reviewer", "status": "started"}
+        state.update(await reviewer_node(state))
+        yield "agent", {
+            "name": "reviewer",
+            "status": "completed",
+            "review_status": state["review_status"],
+            "feedback": state["feedback"],
+            "seconds": state["timings"]["reviewer"]
+        }
+        if should_continue(state) == "approve":
+            break
+        yield "agent", {"name": "architect", "status": "started", "revision": state["iteration_count"]}
+        state.update(await curriculum_architect_node(state))
+        yield "agent", {"name": "architect", "status": "completed", "seconds": state["timings"]["architect"]}
+
+    yield "result", {**state["roadmap_json"], "timings": state["timings"]}
+    if settings.ROADMAP_REVIEWER == "async":
+        _schedule_review(state)
@@ -0,0 +1,169 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List
+from ..core.config import settings
+from .skill_matcher import skill_matcher
+
+PHASES = ["Basics", "Intermediate", "Advanced"]
+
+# Target-role families: fragments are shared by every title in the same family.
+# Markers match whole words ("ml" in "ML Engineer", not in "HTML Developer")
+ROLE_FAMILIES = {
+    "ml": ["machine learning", "ml", "ai", "deep learning", "nlp", "computer vision"],
+    "data": ["data engineer", "data analyst", "data scientist", "analytics", "bi developer"],
+    "devops": [
+        "devops", "sre", "site reliability", "cloud engineer", "cloud architect",
+        "platform engineer", "infrastructure engineer",
+    ],
+    "mobile": ["android", "ios", "mobile", "flutter", "react native"],
+    "fullstack": ["full stack", "fullstack", "full-stack"],
+    "frontend": ["frontend", "front end", "front-end", "ui developer", "ui engineer", "web developer"],
+    "backend": ["backend", "back end", "back-end", "api developer"],
+}
+
+_FAMILY_PATTERNS = {
+    family: re.compile(r"\b(?:" + "|".join(re.escape(m).replace(r"\ ", r"\s+") for m in markers) + r")\b")
+    for family, markers in ROLE_FAMILIES.items()
+}
+
+
+def role_family(job_title: str) -> str:
+    title = job_title.lower()
+    for family, pattern in _FAMILY_PATTERNS.items():
+        if pattern.search(title):
+            return family
+    return "general"
+
+
+def skill_key(skill: str) -> str:
+    """Canonical cache key for a skill ("K8s" and "Kubernetes" share fragments)."""
+    return skill_matcher.canonicalize(skill) or " ".join(skill.lower().split())
+
+
+def normalize_fragment(skill: str, steps: Any) -> List[Dict[str, Any]]:
+    """Coerces LLM output for one skill into [{label, phase, weeks, description}]."""
+    fragment = []
+    for step in steps if isinstance(steps, list) else []:
+        if not isinstance(step, dict) or not step.get("label"):
+            continue
+        phase = step.get("phase") if step.get("phase") in PHASES else PHASES[min(len(fragment), 2)]
+        weeks = step.get("weeks", 1)
+        if not isinstance(weeks, int):
+            match = re.search(r"\d+", str(weeks))
+            weeks = int(match.group(0)) if match else 1
+        fragment.append({
+            "label": str(step["label"]),
+            "phase": phase,
+            "weeks": max(1, min(weeks, 8)),
+            "description": str(step.get("description", ""))
+        })
+    return fragment
+
+
+def fallback_fragment(skill: str) -> List[Dict[str, Any]]:
+    """Deterministic placeholder used when the LLM gave nothing usable (never cached)."""
+    return [
+        {"label": f"{skill} Fundamentals", "phase": "Basics", "weeks": 1,
+         "description": f"Core concepts, terminology and setup for {skill}."},
+        {"label": f"Build a Project with {skill}", "phase": "Intermediate", "weeks": 2,
+         "description": f"Apply {skill} in a small end-to-end project."},
+        {"label": f"{skill} in Production", "phase": "Advanced", "weeks": 1,
+         "description": f"Performance, security and best practices for {skill}."},
+    ]
+
+
+def compose_roadmap(skills: List[str], fragments: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Stitches per-skill fragments into the {nodes, edges} graph the frontend renders.
+
+    Nodes are laid out phase by phase (all Basics first), weeks run consecutively
+    across the whole roadmap, and each skill's steps are chained with edges.
+    """
+    nodes, edges = [], []
+    last_node_for_skill = {}
+    week = 1
+    for phase in PHASES:
+        for skill in skills:
+            for step in fragments.get(skill, []):
+                if step["phase"] != phase:
+                    continue
+                node_id = str(len(nodes) + 1)
+                end_week = week + step["weeks"] - 1
+                nodes.append({
+                    "id": node_id,
+                    "label": step["label"],
+                    "phase": phase,
+                    "week": f"Week {week}" if end_week == week else f"Week {week}-{end_week}",
+                    "description": step["description"],
+                    "skill": skill
+                })
+                if skill in last_node_for_skill:
+                    edges.append({"source": last_node_for_skill[skill], "target": node_id})
+                last_node_for_skill[skill] = node_id
+                week = end_week + 1
+    return {"nodes": nodes, "edges": edges}
+
+
+class FragmentStore:
+    """
+    Roadmap fragments per (canonical skill, role family), in SQLite with an in-memory front.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS roadmap_fragments ("
+            "skill TEXT, family TEXT, fragment TEXT, created_at REAL, PRIMARY KEY (skill, family))"
+        )
+        self.conn.commit()
+        self.lock = threading.Lock()
+        self.memory: Dict[tuple, List[Dict[str, Any]]] = {}
+
+    def get_many(self, skills: List[str], family: str) -> Dict[str, List[Dict[str, Any]]]:
+        found = {}
+        with self.lock:
+            missing = []
+            for skill in skills:
+                if (skill, family) in self.memory:
+                    found[skill] = self.memory[(skill, family)]
+                else:
+                    missing.append(skill)
+            if missing:
+                placeholders = ",".join("?" * len(missing))
+                rows = self.conn.execute(
+                    f"SELECT skill, fragment FROM roadmap_fragments WHERE family = ? AND skill IN ({placeholders})",
+                    [family, *missing]
+                ).fetchall()
+                for skill, fragment in rows:
+                    found[skill] = self.memory[(skill, family)] = json.loads(fragment)
+        return found
+
+    def put_many(self, family: str, fragments: Dict[str, List[Dict[str, Any]]]):
+        now = time.time()
+        with self.lock:
+            for skill, fragment in fragments.items():
+                self.memory[(skill, family)] = fragment
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO roadmap_fragments (skill, family, fragment, created_at) VALUES (?, ?, ?, ?)",
+                [(skill, family, json.dumps(fragment), now) for skill, fragment in fragments.items()]
+            )
+            self.conn.commit()
+
+    def delete_many(self, skills: List[str], family: str):
+        with self.lock:
+            for skill in skills:
+                self.memory.pop((skill, family), None)
+            self.conn.executemany(
+                "DELETE FROM roadmap_fragments WHERE skill = ? AND family = ?",
+                [(skill, family) for skill in skills]
+            )
+            self.conn.commit()
+
+
+fragment_store = FragmentStore(settings.ROADMAP_FRAGMENT_DB_PATH)
@@ -1,125 +1,184 @@
 import asyncio
+import logging
 from duckduckgo_search import DDGS
-from typing import List, Dict, Any
-from ..db.vector_store import vector_store
-from .profile_engine import extract_skills, embedding_model
-import uuid
-import random
+from typing import List, Dict, Any, Tuple
+from ..core.config import settings
+from ..core.metrics import log_event
+from ..db.dedup_index import dedup_index, job_keys
+from ..core.concurrency import run_cpu, run_io, get_rate_limiter
+from .ingest import analyze_batch, extract_company, store_batch
+from .job_sources import JobSource
+import time
 
-async def scrape_jobs(query: str = "software engineer", limit: int = 30) -> List[Dict[str, Any]]:
+# Throughput stats of the most recent scrape_many run
+last_run_stats: Dict[str, Any] = {}
+
+class DuckDuckGoSource(JobSource):
     """
-    Scrapes jobs using DuckDuckGo Search to get real-time results.
+    Live job search through DuckDuckGo's text results.
     """
-    print(f"Searching for: {query}")
-    
-    # Use DDGS to find real jobs
-    # We search for "hiring {query}" to get job listings
-    # search_term = f"{query} jobs hiring now site:linkedin.com OR site:indeed.com OR site:greenhouse.io OR site:lever.co"
-    # search_term = f"{query} jobs hiring now"
-    search_term = f"{query} jobs"
-    
-    results = []
-    try:
-        # synchronous generator, run in executor or just iterate if fast enough
-        # DDGS is blocking, but for this demo it's fine.
-        ddgs = DDGS()
-        results = list(ddgs.text(search_term, max_results=limit))
-        print(f"DDGS found {len(results)} results for '{search_term}'")
-    except Exception as e:
-        print(f"Error searching DDGS: {e}")
-        return []
-
-    processed_jobs = []
-    seen_urls = set()
-    
-    # Optional: Clear existing jobs to avoid duplicates in this demo
-    # vector_store.jobs_collection.delete(where={}) 
-    
-    for res in results:
-        title = res.get("title", "Unknown Role")
-        url = res.get("href", "#")
-        snippet = res.get("body", "")
-        
-        # 1. Deduplication: Check if URL seen in this run
-        if url in seen_urls:
-            continue
-        seen_urls.add(url)
+    name = "ddg"
+
+    @property
+    def rate_limit_per_s(self) -> float:
+        return settings.SCRAPE_RATE_LIMIT_PER_S
+
+    def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        # Use DDGS to find real jobs
+        # We search for "hiring {query}" to get job listings
+        # search_term = f"{query} jobs hiring now site:linkedin.com OR site:indeed.com OR site:greenhouse.io OR site:lever.co"
+        # search_term = f"{query} jobs hiring now"
+        search_term = f"{query} jobs"
 
-        # 2. Deduplication: Check if URL exists in DB
-        existing = vector_store.jobs_collection.get(where={"url": url})
-        if existing and existing["ids"]:
-            print(f"Skipping duplicate job: {title}")
+        results = list(DDGS().text(search_term, max_results=limit))
+        log_event("scrape_search", sample_rate=settings.LOG_SAMPLE_RATE, source=self.name, query=search_term, results=len(results))
+
+        candidates = []
+        for res in results:
+            title = res.get("title", "Unknown Role")
+            candidates.append({
+                "title": title,
+                "company": extract_company(title),
+                "url": res.get("href", "#"),
+                "description": res.get("body", "")
+            })
+        return candidates
+
+ddg_source = DuckDuckGoSource()
+
+async def _search_worker(source: JobSource, query: str, limit: int, queue: asyncio.Queue, semaphore: asyncio.Semaphore, seen: set, stats: Dict[str, Any]):
+    limiter = get_rate_limiter(source.name, source.rate_limit_per_s)
+    async with semaphore:
+        await limiter.acquire()
+        try:
+            # Source searches are blocking (DDGS is a blocking generator), so run them in the I/O pool
+            candidates = await run_io(source.search, query, limit)
+        except Exception as e:
+            log_event("scrape_search_error", level=logging.WARNING, source=source.name, query=query, error=repr(e))
+            stats["failed_queries"].append(f"{source.name}:{query}")
+            return
+
+    stats["found"] += len(candidates)
+    stats["per_query"][f"{source.name}:{query}"] = len(candidates)
+    for candidate in candidates:
+        # Different queries often return the same posting; only queue it once per run
+        keys = job_keys(candidate)
+        if any(k in seen for k in keys):
+            stats["duplicates"] += 1
             continue
-        
-        # Simple heuristic to extract company from title or snippet
-        # E.g. "Software Engineer at Google"
-        company = "Unknown Company"
-        if " at " in title:
-            parts = title.split(" at ")
-            if len(parts) > 1:
-                company = parts[1].split(" |")[0].split(" -")[0].strip()
-        elif "-" in title:
-             company = title.split("-")[0].strip()
-
-        # 3. Extract Skills (from snippet AND title)
-        skills = extract_skills(snippet)
-        if not skills:
-            # Fallback: Try extracting from title
-            skills = extract_skills(title)
-            
-        # 4. Quality Filter: Skip if no skills found
-        if not skills:
-            print(f"Skipping job with no detected skills: {title}")
+        seen.update(keys)
+        await queue.put(candidate)
+
+async def _ingest_worker(queue: asyncio.Queue, processed_jobs: List[Dict[str, Any]], stats: Dict[str, Any]):
+    batch_size = settings.INGEST_BATCH_SIZE
+    finished = False
+    while not finished:
+        candidate = await queue.get()
+        if candidate is None:
+            break
+        # Take whatever else is already waiting, up to a full batch
+        batch = [candidate]
+        while len(batch) < batch_size:
+            try:
+                candidate = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if candidate is None:
+                finished = True
+                break
+            batch.append(candidate)
+
+        new_jobs = []
+        try:
+            # 1. Deduplication: one bulk lookup (and reservation) against the URL/content/(title, company) index
+            new_jobs = await run_io(dedup_index.filter_new, batch)
+            stats["duplicates"] += len(batch) - len(new_jobs)
+            if new_jobs:
+                # 2. Skills and embeddings are CPU-bound; storage is one bulk write
+                kept, rejected, embeddings = await run_cpu(analyze_batch, new_jobs)
+                ingested = await run_io(store_batch, kept, rejected, embeddings)
+                stats["ingested"] += len(ingested)
+                processed_jobs.extend(ingested)
+        except Exception as e:
+            # One bad batch must not stop the worker, or the searches block on a full queue
+            log_event("ingest_batch_error", level=logging.ERROR, jobs=len(batch), error=repr(e))
+            stats["failed_batches"] += 1
+            stats["failed_jobs"] += len(batch)
+            # Free the keys of jobs that were never stored, so a later run can take them
+            await run_io(dedup_index.release, new_jobs)
             continue
-        
-        # 5. Generate Embedding
-        text_to_embed = f"{title} {snippet}"
-        embedding = embedding_model.encode(text_to_embed).tolist()
-        
-        job_id = str(uuid.uuid4())
-        
-        # Generate realistic mock metadata for UI polish
-        applicants = random.randint(10, 200)
-        days_left = random.randint(1, 14)
-        salary_min = random.randint(4, 10)
-        salary_max = salary_min + random.randint(2, 8)
-        salary = f"₹{salary_min}L - ₹{salary_max}L/Year"
-        job_type = random.choice(["Full Time", "Internship"])
-        experience = "No prior experience required" if job_type == "Internship" else f"{random.randint(1, 3)}+ Years"
-        posted_date = f"Posted {random.randint(1, 5)} days ago"
-
-        # 6. Store in Vector DB
-        vector_store.jobs_collection.add(
-            ids=[job_id],
-            embeddings=[embedding],
-            metadatas={
-                "title": title,
-                "company": company,
-                "url": url,
-                "skills": ", ".join(skills),
-                "description": snippet,
-                "applicants": applicants,
-                "days_left": days_left,
-                "salary": salary,
-                "job_type": job_type,
-                "experience": experience,
-                "posted_date": posted_date
-            }
-        )
-        
-        processed_jobs.append({
-            "id": job_id,
-            "title": title,
-            "company": company,
-            "url": url,
-            "skills": skills,
-            "description": snippet,
-            "applicants": applicants,
-            "days_left": days_left,
-            "salary": salary,
-            "job_type": job_type,
-            "experience": experience,
-            "posted_date": posted_date
-        })
-        
+        finally:
+            stats["batches"] += 1
+
+async def _run_scrape(queries: List[str], limit: int, sources: List[JobSource]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    started = time.perf_counter()
+    stats = {
+        "queries": len(queries),
+        "failed_queries": [],
+        "per_query": {},
+        "found": 0,
+        "duplicates": 0,
+        "ingested": 0,
+        "batches": 0,
+        "failed_batches": 0,
+        "failed_jobs": 0
+    }
+    processed_jobs: List[Dict[str, Any]] = []
+
+    # Searches feed the queue concurrently; ingest workers drain it in batches
+    queue: asyncio.Queue = asyncio.Queue(maxsize=settings.INGEST_BATCH_SIZE * settings.SCRAPE_INGEST_WORKERS * 2)
+    semaphore = asyncio.Semaphore(settings.SCRAPE_CONCURRENCY)
+    seen: set = set()
+    workers = [
+        asyncio.create_task(_ingest_worker(queue, processed_jobs, stats))
+        for _ in range(settings.SCRAPE_INGEST_WORKERS)
+    ]
+    searches = asyncio.gather(*(
+        _search_worker(source, q, limit, queue, semaphore, seen, stats)
+        for source in sources for q in queries
+    ))
+    try:
+        # A worker only ends early by dying; nothing would drain the queue then,
+        # so stop waiting for searches that would block on queue.put forever
+        await asyncio.wait([searches, *workers], return_when=asyncio.FIRST_COMPLETED)
+        for worker in workers:
+            if worker.done():
+                worker.result()
+        await searches
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        searches.cancel()
+        for worker in workers:
+            worker.cancel()
+        # Let the cancellations land, so no task outlives the run
+        await asyncio.gather(searches, *workers, return_exceptions=True)
+
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    stats["jobs_per_second"] = round(stats["ingested"] / stats["seconds"], 2) if stats["seconds"] else 0.0
+    # Runs with failures are always logged
+    failed = stats["failed_queries"] or stats["failed_batches"]
+    log_event("scrape_run", sample_rate=1.0 if failed else settings.LOG_SAMPLE_RATE, **stats)
+    return processed_jobs, stats
+
+async def scrape_jobs(query: str = "software engineer", limit: int = 30) -> List[Dict[str, Any]]:
+    """
+    Scrapes jobs using DuckDuckGo Search to get real-time results.
+    """
+    processed_jobs, _ = await _run_scrape([query], limit, [ddg_source])
     return processed_jobs
+
+async def scrape_many(queries: List[str], limit: int = 30, sources: List[JobSource] = None) -> Dict[str, Any]:
+    """
+    Refreshes the job corpus for many roles in one run and returns its throughput stats.
+
+    Every query is searched on every source (DuckDuckGo by default). Searches run
+    concurrently (SCRAPE_CONCURRENCY at a time, rate limited per source)
+    and push candidates through an asyncio.Queue to SCRAPE_INGEST_WORKERS workers,
+    which dedup, extract skills, embed and insert in batches.
+    """
+    global last_run_stats
+    _, stats = await _run_scrape(queries, limit, sources or [ddg_source])
+    last_run_stats = stats
+    return stats
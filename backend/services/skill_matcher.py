@@ -0,0 +1,190 @@
+import json
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+from ..core.config import settings
+
+# Comprehensive list of tech skills for keyword matching
+TECH_KEYWORDS = {
+    "python", "java", "c++", "c#", "javascript", "typescript", "react", "angular", "vue", "node.js", "node",
+    "django", "flask", "fastapi", "spring", "springboot", "hibernate", "dotnet", ".net",
+    "aws", "azure", "gcp", "docker", "kubernetes", "jenkins", "terraform", "ansible",
+    "sql", "mysql", "postgresql", "mongodb", "redis", "cassandra", "elasticsearch",
+    "git", "github", "gitlab", "jira", "agile", "scrum",
+    "machine learning", "deep learning", "nlp", "computervision", "tensorflow", "pytorch", "pandas", "numpy", "scikit-learn",
+    "html", "css", "sass", "less", "bootstrap", "tailwind", "material-ui",
+    "linux", "unix", "bash", "shell", "powershell",
+    "rest", "graphql", "grpc", "microservices", "api",
+    "flutter", "dart", "react native", "swift", "kotlin", "android", "ios",
+    "figma", "adobe xd", "sketch"
+}
+
+# Alternative spellings that should resolve to a canonical keyword
+SKILL_ALIASES = {
+    "k8s": "kubernetes",
+    "postgres": "postgresql",
+    "reactjs": "react",
+    "react.js": "react",
+    "nodejs": "node.js",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "angularjs": "angular",
+    "golang": "go",
+    "sklearn": "scikit-learn",
+    "amazon web services": "aws",
+    "google cloud": "gcp",
+    "google cloud platform": "gcp",
+    "computer vision": "computervision",
+    "restful": "rest",
+    "mongo": "mongodb",
+    "elastic search": "elasticsearch",
+    "spring boot": "springboot",
+    "tailwindcss": "tailwind",
+}
+
+# Display overrides; everything else is title-cased
+DISPLAY_NAMES = {
+    "aws": "AWS",
+    "sql": "SQL",
+    "api": "API",
+    "rest": "REST",
+}
+
+_END = None
+
+
+def load_skill_dictionary(path: str) -> Tuple[Dict[str, List[str]], Dict[str, str]]:
+    """
+    Loads a skill dictionary from a JSON file.
+    Returns (canonical -> aliases, canonical -> display name), both for SkillMatcher.extend.
+
+    Accepted formats per entry:
+        "kubernetes": ["k8s"]                                  -> aliases
+        "kubernetes": {"aliases": ["k8s"], "display": "K8s"}   -> aliases + display name
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+
+    dictionary, display_names = {}, {}
+    for canonical, entry in raw.items():
+        canonical = canonical.lower().strip()
+        if isinstance(entry, dict):
+            dictionary[canonical] = [a.lower().strip() for a in entry.get("aliases", [])]
+            if entry.get("display"):
+                display_names[canonical] = entry["display"]
+        else:
+            dictionary[canonical] = [a.lower().strip() for a in (entry or [])]
+    return dictionary, display_names
+
+
+class SkillMatcher:
+    """
+    Finds every known skill in a text with a single regex scan.
+
+    All keywords and aliases are compiled into one prefix trie, so the regex
+    engine walks shared prefixes once instead of trying each keyword separately.
+    Word boundaries are only enforced on the sides of a keyword that start/end
+    with a word character (so "c++" and ".net" still match).
+
+    The regex keeps the longest match, so shorter keywords that the match starts
+    with are reported too, as a per-keyword scan would: "React Native" gives
+    react and react native, "Node.js" node and node.js, "Spring Boot" spring and springboot.
+    """
+
+    def __init__(self, keywords: Iterable[str] = (), aliases: Optional[Dict[str, str]] = None, display_names: Optional[Dict[str, str]] = None):
+        self.alias_map: Dict[str, str] = {}
+        self.display_names: Dict[str, str] = dict(display_names or {})
+        for keyword in keywords:
+            self.alias_map[keyword.lower()] = keyword.lower()
+        for alias, canonical in (aliases or {}).items():
+            self.alias_map[alias.lower()] = canonical.lower()
+        self._compile()
+
+    def extend(self, dictionary: Dict[str, List[str]], display_names: Optional[Dict[str, str]] = None):
+        """Adds canonical skills (and their aliases, and display names) and rebuilds the pattern."""
+        for canonical, aliases in dictionary.items():
+            canonical = canonical.lower().strip()
+            self.alias_map[canonical] = canonical
+            for alias in aliases:
+                self.alias_map[alias.lower().strip()] = canonical
+        for canonical, name in (display_names or {}).items():
+            self.display_names[canonical.lower().strip()] = name
+        self._compile()
+
+    def display_name(self, canonical: str) -> str:
+        return self.display_names.get(canonical, canonical.title())
+
+    def _compile(self):
+        word_start = {}
+        other_start = {}
+        for term in self.alias_map:
+            trie = word_start if re.match(r"\w", term) else other_start
+            node = trie
+            for ch in term:
+                node = node.setdefault(ch, {})
+            node[_END] = r"(?!\w)" if re.search(r"\w$", term) else ""
+
+        alternatives = []
+        if word_start:
+            alternatives.append(r"(?<!\w)" + self._trie_pattern(word_start))
+        if other_start:
+            alternatives.append(self._trie_pattern(other_start))
+        self.pattern = re.compile("|".join(alternatives) or r"(?!x)x")
+
+        # term -> shorter terms it starts with that end on a boundary ("react native" -> ["react"])
+        self.nested: Dict[str, List[str]] = {}
+        for term in self.alias_map:
+            shorter = [
+                term[:i] for i in range(1, len(term))
+                if term[:i] in self.alias_map and not (re.match(r"\w", term[i - 1]) and re.match(r"\w", term[i]))
+            ]
+            if shorter:
+                self.nested[term] = shorter
+
+    def _trie_pattern(self, node: dict) -> str:
+        alts = []
+        for ch in sorted(k for k in node if k is not _END):
+            token = r"\s+" if ch == " " else re.escape(ch)
+            alts.append(token + self._trie_pattern(node[ch]))
+        # The end-of-word alternative goes last so longer keywords win
+        if _END in node:
+            alts.append(node[_END])
+        if len(alts) == 1:
+            return alts[0]
+        return "(?:" + "|".join(alts) + ")"
+
+    def canonicalize(self, skill: str) -> Optional[str]:
+        """Returns the canonical keyword for a skill name or alias, if known."""
+        return self.alias_map.get(" ".join(skill.lower().split()))
+
+    def canonical_list(self, skills: Iterable[str]) -> List[str]:
+        """
+        Canonical keywords for a list of skill names, in order, without duplicates.
+        Entries that aren't a known skill/alias themselves are scanned as free text.
+        """
+        found = {}
+        for skill in skills:
+            canonical = self.canonicalize(skill)
+            for keyword in [canonical] if canonical else self.find(skill):
+                found.setdefault(keyword, None)
+        return list(found)
+
+    def find(self, text: str) -> List[str]:
+        """Returns the canonical keywords present in the text, in order of first appearance."""
+        found = {}
+        for match in self.pattern.finditer(text.lower()):
+            term = " ".join(match.group(0).split())
+            for shorter in self.nested.get(term, ()):
+                found.setdefault(self.alias_map[shorter], None)
+            canonical = self.alias_map.get(term)
+            if canonical:
+                found.setdefault(canonical, None)
+        return list(found)
+
+
+def display_name(canonical: str) -> str:
+    return skill_matcher.display_name(canonical)
+
+
+skill_matcher = SkillMatcher(TECH_KEYWORDS, SKILL_ALIASES, DISPLAY_NAMES)
+if settings.SKILL_DICTIONARY_PATH:
+    skill_matcher.extend(*load_skill_dictionary(settings.SKILL_DICTIONARY_PATH))
@@ -0,0 +1,137 @@
+import json
+from typing import Any, AsyncIterator, Dict, List, Tuple
+from ..core.models import get_llm
+from .llm_client import parse_json_output
+from .llm_scheduler import LLMOverloaded
+
+
+class IncrementalJSONParser:
+    """
+    Assembles a streamed JSON object and reports pieces as soon as they parse.
+
+    Emits, in order of completion:
+      {"type": "item",  "key": "nodes", "value": {...}}  each element of a top-level array
+      {"type": "field", "key": "score", "value": 75}     each complete top-level value
+    Only the newly received text is scanned on every feed() call.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.stack: List[Dict[str, Any]] = []
+        self.in_string = False
+        self.escaped = False
+        self.string_start = 0
+        self.expect_key = False
+        self.current_key = None
+        self.value_start = None
+        self.done = False
+
+    def _in_top_array(self) -> bool:
+        return len(self.stack) == 2 and self.stack[0]["type"] == "{" and self.stack[1]["type"] == "["
+
+    def _emit(self, events: list, type: str, key: str, raw: str):
+        try:
+            events.append({"type": type, "key": key, "value": json.loads(raw)})
+        except json.JSONDecodeError:
+            pass
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        events = []
+        self.buffer += chunk
+        buf = self.buffer
+
+        while self.pos < len(buf) and not self.done:
+            i = self.pos
+            c = buf[i]
+            self.pos += 1
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif c == "\\":
+                    self.escaped = True
+                elif c == '"':
+                    self.in_string = False
+                    raw = buf[self.string_start:i + 1]
+                    if len(self.stack) == 1 and self.expect_key:
+                        self.current_key = json.loads(raw)
+                    elif self._in_top_array():
+                        self._emit(events, "item", self.stack[1]["key"], raw)
+                continue
+
+            if c == '"':
+                self.in_string = True
+                self.string_start = i
+            elif c in "{[":
+                self.stack.append({
+                    "type": c,
+                    "start": i,
+                    "key": self.current_key if len(self.stack) == 1 else None
+                })
+                if len(self.stack) == 1:
+                    self.expect_key = c == "{"
+            elif c in "}]":
+                if not self.stack:
+                    continue
+                opened = self.stack.pop()
+                if self._in_top_array():
+                    self._emit(events, "item", self.stack[1]["key"], buf[opened["start"]:i + 1])
+                if len(self.stack) == 0:
+                    self._close_field(events, i)
+                    self.done = True
+            elif len(self.stack) == 1:
+                if c == ":":
+                    self.expect_key = False
+                    self.value_start = i + 1
+                elif c == ",":
+                    self._close_field(events, i)
+                    self.expect_key = True
+
+        return events
+
+    def _close_field(self, events: list, end: int):
+        if self.value_start is None or self.current_key is None:
+            return
+        raw = self.buffer[self.value_start:end].strip()
+        if raw:
+            self._emit(events, "field", self.current_key, raw)
+        self.value_start = None
+
+
+async def stream_llm_json(prompt: str, use_cache: bool = True) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Streams one JSON-format LLM call as (event, data) pairs:
+    "token" for raw text, "partial" for each piece the assembler can parse,
+    and a final "result" with the fully parsed object (or "error").
+    """
+    parser = IncrementalJSONParser()
+    parts = []
+    async for token in get_llm().stream_generate(prompt, use_cache=use_cache):
+        parts.append(token)
+        yield "token", {"text": token}
+        for event in parser.feed(token):
+            yield "partial", event
+
+    try:
+        yield "result", parse_json_output("".join(parts))
+    except ValueError as e:
+        yield "error", {"detail": f"Could not parse model output: {e}"}
+
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def to_sse(events: AsyncIterator[Tuple[str, Any]]) -> AsyncIterator[str]:
+    """Formats (event, data) pairs as Server-Sent Events, turning failures into an error event."""
+    try:
+        async for event, data in events:
+            yield sse_event(event, data)
+    except LLMOverloaded as e:
+        # Headers are already sent, so the status travels in the event
+        yield sse_event("error", {"detail": e.detail, "status": e.status_code, "retry_after": e.retry_after})
+    except Exception as e:
+        print(f"Error while streaming: {e}")
+        yield sse_event("error", {"detail": str(e)})
+    yield sse_event("done", {})
@@ -1,13 +1,9 @@
-import requests
-import json
+from ..core.models import get_llm
+from .llm_scheduler import LLMOverloaded
+from .streaming import stream_llm_json
 
-OLLAMA_URL = "http://localhost:11434/api/generate"
-
-def tailor_resume(user_skills: list[str], job_description: str, job_title: str):
-    """
-    Rewrites resume bullet points to match the job description using LLM.
-    """
-    prompt = f"""
+def build_tailor_prompt(user_skills: list[str], job_description: str, job_title: str) -> str:
+    return f"""
     You are an expert Resume Writer and ATS Specialist.
     
     CONTEXT:
@@ -24,18 +20,22 @@ def tailor_resume(user_skills: list[str], job_description: str, job_title: str):
     Example: {{ "tailored_bullets": ["Implemented CI/CD pipelines...", "Optimized Docker containers..."] }}
     """
 
-    payload = {
-        "model": "gemma3:1b",
-        "prompt": prompt,
-        "stream": False,
-        "format": "json"
-    }
+async def tailor_resume(user_skills: list[str], job_description: str, job_title: str, use_cache: bool = True):
+    """
+    Rewrites resume bullet points to match the job description using LLM.
+    """
+    prompt = build_tailor_prompt(user_skills, job_description, job_title)
 
     try:
-        response = requests.post(OLLAMA_URL, json=payload)
-        response.raise_for_status()
-        result = response.json()
-        return json.loads(result["response"])
+        return await get_llm().generate_json(prompt, use_cache=use_cache)
+    except LLMOverloaded:
+        raise
     except Exception as e:
         print(f"Error tailoring resume: {e}")
         return {"tailored_bullets": ["Error generating tailored content."]}
+
+def stream_tailor_resume(user_skills: list[str], job_description: str, job_title: str, use_cache: bool = True):
+    """
+    Streaming variant of tailor_resume: yields (event, data) pairs as bullets are generated.
+    """
+    return stream_llm_json(build_tailor_prompt(user_skills, job_description, job_title), use_cache=use_cache)
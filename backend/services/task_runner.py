@@ -0,0 +1,99 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+from ..core.config import settings
+from ..core.concurrency import run_io
+from ..db.task_store import task_store
+from .llm_scheduler import LLMOverloaded, llm_request
+
+# Give up on a task whose LLM calls keep getting refused
+_MAX_OVERLOAD_RETRIES = 5
+
+
+async def _run_roadmap(params: Dict[str, Any], use_cache: bool) -> Dict[str, Any]:
+    from .roadmap import generate_roadmap
+    result = await generate_roadmap(params["profile_skills"], params["job_skills"], params["job_title"], use_cache=use_cache)
+    if "error" in result:
+        raise RuntimeError(result["error"])
+    return result
+
+
+async def _run_audit(params: Dict[str, Any], use_cache: bool) -> Dict[str, Any]:
+    from ..agents.resume_audit import audit_resume
+    # Nobody waits on a job's response, so it writes the narrative unless told not to
+    narrative = params.get("narrative") is not False
+    return await audit_resume(params["resume_text"], params["job_description"], use_cache=use_cache, narrative=narrative)
+
+
+class TaskRunner:
+    """
+    Local worker pool for async jobs: submit() stores the task in `task_store`
+    and returns at once, TASK_WORKERS workers run queued tasks one at a time.
+    Identical submissions share one task (and its stored result).
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.handlers: Dict[str, Callable[[Dict[str, Any], bool], Awaitable[Any]]] = {
+            "roadmap": _run_roadmap,
+            "audit": _run_audit,
+        }
+        self.queue: asyncio.Queue = None
+        self.tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        for task_id in await run_io(task_store.requeue_unfinished):
+            self.queue.put_nowait(task_id)
+        self.tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    async def submit(self, kind: str, params: Dict[str, Any], no_cache: bool = False) -> Tuple[Dict[str, Any], bool]:
+        """Returns (task, created); created is False when an identical task was reused."""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown task kind: {kind}")
+        task, created = await run_io(task_store.submit, kind, params, no_cache)
+        if created:
+            self.queue.put_nowait(task["id"])
+        return task, created
+
+    async def _worker(self):
+        while True:
+            task_id = await self.queue.get()
+            try:
+                await self._run(task_id)
+            except Exception as e:
+                print(f"Task {task_id} crashed the worker loop: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, task_id: str):
+        task = await run_io(task_store.get, task_id)
+        if task is None or task["status"] != "queued":
+            return
+        use_cache = not task["no_cache"]
+        await run_io(task_store.mark_running, task_id)
+
+        # Nobody waits on the connection, so no queue deadline; priority follows the kind
+        with llm_request(task["kind"], deadline=False):
+            for attempt in range(_MAX_OVERLOAD_RETRIES + 1):
+                try:
+                    result = await self.handlers[task["kind"]](task["params"], use_cache)
+                    break
+                except LLMOverloaded as e:
+                    if attempt >= _MAX_OVERLOAD_RETRIES:
+                        await run_io(task_store.mark_failed, task_id, e.detail)
+                        return
+                    await asyncio.sleep(e.retry_after)
+                except Exception as e:
+                    print(f"Task {task_id} ({task['kind']}) failed: {e}")
+                    await run_io(task_store.mark_failed, task_id, str(e))
+                    return
+        await run_io(task_store.mark_done, task_id, result)
+
+
+task_runner = TaskRunner(settings.TASK_WORKERS)
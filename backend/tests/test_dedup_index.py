@@ -0,0 +1,40 @@
+import threading
+import pytest
+
+pytest.importorskip("chromadb")
+
+from backend.db.dedup_index import DedupIndex
+
+
+def _job(i, title="Backend Engineer", company="Acme"):
+    return {"title": title, "company": company, "url": f"https://jobs.example.com/{i}", "description": f"posting {i}"}
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = DedupIndex(str(tmp_path / "dedup.sqlite3"))
+    index._seeded = True  # nothing to backfill from Chroma
+    return index
+
+
+def test_concurrent_filters_hand_a_posting_out_once(index):
+    jobs = [_job(i, title=f"Role {i}") for i in range(50)]
+    taken = []
+    threads = [threading.Thread(target=lambda: taken.extend(index.filter_new(jobs))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(taken) == len(jobs)
+
+
+def test_released_posting_can_be_taken_again(index):
+    rejected = _job(1)
+    assert index.filter_new([rejected]) == [rejected]
+    index.release([rejected])
+    # Same (title, company), now complete: not blocked by the rejected one
+    stored = {**_job(2), "id": "job-2"}
+    assert index.filter_new([stored]) == [stored]
+    index.mark_seen([stored])
+    index.release([stored])  # a stored job's keys are not released
+    assert index.filter_new([_job(3)]) == []
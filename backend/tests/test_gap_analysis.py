@@ -0,0 +1,13 @@
+from backend.agents.roadmap_graph import local_gap_analysis
+
+
+def test_unknown_job_skills_are_kept():
+    assert local_gap_analysis(["Python"], "Python, Apache Spark, Airflow") == ["Apache Spark", "Airflow"]
+
+
+def test_aliases_and_normalised_text_cover_job_skills():
+    assert local_gap_analysis(["K8s", "apache  spark"], "Kubernetes, Apache Spark, AWS") == ["AWS"]
+
+
+def test_empty_job_skills_fall_back():
+    assert local_gap_analysis(["Python"], " , ") is None
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+chromadb = pytest.importorskip("chromadb")
+
+from backend.core.config import settings
+from backend.db.job_index import JobIndex
+from backend.db.vector_store import vector_store
+from backend.services import matcher
+
+DIM = 16
+
+
+def _jobs(start, count, rng):
+    # Unit length, like the sentence-transformer embeddings
+    embeddings = rng.normal(size=(count, DIM))
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    ids = [f"job-{i}" for i in range(start, start + count)]
+    metadatas = [
+        {"title": f"Job {i}", "company": f"Co {i}", "job_type": "Internship" if i % 3 == 0 else "Full Time", "days_left": i % 14}
+        for i in range(start, start + count)
+    ]
+    return ids, embeddings.tolist(), metadatas
+
+
+@pytest.fixture
+def jobs(tmp_path, monkeypatch):
+    rng = np.random.default_rng(7)
+    collection = chromadb.EphemeralClient().get_or_create_collection(f"jobs-{tmp_path.name}")
+    ids, embeddings, metadatas = _jobs(0, 300, rng)
+    collection.add(ids=ids, embeddings=embeddings, metadatas=metadatas)
+    monkeypatch.setattr(vector_store, "jobs_collection", collection)
+    index = JobIndex(str(tmp_path / "index"))
+    monkeypatch.setattr(matcher, "job_index", index)
+    return index, rng.normal(size=(3, DIM)).tolist()
+
+
+@pytest.mark.parametrize("where", [
+    None,
+    {"job_type": "Internship"},
+    {"$and": [{"job_type": "Full Time"}, {"days_left": {"$gte": 7}}]},
+])
+def test_backends_rank_and_score_alike(jobs, monkeypatch, where):
+    _, queries = jobs
+    results = {}
+    for backend in ("chroma", "numpy"):
+        monkeypatch.setattr(settings, "MATCH_BACKEND", backend)
+        results[backend] = matcher._search(queries, 10, where)
+    for chroma_hits, numpy_hits in zip(results["chroma"], results["numpy"]):
+        assert [job_id for job_id, _, _ in chroma_hits] == [job_id for job_id, _, _ in numpy_hits]
+        assert np.allclose([s for _, _, s in chroma_hits], [s for _, _, s in numpy_hits], atol=1e-5)
+
+
+def test_filters_match_per_row_semantics(jobs):
+    index, queries = jobs
+    where = {"$and": [{"job_type": "Internship"}, {"days_left": {"$gte": 10}}]}
+    hits = index.search(queries[:1], 300, where=where)[0]
+    expected = {f"job-{i}" for i in range(300) if i % 3 == 0 and i % 14 >= 10}
+    assert {job_id for job_id, _, _ in hits} == expected
+    assert index.search(queries[:1], 5, where={"job_type": "Contract"})[0] == []
+
+
+def test_rows_appended_before_the_first_build_are_searchable(jobs):
+    index, _ = jobs
+    ids, embeddings, metadatas = _jobs(1000, 2, np.random.default_rng(1))
+    index.append(ids, embeddings, metadatas)  # nothing loaded yet
+    hits = index.search([embeddings[0]], 1)[0]
+    assert hits[0][0] == "job-1000"
+    # The build read Chroma, which lacks these rows: they stay in the delta
+    assert index.delta_ids == ids
@@ -0,0 +1,155 @@
+import asyncio
+import pytest
+from backend.core.config import settings
+from backend.services import llm_scheduler as scheduler_module
+from backend.services.llm_scheduler import LLMOverloaded, LLMScheduler, llm_request
+
+
+@pytest.fixture(autouse=True)
+def fast_checks(monkeypatch):
+    monkeypatch.setattr(scheduler_module, "_CHECK_INTERVAL_S", 0.01)
+
+
+async def _call(scheduler, endpoint, hold_s, log, request=None, deadline=True):
+    with llm_request(endpoint, request, deadline=deadline):
+        try:
+            async with scheduler.slot():
+                log.append(endpoint)
+                await asyncio.sleep(hold_s)
+        except LLMOverloaded as e:
+            log.append((endpoint, e.status_code))
+
+
+async def _burst(scheduler, first, queued, hold_s=0.05):
+    """Starts `first` holding the only slot, then queues `queued` in order."""
+    log = []
+    tasks = [asyncio.create_task(_call(scheduler, first, hold_s, log))]
+    await asyncio.sleep(0)
+    for endpoint in queued:
+        tasks.append(asyncio.create_task(_call(scheduler, endpoint, hold_s, log)))
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    return log
+
+
+def test_waiters_run_by_priority_then_fifo():
+    scheduler = LLMScheduler(max_concurrency=1, max_queue=10)
+    log = asyncio.run(_burst(scheduler, "roadmap", ["background", "roadmap", "audit", "tailor", "post_mortem"]))
+    assert log == ["roadmap", "tailor", "post_mortem", "audit", "roadmap", "background"]
+    assert scheduler.active == 0 and scheduler.waiters == []
+
+
+def test_full_queue_evicts_lower_priority_waiter():
+    scheduler = LLMScheduler(max_concurrency=1, max_queue=2)
+    log = asyncio.run(_burst(scheduler, "roadmap", ["roadmap", "roadmap", "tailor", "tailor"]))
+    # Both tailor calls get in; the two queued roadmap calls are preempted
+    assert log.count(("roadmap", 429)) == 2
+    assert log == ["roadmap", ("roadmap", 429), ("roadmap", 429), "tailor", "tailor"]
+
+
+def test_full_queue_refuses_equal_or_lower_priority():
+    scheduler = LLMScheduler(max_concurrency=1, max_queue=2)
+    log = asyncio.run(_burst(scheduler, "tailor", ["tailor", "tailor", "tailor", "roadmap"]))
+    assert ("tailor", 429) in log and ("roadmap", 429) in log
+    assert log.count("tailor") == 3
+
+
+def test_refusal_carries_retry_after():
+    scheduler = LLMScheduler(max_concurrency=1, max_queue=0)
+
+    async def run():
+        async with scheduler.slot():
+            with pytest.raises(LLMOverloaded) as refused:
+                async with scheduler.slot():
+                    pass
+        return refused.value
+
+    error = asyncio.run(run())
+    assert error.status_code == 429 and error.retry_after >= 1
+
+
+def test_queue_timeout_gives_503(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_QUEUE_TIMEOUT_S", 0.05)
+    scheduler = LLMScheduler(max_concurrency=1, max_queue=10)
+    log = asyncio.run(_burst(scheduler, "roadmap", ["audit"], hold_s=0.2))
+    assert log == ["roadmap", ("audit", 503)]
+    assert scheduler.waiters == []
+
+
+def test_queue_timeout_is_per_call(monkeypatch):
+    # A request making several calls in sequence must not run out of time as a whole
+    monkeypatch.setattr(settings, "LLM_QUEUE_TIMEOUT_S", 0.1)
+    scheduler = LLMScheduler(max_concurrency=1, max_queue=10)
+
+    async def run():
+        log = []
+        with llm_request("roadmap"):
+            for _ in range(4):
+                async with scheduler.slot():
+                    await asyncio.sleep(0.05)
+                log.append("ok")
+        return log
+
+    assert asyncio.run(run()) == ["ok"] * 4
+
+
+def test_no_deadline_waits_past_timeout(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_QUEUE_TIMEOUT_S", 0.02)
+    scheduler = LLMScheduler(max_concurrency=1, max_queue=10)
+
+    async def run():
+        log = []
+        holder = asyncio.create_task(_call(scheduler, "tailor", 0.1, log))
+        await asyncio.sleep(0)
+        await _call(scheduler, "background", 0, log, deadline=False)
+        await holder
+        return log
+
+    assert asyncio.run(run()) == ["tailor", "background"]
+
+
+class _Request:
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+def test_disconnected_client_is_dropped_from_queue():
+    scheduler = LLMScheduler(max_concurrency=1, max_queue=10)
+
+    async def run():
+        log = []
+        request = _Request()
+        holder = asyncio.create_task(_call(scheduler, "tailor", 0.1, log))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(_call(scheduler, "audit", 0, log, request=request))
+        await asyncio.sleep(0.02)
+        assert len(scheduler.waiters) == 1
+        request.disconnected = True
+        await waiter
+        assert scheduler.waiters == []
+        await holder
+        return log
+
+    assert asyncio.run(run()) == ["tailor", ("audit", 499)]
+    assert scheduler.active == 0
+
+
+def test_cancelled_waiter_does_not_leak_slot():
+    scheduler = LLMScheduler(max_concurrency=1, max_queue=10)
+
+    async def run():
+        log = []
+        holder = asyncio.create_task(_call(scheduler, "tailor", 0.05, log))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(_call(scheduler, "audit", 0, log))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.gather(holder, waiter, return_exceptions=True)
+        await _call(scheduler, "roadmap", 0, log)
+        return log
+
+    assert asyncio.run(run()) == ["tailor", "roadmap"]
+    assert scheduler.active == 0 and scheduler.waiters == []
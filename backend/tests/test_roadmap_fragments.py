@@ -0,0 +1,27 @@
+import pytest
+from backend.services.roadmap_fragments import role_family
+
+
+@pytest.mark.parametrize("title, family", [
+    ("ML Engineer", "ml"),
+    ("Senior AI Researcher", "ml"),
+    ("iOS Developer", "mobile"),
+    ("UI Developer", "frontend"),
+    ("Cloud Engineer", "devops"),
+    ("Site Reliability Engineer", "devops"),
+    ("Full-Stack Developer", "fullstack"),
+])
+def test_role_family_markers(title, family):
+    assert role_family(title) == family
+
+
+@pytest.mark.parametrize("title", [
+    "HTML Developer",        # "ml" inside a word
+    "GUI Developer",         # "ui developer" inside a word
+    "Test Scenarios Writer",  # "ios" inside a word
+    "Game Studios Producer",
+    "Platform Marketing Manager",
+    "Cloud Sales Executive",
+])
+def test_markers_only_match_whole_words(title):
+    assert role_family(title) == "general"
@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+from backend.agents import roadmap_graph
+from backend.core.config import settings
+from backend.services.roadmap_fragments import FragmentStore
+
+
+class FakeLLM:
+    """Answers the roadmap prompts; the reviewer gives the queued verdicts in turn."""
+
+    def __init__(self, verdicts):
+        self.verdicts = list(verdicts)
+        self.forgotten = []
+        self.architect_calls = 0
+
+    async def generate_json(self, prompt, use_cache=True):
+        if "Senior Technical Reviewer" in prompt:
+            return {"status": self.verdicts.pop(0), "feedback": "Too vague"}
+        if "For EACH of these skills" in prompt:
+            return {"Docker": [{"label": "Containers", "phase": "Basics", "weeks": 1}]}
+        self.architect_calls += 1
+        return {"nodes": [{"id": "1", "label": f"Draft {self.architect_calls}"}], "edges": []}
+
+    async def forget(self, prompt, **kwargs):
+        self.forgotten.append(prompt)
+
+
+@pytest.fixture
+def fragments(tmp_path, monkeypatch):
+    store = FragmentStore(str(tmp_path / "fragments.sqlite3"))
+    monkeypatch.setattr(roadmap_graph, "fragment_store", store)
+    return store
+
+
+def _state(**overrides):
+    state = {
+        "user_skills": ["Python"], "job_title": "Backend Engineer", "job_skills": "Python, Docker",
+        "missing_skills": [], "roadmap_json": {}, "feedback": "", "iteration_count": 0,
+        "use_cache": True, "timings": {},
+    }
+    return {**state, **overrides}
+
+
+def test_should_continue_revises_until_the_limit(monkeypatch):
+    monkeypatch.setattr(settings, "ROADMAP_MAX_REVISIONS", 1)
+    assert roadmap_graph.should_continue(_state(review_status="APPROVE", iteration_count=1)) == "approve"
+    assert roadmap_graph.should_continue(_state(review_status="REJECT", iteration_count=1)) == "reject"
+    assert roadmap_graph.should_continue(_state(review_status="REJECT", iteration_count=2)) == "approve"
+
+
+def test_rejected_roadmap_goes_back_to_the_architect(monkeypatch, fragments):
+    llm = FakeLLM(["REJECT", "APPROVE"])
+    monkeypatch.setattr(roadmap_graph, "get_llm", lambda: llm)
+    monkeypatch.setattr(settings, "ROADMAP_REVIEWER", "on")
+    result = asyncio.run(roadmap_graph.build_roadmap_graph().ainvoke(_state()))
+    # Draft from fragments rejected, then rewritten whole with the feedback
+    assert result["iteration_count"] == 2
+    assert result["review_status"] == "APPROVE"
+    assert result["roadmap_json"]["nodes"][0]["label"] == "Draft 1"
+    # The rejected draft's fragments are not served again
+    assert fragments.get_many(["docker"], "backend") == {}
+
+
+def test_reject_drops_the_cached_architect_completion(monkeypatch, fragments):
+    llm = FakeLLM(["REJECT"])
+    monkeypatch.setattr(roadmap_graph, "get_llm", lambda: llm)
+    monkeypatch.setattr(settings, "ROADMAP_FRAGMENT_CACHE", False)
+    state = _state(missing_skills=["Docker"], roadmap_json={"nodes": [], "edges": []})
+    review = asyncio.run(roadmap_graph.reviewer_node(state))
+    assert review["review_status"] == "REJECT"
+    assert llm.forgotten == [roadmap_graph.build_architect_prompt(state)]
@@ -0,0 +1,29 @@
+import json
+from backend.services.skill_matcher import SkillMatcher, display_name, load_skill_dictionary, skill_matcher
+
+
+def test_rest_api_matches_rest_and_api():
+    assert skill_matcher.find("Built REST APIs and a REST API gateway") == ["rest", "api"]
+    assert [display_name(s) for s in skill_matcher.find("Designed RESTful services")] == ["REST"]
+
+
+def test_aliases_resolve_to_canonical_keyword():
+    assert skill_matcher.find("Deployed on K8s with Postgres") == ["kubernetes", "postgresql"]
+
+
+def test_longer_match_keeps_the_keywords_it_starts_with():
+    # Same result as scanning for each keyword on its own
+    assert skill_matcher.find("React Native") == ["react", "react native"]
+    assert skill_matcher.find("Node.js") == ["node", "node.js"]
+    assert skill_matcher.find("Spring Boot") == ["spring", "springboot"]
+    assert skill_matcher.find("ReactJS and PostgreSQL") == ["react", "postgresql"]
+
+
+def test_dictionary_extends_a_matcher_without_touching_the_defaults(tmp_path):
+    path = tmp_path / "skills.json"
+    path.write_text(json.dumps({"Kubernetes": {"aliases": ["K8S"], "display": "K8s"}, "Airflow": ["apache airflow"]}))
+    matcher = SkillMatcher(["python"])
+    matcher.extend(*load_skill_dictionary(str(path)))
+    assert matcher.find("Python, k8s and Apache Airflow") == ["python", "kubernetes", "airflow"]
+    assert matcher.display_name("kubernetes") == "K8s"
+    assert display_name("kubernetes") == "Kubernetes"
@@ -0,0 +1,45 @@
+import sqlite3
+
+from backend.db.task_store import TaskStore
+
+_PARAMS = {"resume_text": "python", "job_description": "python, docker"}
+
+
+def test_no_cache_survives_a_requeue(tmp_path):
+    path = str(tmp_path / "tasks.sqlite3")
+    task, _ = TaskStore(path, 3600).submit("audit", _PARAMS, no_cache=True)
+    TaskStore(path, 3600).mark_running(task["id"])
+
+    # A fresh store, as after a restart
+    store = TaskStore(path, 3600)
+    assert store.requeue_unfinished() == [task["id"]]
+    assert store.get(task["id"])["no_cache"] is True
+
+
+def test_no_cache_submission_is_not_shared_with_a_cached_task(tmp_path):
+    store = TaskStore(str(tmp_path / "tasks.sqlite3"), 3600)
+    cached, _ = store.submit("audit", _PARAMS)
+    store.mark_running(cached["id"])
+
+    fresh, created = store.submit("audit", _PARAMS, no_cache=True)
+    assert created and fresh["id"] != cached["id"]
+    assert store.submit("audit", _PARAMS, no_cache=True) == (fresh, False)
+
+    # A finished no_cache task is not reused by the next no_cache submission
+    store.mark_done(fresh["id"], {"ok": True})
+    assert store.submit("audit", _PARAMS, no_cache=True)[1] is True
+    assert store.submit("audit", _PARAMS)[0]["id"] == cached["id"]
+
+
+def test_tables_without_no_cache_are_migrated(tmp_path):
+    path = str(tmp_path / "tasks.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE tasks (id TEXT PRIMARY KEY, kind TEXT NOT NULL, dedup_key TEXT NOT NULL, status TEXT NOT NULL, "
+        "params TEXT NOT NULL, result TEXT, error TEXT, created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+    )
+    conn.execute("INSERT INTO tasks (id, kind, dedup_key, status, params, created_at) VALUES ('old', 'audit', 'k', 'queued', '{}', 0)")
+    conn.commit()
+    conn.close()
+
+    assert TaskStore(path, 3600).get("old")["no_cache"] is False